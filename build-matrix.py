@@ -0,0 +1,185 @@
+#!/usr/bin/env python3
+"""
+Build de plusieurs variantes en une seule passe
+Les scripts build.py (full), build.test.py (test), build.light.py (light) et
+build-timestamp.py (timestamp) sont exécutés dans le même processus : chaque
+source (templates HTML, CSS, JS) est lue et décodée une seule fois dans un
+pool partagé, puis chaque variante est assemblée depuis la mémoire. Avec
+--processes, les variantes sont assemblées en parallèle dans des processus
+qui héritent du pool déjà chargé.
+Les fichiers générés sont identiques à ceux des scripts lancés séparément.
+Usage: python3 build-matrix.py [--variants full,test,light,timestamp] [--processes N]
+       [--no-cache] [--jobs N] [--verbose]
+"""
+
+import os
+import io
+import sys
+import time
+import argparse
+import contextlib
+import importlib.util
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+
+from buildtools.cache import BuildCache
+from buildtools.encoding import EncodingCache
+from buildtools.manifest import load as load_manifest
+from buildtools.parallel import default_jobs
+from buildtools.pool import SourcePool
+
+BUILD_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Variante -> script de build et nom du fichier généré par défaut ({ts} : horodatage)
+VARIANTS = {
+    'full': ('build.py', 'plume-build.html'),
+    'test': ('build.test.py', 'plume-refactor-{ts}.html'),
+    'light': ('build.light.py', 'plume-light-{ts}.html'),
+    'timestamp': ('build-timestamp.py', 'plume-build-{ts}.html'),
+}
+
+# Variantes dont le script lit build-manifest.json (sources préchargées)
+MANIFEST_VARIANTS = {'full': 'full', 'test': 'test', 'light': 'light'}
+
+# build-timestamp.py écrit par défaut dans build.log, comme build.py
+TIMESTAMP_LOG_FILE = 'build.timestamp.log'
+
+# Templates lus par toutes les variantes
+HTML_TEMPLATES = ['html/head.html', 'html/body.html', 'html/footer.html']
+
+# Pool des sources décodées, hérité par les processus d'assemblage
+source_pool = None
+
+# Scripts de build chargés (variante -> module)
+build_modules = {}
+
+def load_script(variant):
+    """Charge le script de build d'une variante comme un module (sans exécuter son __main__)"""
+    if variant not in build_modules:
+        script = VARIANTS[variant][0]
+        name = 'plume_' + script[:-3].replace('.', '_').replace('-', '_')
+        spec = importlib.util.spec_from_file_location(name, os.path.join(BUILD_DIR, script))
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+        module.source_pool = source_pool
+        if variant == 'timestamp':
+            module.LOG_FILE = os.path.join(BUILD_DIR, TIMESTAMP_LOG_FILE)
+        build_modules[variant] = module
+    return build_modules[variant]
+
+def build_variant(variant, output, use_cache):
+    """
+    Construit une variante depuis le pool, retourne (variante, chemin, secondes,
+    relectures évitées, log console).
+    `use_cache` : le script partage le cache de build du pool (processus principal uniquement).
+    """
+    module = load_script(variant)
+    console = io.StringIO()
+    hits = source_pool.hits
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(console):
+        if variant in ('full', 'light'):
+            if use_cache:
+                module.build_cache = source_pool.build_cache
+            module.encoding_cache = source_pool.encoding_cache
+            output_path = module.build(output, use_cache=use_cache)
+        else:
+            output_path = module.build(output)
+    return variant, output_path, time.perf_counter() - start, source_pool.hits - hits, console.getvalue()
+
+def init_worker(pool):
+    """Processus d'assemblage : reprend le pool du processus principal"""
+    global source_pool
+    source_pool = pool
+    build_modules.clear()
+
+def source_paths(variants):
+    """Sources de build-manifest.json lues par les variantes demandées"""
+    manifest = load_manifest(BUILD_DIR)
+    paths = list(HTML_TEMPLATES)
+    for variant in variants:
+        if variant in MANIFEST_VARIANTS:
+            for kind in ('css', 'js'):
+                paths.extend(path for path, _ in manifest.resolve(MANIFEST_VARIANTS[variant], kind).entries)
+    return paths
+
+def build_matrix(variants, processes=1, use_cache=True, jobs=None, verbose=False):
+    """Construit les variantes demandées, retourne [(variante, chemin)]"""
+    global source_pool
+    timestamp = datetime.now().strftime('%Y.%m.%d.%H.%M')
+
+    print(f"========================================")
+    print(f"Build Plume matrice ({', '.join(variants)}) - {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+    print(f"========================================")
+
+    start = time.perf_counter()
+    encoding_cache = EncodingCache(BUILD_DIR).load()
+    build_cache = BuildCache(BUILD_DIR).load() if use_cache else None
+    source_pool = SourcePool(BUILD_DIR, encoding_cache, build_cache)
+    for module in build_modules.values():
+        module.source_pool = source_pool
+    paths = source_paths(variants)
+    source_pool.preload(paths, jobs or default_jobs())
+    log_line = f"   [OK] {len(source_pool.contents)} sources en memoire ({source_pool.size():,} caracteres)"
+    print(f"{log_line} en {time.perf_counter() - start:.2f} s")
+    if build_cache:
+        print(f"   [i] Cache: {build_cache.hits} fichiers reutilises, {build_cache.misses} decodes")
+
+    tasks = [(variant, VARIANTS[variant][1].format(ts=timestamp)) for variant in variants]
+    results = []
+    if processes > 1 and len(tasks) > 1:
+        # fork : le pool est partagé sans copie ; sinon il est transmis à chaque processus
+        methods = multiprocessing.get_all_start_methods()
+        context = multiprocessing.get_context('fork' if 'fork' in methods else None)
+        with ProcessPoolExecutor(max_workers=min(processes, len(tasks)), mp_context=context,
+                                 initializer=init_worker, initargs=(source_pool,)) as executor:
+            futures = [executor.submit(build_variant, variant, output, False) for variant, output in tasks]
+            results = [future.result() for future in futures]
+    else:
+        results = [build_variant(variant, output, use_cache) for variant, output in tasks]
+
+    print("--- Variantes ---")
+    for variant, output_path, seconds, _, console in results:
+        if verbose:
+            print(console, end='')
+        if output_path:
+            print(f"   [OK] {variant:<10} {os.path.relpath(output_path, BUILD_DIR)} ({seconds:.2f} s)")
+        else:
+            print(f"   [ERREUR] {variant}: aucun fichier genere (voir le log du script)")
+
+    non_utf8 = source_pool.non_utf8()
+    if non_utf8:
+        print(f"   [!] {len(non_utf8)} sources ne sont pas en UTF-8:")
+        for path, encoding in non_utf8:
+            print(f"      - {path} ({encoding})")
+    print(f"   [i] {source_pool.reads} fichiers lus une fois, "
+          f"{sum(result[3] for result in results)} relectures evitees")
+    if build_cache:
+        build_cache.save()
+    encoding_cache.save()
+
+    print(f"BUILD MATRICE TERMINE en {time.perf_counter() - start:.2f} s")
+    return [(variant, output_path) for variant, output_path, *_ in results]
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build de plusieurs variantes de Plume en une passe")
+    parser.add_argument('--variants', default=','.join(VARIANTS),
+                        help=f"variantes a construire, separees par des virgules ({', '.join(VARIANTS)})")
+    parser.add_argument('--processes', type=int, default=1,
+                        help="variantes assemblees en parallele (processus)")
+    parser.add_argument('--no-cache', action='store_true',
+                        help="ignore le cache incremental (build/.build-cache.pickle)")
+    parser.add_argument('--jobs', type=int, default=default_jobs(),
+                        help="nombre de fichiers lus en parallele (1 = sequentiel)")
+    parser.add_argument('--verbose', action='store_true',
+                        help="affiche la sortie console de chaque script")
+    args = parser.parse_args()
+
+    variants = [name.strip() for name in args.variants.split(',') if name.strip()]
+    unknown = [name for name in variants if name not in VARIANTS]
+    if unknown:
+        parser.error(f"variante inconnue: {', '.join(unknown)} (connues: {', '.join(VARIANTS)})")
+
+    results = build_matrix(list(dict.fromkeys(variants)), args.processes, not args.no_cache, args.jobs, args.verbose)
+    sys.exit(0 if all(output_path for _, output_path in results) else 1)
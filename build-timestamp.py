@@ -2,20 +2,46 @@
 """
 Script de build Plume
 Reconstruit le fichier HTML complet à partir des modules
-Usage: python3 build.py [--output fichier.html]
+Usage: python3 build-timestamp.py [--output fichier.html] [--store [--keep-last N] [--keep-days J]]
+       [--normalize-encodings] [--profile]
 """
 
 import os
 import sys
 import glob
+import argparse
 from datetime import datetime
 
+from buildtools.artifacts import ArtifactStore, log_prune_report
+from buildtools.bundle import write_chunks
+from buildtools.cache import hash_bytes
+from buildtools.encoding import EncodingCache
+from buildtools.phases import Profiler, log_profile_summary
+
 BUILD_DIR = os.path.dirname(os.path.abspath(__file__))
 LOG_FILE = os.path.join(BUILD_DIR, 'build.log')
 
 # Fichier log global
 log_handle = None
 
+# Dépôt d'artefacts adressé par contenu (--store), None si désactivé
+artifact_store = None
+
+# Variante inscrite dans l'index des artefacts (rétention séparée de build.light.py)
+ARTIFACT_VARIANT = 'timestamp'
+
+# Phases chronométrées du build courant (actif avec --profile)
+profiler = Profiler(enabled=False)
+
+# Sources partagées par build-matrix.py (None pour un build isolé)
+source_pool = None
+
+# Encodage détecté de chaque source (build/.encodings.json)
+encoding_cache = None
+
+# Fichiers lus pendant le build courant
+files_read = []
+
 def log(message):
     """Écrit un message dans la console ET dans le fichier log"""
     print(message)
@@ -90,30 +116,30 @@ JS_ORDER = [
     '45.arc-board.js'
 ]
 
+def decode_content(data, path):
+    """Décode le contenu brut d'un fichier (encodage détecté en une passe)"""
+    content, encoding = encoding_cache.decode(data, path)
+    if encoding != 'utf-8':
+        log(f"   [!] {path} lu en {encoding} (pas UTF-8)")
+    
+    # Mêmes fins de ligne qu'une lecture en mode texte
+    return content.replace('\r\n', '\n').replace('\r', '\n')
+
 def read_file(path):
-    """Lit un fichier et retourne son contenu, gère plusieurs encodages"""
+    """Lit un fichier et retourne son contenu (encodage détecté en une lecture)"""
     full_path = os.path.join(BUILD_DIR, path)
     if not os.path.exists(full_path):
         log(f"   [!] Fichier non trouve: {full_path}")
         return ''
     
-    # Essayer différents encodages
-    encodings = ['utf-8', 'cp1252', 'latin-1', 'iso-8859-1']
-    
-    for encoding in encodings:
-        try:
-            with open(full_path, 'r', encoding=encoding) as f:
-                content = f.read()
-                if encoding != 'utf-8':
-                    log(f"   [!] {path} lu en {encoding} (pas UTF-8)")
-                return content
-        except UnicodeDecodeError:
-            continue
-    
-    # Si aucun encodage ne fonctionne, lire en binaire et décoder avec erreurs ignorées
-    log(f"   [ERREUR] {path} - encodage inconnu, lecture forcee")
-    with open(full_path, 'rb') as f:
-        return f.read().decode('utf-8', errors='replace')
+    files_read.append(path)
+    if source_pool:
+        return source_pool.read(path)
+    with profiler.phase('Lecture fichier', path=path) as span:
+        if span:
+            span.count(files=1, bytes=os.path.getsize(full_path))
+        with open(full_path, 'rb') as f:
+            return decode_content(f.read(), path)
 
 def collect_css():
     """Collecte tous les fichiers CSS dans l'ordre"""
@@ -186,9 +212,55 @@ def collect_js():
     
     return '\n'.join(js_content)
 
-def build(output_file=None):
+def write_output(path, output):
+    """
+    Écrit le fichier HTML généré via un fichier temporaire : un nom publié par
+    --store est un lien physique vers un objet du dépôt, qui ne doit jamais
+    être modifié sur place.
+    """
+    write_chunks(path, [output])
+
+def store_output(output_path, output):
+    """Range la sortie dans le dépôt d'artefacts (si son contenu est nouveau) et la publie sous son nom"""
+    digest = hash_bytes(output.encode('utf-8'))
+    extension = os.path.splitext(output_path)[1]
+    object_name = artifact_store.object_name(digest, extension)
+    if artifact_store.store(digest, extension, lambda path: write_output(path, output)):
+        log(f"   [OK] Nouvel artefact: {object_name}")
+    else:
+        log(f"   [OK] Artefact {object_name} deja present, ecriture ignoree")
+    method = artifact_store.publish(digest, extension, output_path, ARTIFACT_VARIANT)
+    log(f"   [i] {os.path.basename(output_path)} -> {object_name} ({method})")
+
+def report_profile(output_path):
+    """Écrit la trace Chrome du build à côté du fichier généré et affiche le récapitulatif"""
+    log("--- Profil ---")
+    trace_path = os.path.splitext(output_path)[0] + '.trace.json'
+    log_profile_summary(profiler, log)
+    profiler.write_trace(trace_path)
+    log(f"   [OK] Trace: {trace_path} (chrome://tracing ou ui.perfetto.dev)")
+
+def report_encodings():
+    """Liste les fichiers lus qui ne sont pas en UTF-8"""
+    log("--- Encodages ---")
+    paths = list(dict.fromkeys(files_read))
+    non_utf8 = encoding_cache.non_utf8(paths)
+    if not non_utf8:
+        log(f"   [OK] {len(paths)} fichiers, tous en UTF-8")
+        return
+    log(f"   [!] {len(non_utf8)} fichiers ne sont pas en UTF-8 (a convertir):")
+    for path, encoding in non_utf8:
+        log(f"      - {path} ({encoding})")
+
+def build(output_file=None, store=False, keep_last=None, keep_days=None, profile=False,
+          normalize_encodings=False):
     """Construit le fichier HTML final"""
-    global log_handle
+    global log_handle, artifact_store, profiler, encoding_cache
+    profiler = Profiler(enabled=profile)
+    artifact_store = ArtifactStore(BUILD_DIR).load() if store else None
+    if encoding_cache is None:
+        encoding_cache = EncodingCache(BUILD_DIR).load()
+    files_read.clear()
     
     # Ouvrir le fichier log
     log_handle = open(LOG_FILE, 'w', encoding='utf-8')
@@ -206,19 +278,21 @@ def build(output_file=None):
     html_dir = os.path.join(BUILD_DIR, 'html')
     
     log("--- Verification des dossiers ---")
-    for d, name in [(css_dir, 'css'), (js_dir, 'js'), (html_dir, 'html')]:
-        if os.path.exists(d):
-            files = os.listdir(d)
-            log(f"   [OK] {name}/ existe ({len(files)} fichiers)")
-        else:
-            log(f"   [ERREUR] {name}/ N'EXISTE PAS!")
+    with profiler.phase('Verification des dossiers'):
+        for d, name in [(css_dir, 'css'), (js_dir, 'js'), (html_dir, 'html')]:
+            if os.path.exists(d):
+                files = os.listdir(d)
+                log(f"   [OK] {name}/ existe ({len(files)} fichiers)")
+            else:
+                log(f"   [ERREUR] {name}/ N'EXISTE PAS!")
     log("")
     
     # Lire les templates HTML
     log("--- Lecture des templates HTML ---")
-    head = read_file('html/head.html')
-    body = read_file('html/body.html')
-    footer = read_file('html/footer.html')
+    with profiler.phase('Lecture des templates'):
+        head = read_file('html/head.html')
+        body = read_file('html/body.html')
+        footer = read_file('html/footer.html')
     
     if not head:
         log("   [ERREUR] head.html est vide ou manquant!")
@@ -238,12 +312,14 @@ def build(output_file=None):
     
     # Collecter CSS et JS
     log("--- Collecte CSS ---")
-    css = collect_css()
+    with profiler.phase('Assemblage CSS'):
+        css = collect_css()
     log(f"   Total: {len(css):,} caracteres")
     log("")
     
     log("--- Collecte JavaScript ---")
-    js = collect_js()
+    with profiler.phase('Assemblage JS'):
+        js = collect_js()
     log(f"   Total: {len(js):,} caracteres")
     log("")
     
@@ -277,14 +353,26 @@ def build(output_file=None):
         return None
     
     try:
-        with open(output_path, 'w', encoding='utf-8') as f:
-            f.write(output)
+        with profiler.phase('Ecriture', bytes=len(output)):
+            if artifact_store:
+                store_output(output_path, output)
+            else:
+                write_output(output_path, output)
         log(f"   [OK] Fichier ecrit: {output_path}")
     except Exception as e:
         log(f"   [ERREUR] Ecriture: {e}")
         log_handle.close()
         return None
     
+    if artifact_store:
+        with profiler.phase('Retention des artefacts'):
+            log_prune_report(*artifact_store.prune(keep_last, keep_days, [output_file], variant=ARTIFACT_VARIANT), log)
+            artifact_store.save()
+    
+    if normalize_encodings:
+        report_encodings()
+    encoding_cache.save()
+    
     # Vérifier que le fichier existe
     if os.path.exists(output_path):
         size = os.path.getsize(output_path)
@@ -298,6 +386,8 @@ def build(output_file=None):
         log("")
         log(f"[ERREUR] Le fichier n'a pas ete cree!")
     
+    if profile:
+        report_profile(output_path)
     log_handle.close()
     return output_path
 
@@ -309,20 +399,30 @@ if __name__ == "__main__":
     # Nom de fichier par défaut avec horodatage
     default_output = f'plume-build-{timestamp}.html'
     
-    # Déterminer le nom de fichier de sortie
-    output = default_output
+    parser = argparse.ArgumentParser(description="Build Plume horodate")
+    parser.add_argument('--output', default=default_output, help="nom du fichier genere dans build/")
+    parser.add_argument('--store', action='store_true',
+                        help="range la sortie par hash dans build/.artifacts (nom horodate = lien physique)")
+    parser.add_argument('--keep-last', type=int,
+                        help="avec --store, ne garde que les N derniers fichiers generes")
+    parser.add_argument('--keep-days', type=float,
+                        help="avec --store, ne garde que les fichiers generes depuis J jours")
+    parser.add_argument('--normalize-encodings', action='store_true',
+                        help="liste les fichiers sources qui ne sont pas en UTF-8")
+    parser.add_argument('--profile', action='store_true',
+                        help="chronometre chaque phase (trace Chrome build/*.trace.json et recapitulatif)")
+    args = parser.parse_args()
     
-    # Vérifier si l'utilisateur a fourni un nom de fichier via l'argument --output
-    if len(sys.argv) > 2 and sys.argv[1] == '--output':
-        # Utiliser le nom fourni par l'utilisateur
-        output = sys.argv[2]
+    # Déterminer le nom de fichier de sortie
+    output = args.output
         
     # La fonction log n'est pas encore initialisée ici, on utilise print (la fonction log est initialisée DANS build())
     print(f"Fichier de sortie déterminé: {output}") 
         
     try:
         # Appeler la fonction build avec le nom de fichier déterminé
-        build(output)
+        build(output, store=args.store, keep_last=args.keep_last, keep_days=args.keep_days,
+              profile=args.profile, normalize_encodings=args.normalize_encodings)
     except Exception as e:
         # En cas d'erreur, écrire dans le log
         with open(LOG_FILE, 'a', encoding='utf-8') as f:
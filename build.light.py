@@ -2,21 +2,128 @@
 """
 Script de build Plume LIGHT
 Basé sur build.test.py, retire les modules Storygrid et Thriller.
-Usage: python3 build.light.py [--output fichier.html]
+L'ordre des fichiers est celui de la variante "light" de build-manifest.json.
+Usage: python3 build.light.py [--output fichier.html] [--no-cache] [--watch] [--jobs N]
+       [--normalize-encodings] [--minify] [--optimize-css] [--auto-order] [--tree-shake]
+       [--lazy-chunks] [--pack-synonyms] [--precompile-tension] [--compact-html [--hoist-styles]]
+       [--defer-modals]
+       [--compress [--gzip-level N] [--xz-level N]]
+       [--size-report [--size-budget OCTETS] [--size-top N]] [--profile]
+       [--store [--keep-last N] [--keep-days J]]
 """
 
 import os
 import sys
-import glob
-import re
+import argparse
 from datetime import datetime
 
+from buildtools.cache import BuildCache
+from buildtools.manifest import load as load_manifest
+from buildtools.encoding import EncodingCache
+from buildtools.bundle import hash_chunks, join_lines, joined_length, write_chunks
+from buildtools.watch import watch
+from buildtools.jsmin import JSMIN_VERSION, minify as minify_js
+from buildtools.compress import DEFAULT_LEVELS, precompress, log_compression_report
+from buildtools.depgraph import DEPSCAN_VERSION, DependencyGraph, log_graph_report, scan as scan_js
+from buildtools.treeshake import TREESHAKE_VERSION, html_handlers, live_functions, root_modules, shake
+from buildtools.treeshake import scan as scan_functions
+from buildtools.tension import MODEL_PATH as TENSION_MODEL, check_lists, list_paths, matcher_source, parse_list
+from buildtools.synpack import SYNPACK_VERSION, pack_source as pack_synonyms
+from buildtools.chunks import CHUNK_ID_PREFIX, escape_script, loader_source, plan_chunks, stub_source
+from buildtools.cssmin import CSSMIN_VERSION, UsageIndex, html_words, js_words, optimize as optimize_css
+from buildtools.report import log_size_table
+from buildtools.htmlstrip import HTMLSTRIP_VERSION, log_strip_report, strip_features
+from buildtools.features import FEATURES_VERSION, FLAGS_PATH, flags_source, fold as fold_features
+from buildtools.htmlmin import compact as compact_html
+from buildtools.templates import defer_views, log_views_report, plan_views, runtime_source
+from buildtools.artifacts import ArtifactStore, log_prune_report
+from buildtools.phases import Profiler, log_profile_summary
+from buildtools.sizes import DEFAULT_TOP, SizeHistory, gzip_size, log_size_report, make_record, measure_segments
+from buildtools.parallel import default_jobs, ordered_map
+
 BUILD_DIR = os.path.dirname(os.path.abspath(__file__))
 LOG_FILE = os.path.join(BUILD_DIR, 'build.light.log')
 
+# Variante du manifeste de build (build-manifest.json)
+VARIANT = 'light'
+
 # Fichier log global
 log_handle = None
 
+# Manifeste de build, rechargé à chaque build (prise en compte en --watch)
+build_manifest = None
+
+# Cache incrémental des sources (None si désactivé)
+build_cache = None
+
+# Encodage détecté de chaque source (build/.encodings.json)
+encoding_cache = None
+
+# Fichiers lus pendant le build courant
+files_read = []
+
+# Sources partagées par build-matrix.py (None pour un build isolé)
+source_pool = None
+
+# Nombre de lectures de fichiers simultanées (1 = séquentiel)
+read_jobs = default_jobs()
+
+# Étape de minification (--minify)
+minify_enabled = False
+
+# Ordre des JS calculé par le graphe de dépendances (--auto-order)
+auto_order_enabled = False
+
+# Retrait des fonctions JS inatteignables (--tree-shake)
+tree_shake_enabled = False
+
+# Chunks du manifeste chargés à la demande (--lazy-chunks)
+lazy_chunks_enabled = False
+
+# Dictionnaire de synonymes compacté au build (--pack-synonyms)
+pack_synonyms_enabled = False
+SYNONYMS_DICTIONARY = 'js-refactor/synonyms/synonyms.dictionary.js'
+
+# Trie des mots de tension précompilé depuis mots de tension/*.txt (--precompile-tension)
+precompile_tension_enabled = False
+
+# Template HTML compacté : commentaires, espaces, guillemets (--compact-html)
+compact_html_enabled = False
+
+# Styles inline répétés changés en classes !important, avec --compact-html (--hoist-styles)
+hoist_styles_enabled = False
+
+# Modales du manifeste ("defer") placées dans des <template>, instanciées à l'ouverture (--defer-modals)
+defer_modals_enabled = False
+
+# Tailles par module et par groupe, historique et budget (--size-report)
+size_report_enabled = False
+
+# Segments écrits dans le bundle [(type, chemin, contenu)], mesurés par --size-report
+size_segments = []
+
+# Dépassements du budget de taille au dernier build (code de sortie non nul)
+budget_overruns = []
+
+# Phases chronométrées du build courant (actif avec --profile)
+profiler = Profiler(enabled=False)
+
+# Dépôt d'artefacts adressé par contenu (--store), None si désactivé
+artifact_store = None
+
+# Segments assemblés au dernier build, gardés en mémoire en mode --watch :
+# un rebuild ne relit et ne retraite que les modules modifiés
+assembly = None
+
+# Position de chaque module dans les lignes assemblées {chemin: (type, index, libellé)}
+segment_positions = {}
+
+# Classes et ids ajoutés dynamiquement sans apparaître en toutes lettres dans
+# le HTML ni dans les chaînes JS : jamais purgés par --optimize-css
+CSS_KEEP_SELECTORS = [
+    r'^driver-',  # classes composées par vendor/driver.js
+]
+
 def log(message):
     """Écrit un message dans la console ET dans le fichier log"""
     print(message)
@@ -24,510 +131,734 @@ def log(message):
         log_handle.write(message + '\n')
         log_handle.flush()
 
-# Ordre des fichiers CSS
-CSS_ORDER = [
-    # Vendor CSS (bundled)
-    '../vendor/driver.css',
-    '01.variables.css',
-    '02.base.css',
-    '03.header.css',
-    '04.sidebar.css',
-    '05.modals.css',
-    '06.editor.css',
-    '07.characters.css',
-    '08.visualizations.css',
-    '09.utilities.css',
-    '10.mobile.css',
-    '15.colorpalette.css',
-    'undo-redo.css',
-    '12.arc-board.css',
-    '14.word-repetition.css' ,
-    '14.product-tour.css' ,
-]
-
-# Ordre des fichiers JS
-JS_ORDER = [
-    # Vendor libraries (bundled)
-    'vendor/driver.js.iife.js',
-    'vendor/idb.js',
-    'js-refactor/01.app.refactor.js',
-    # Tension Module
-    'js-refactor/tension/tension.model.js',
-    'js-refactor/tension/tension.repository.js',
-    'js-refactor/tension/tension.viewmodel.js',
-    'js-refactor/tension/tension.view.js',
-    'js-refactor/tension/tension.handlers.js',
-    'js-refactor/tension/tension.main.js',
-    # Storage Module
-    'js-refactor/storage/storage.model.js',
-    'js-refactor/storage/storage.repository.js',
-    'js-refactor/storage/storage.viewmodel.js',
-    'js-refactor/storage/storage.view.js',
-    'js-refactor/storage/storage.main.js',
-    'js-refactor/project/project.model.js',
-    'js-refactor/project/project.repository.js',
-    'js-refactor/project/project.viewmodel.js',
-    'js-refactor/project/project.view.js',
-    'js-refactor/project/project.handlers.js',
-    'js-refactor/project/project.main.js',
-    # Floating Editor Module
-    'js-refactor/floating-editor/floating-editor.model.js',
-    'js-refactor/floating-editor/floating-editor.repository.js',
-    'js-refactor/floating-editor/floating-editor.view.js',
-    'js-refactor/floating-editor/floating-editor.viewmodel.js',
-    'js-refactor/floating-editor/floating-editor.handlers.js',
-    'js-refactor/floating-editor/floating-editor.main.js',
-    '04.init.js',
-    'js-refactor/undo-redo/undo-redo.model.js',
-    'js-refactor/undo-redo/undo-redo.repository.js',
-    'js-refactor/undo-redo/undo-redo.viewmodel.js',
-    'js-refactor/undo-redo/undo-redo.view.js',
-    'js-refactor/undo-redo/undo-redo.handlers.js',
-    'js-refactor/undo-redo/undo-redo.main.js',
-    # Structure refactored files 1/2
-    'js-refactor/structure/structure.model.js',
-    'js-refactor/structure/structure.repository.js',
-    'js-refactor/structure/structure.viewmodel.js',
-    # App
-    'js-refactor/00.app.view.js',
-    # Structure refactored files 2/2
-    'js-refactor/structure/structure.view.js',
-    'js-refactor/structure/structure-organizer.view.js',
-    'js-refactor/structure/structure.helpers.js',
-    'js-refactor/stats/stats.model.js',
-    'js-refactor/stats/stats.repository.js',
-    'js-refactor/stats/stats.viewmodel.js',
-    'js-refactor/stats/stats.view.js',
-    'js-refactor/stats/stats.main.js',
-    'js-refactor/auto-detect/auto-detect.model.js',
-    'js-refactor/auto-detect/auto-detect.repository.js',
-    'js-refactor/auto-detect/auto-detect.viewmodel.js',
-    'js-refactor/auto-detect/auto-detect.view.js',
-    'js-refactor/auto-detect/auto-detect.handlers.js',
-    'js-refactor/auto-detect/auto-detect.main.js',
-    'js-refactor/colorpalette/color-palette.model.js',
-    'js-refactor/colorpalette/color-palette.repository.js',
-    'js-refactor/colorpalette/color-palette.viewmodel.js',
-    'js-refactor/colorpalette/color-palette.view.js',
-    'js-refactor/colorpalette/color-palette.handlers.js',
-    'js-refactor/colorpalette/color-palette.main.js',
-    # Mobile Menu refactored files (order: model -> repository -> viewmodel -> view -> main)
-    'js-refactor/mobile-menu/mobile-menu.model.js',
-    'js-refactor/mobile-menu/mobile-menu.repository.js',
-    'js-refactor/mobile-menu/mobile-menu.viewmodel.js',
-    'js-refactor/mobile-menu/mobile-menu.view.js',
-    'js-refactor/mobile-menu/mobile-menu.main.js',
-    # Drag and Drop Acts Module
-    'js-refactor/dragndrop-acts/dragndrop-acts.model.js',
-    'js-refactor/dragndrop-acts/dragndrop-acts.repository.js',
-    'js-refactor/dragndrop-acts/dragndrop-acts.viewmodel.js',
-    'js-refactor/dragndrop-acts/dragndrop-acts.view.js',
-    'js-refactor/dragndrop-acts/dragndrop-acts.handlers.js',
-    'js-refactor/dragndrop-acts/dragndrop-acts.main.js',
-    # Characters refactored files 
-    'js-refactor/characters/characters.model.js',
-    'js-refactor/characters/characters.repository.js',
-    'js-refactor/characters/characters.viewmodel.js',
-    'js-refactor/characters/characters.view.js',
-    # Split View Module
-    'js-refactor/splitview/splitview.model.js',
-    'js-refactor/splitview/splitview.repository.js',
-    'js-refactor/splitview/splitview.viewmodel.js',
-    'js-refactor/splitview/splitview.view.js',
-    'js-refactor/splitview/splitview.coordinator.js',
-    'js-refactor/splitview/splitview.handlers.js',
-    'js-refactor/splitview/splitview.main.js',
-    # World refactored files 
-    'js-refactor/world/world.model.js',
-    'js-refactor/world/world.repository.js',
-    'js-refactor/world/world.viewmodel.js',
-    'js-refactor/world/world.view.js',
-    '18.timeline.js',
-    'js-refactor/notes/notes.model.js',
-    'js-refactor/notes/notes.repository.js',
-    'js-refactor/notes/notes.viewmodel.js',
-    'js-refactor/notes/notes.view.js',
-    'js-refactor/notes/notes.handlers.js',
-    'js-refactor/notes/notes.main.js',
-    # Snapshots refactored files (order: model -> repository -> viewmodel -> view -> main)
-    'js-refactor/snapshots/snapshots.model.js',
-    'js-refactor/snapshots/snapshots.repository.js',
-    'js-refactor/snapshots/snapshots.viewmodel.js',
-    'js-refactor/snapshots/snapshots.view.js',
-    'js-refactor/snapshots/snapshots.main.js',
-    'js-refactor/sceneVersion/sceneVersion.model.js',
-    'js-refactor/sceneVersion/sceneVersion.repository.js',
-    'js-refactor/sceneVersion/sceneVersion.viewmodel.js',
-    'js-refactor/sceneVersion/sceneVersion.view.js',
-    'js-refactor/sceneVersion/sceneVersion.main.js',
-    # Diff refactored files
-    'js-refactor/diff/diff.model.js',
-    'js-refactor/diff/diff.repository.js',
-    'js-refactor/diff/diff.viewmodel.js',
-    'js-refactor/diff/diff.view.js',
-    'js-refactor/diff/diff.handlers.js',
-    'js-refactor/diff/diff.main.js',
-    # Codex refactored files
-    'js-refactor/codex/codex.model.js',
-    'js-refactor/codex/codex.repository.js',
-    'js-refactor/codex/codex.viewmodel.js',
-    'js-refactor/codex/codex.view.js',
-    # Search refactored files (order: model -> repository -> viewmodel -> view -> handlers -> main)
-    'js-refactor/search/search.model.js',
-    'js-refactor/search/search.repository.js',
-    'js-refactor/search/search.viewmodel.js',
-    'js-refactor/search/search.view.js',
-    'js-refactor/search/search.handlers.js',
-    'js-refactor/search/search.main.js',
-    # Focus Mode refactored files
-    'js-refactor/focusMode/focusMode.model.js',
-    'js-refactor/focusMode/focusMode.repository.js',
-    'js-refactor/focusMode/focusMode.viewmodel.js',
-    'js-refactor/focusMode/focusMode.view.js',
-    'js-refactor/focusMode/focusMode.handlers.js',
-    'js-refactor/focusMode/focusMode.main.js',
-    # Keyboard Shortcuts refactored files (order: model -> repository -> viewmodel -> view -> handlers -> main)
-    'js-refactor/keyboard-shortcuts/keyboard-shortcuts.model.js',
-    'js-refactor/keyboard-shortcuts/keyboard-shortcuts.repository.js',
-    'js-refactor/keyboard-shortcuts/keyboard-shortcuts.viewmodel.js',
-    'js-refactor/keyboard-shortcuts/keyboard-shortcuts.view.js',
-    'js-refactor/keyboard-shortcuts/keyboard-shortcuts.handlers.js',
-    'js-refactor/keyboard-shortcuts/keyboard-shortcuts.main.js',
-    'js-refactor/revision/revision.model.js',
-    'js-refactor/revision/revision.repository.js',
-    'js-refactor/revision/revision.viewmodel.js',
-    'js-refactor/revision/revision.view.js',
-    'js-refactor/revision/revision.handlers.js',
-    'js-refactor/revision/revision.main.js',
-    # Todo refactored files (order: model -> repository -> viewmodel -> view -> handlers -> main)
-    'js-refactor/todo/todo.model.js',
-    'js-refactor/todo/todo.repository.js',
-    'js-refactor/todo/todo.viewmodel.js',
-    'js-refactor/todo/todo.view.js',
-    'js-refactor/todo/todo.handlers.js',
-    'js-refactor/todo/todo.main.js',
-    # Corkboard refactored files (order: model -> repository -> viewmodel -> view -> handlers -> main)
-    'js-refactor/corkboard/corkboard.model.js',
-    'js-refactor/corkboard/corkboard.repository.js',
-    'js-refactor/corkboard/corkboard.viewmodel.js',
-    'js-refactor/corkboard/corkboard.view.js',
-    'js-refactor/corkboard/corkboard.handlers.js',
-    'js-refactor/corkboard/corkboard.main.js',
-    # Mindmap refactored files (order: model -> repository -> viewmodel -> view -> handlers -> main)
-    'js-refactor/mindmap/mindmap.model.js',
-    'js-refactor/mindmap/mindmap.repository.js',
-    'js-refactor/mindmap/mindmap.viewmodel.js',
-    'js-refactor/mindmap/mindmap.view.js',
-    'js-refactor/mindmap/mindmap.handlers.js',
-    'js-refactor/mindmap/mindmap.main.js',
-    # Plot module refactored files
-    'js-refactor/plot/plot.model.js',
-    'js-refactor/plot/plot.repository.js',
-    'js-refactor/plot/plot.viewmodel.js',
-    'js-refactor/plot/plot.view.js',
-    'js-refactor/plot/plot.init.js',
-    'js-refactor/relation-map/relation-map.model.js',
-    'js-refactor/relation-map/relation-map.repository.js',
-    'js-refactor/relation-map/relation-map.viewmodel.js',
-    'js-refactor/relation-map/relation-map.view.js',
-    'js-refactor/relation-map/relation-map.handlers.js',
-    'js-refactor/relation-map/relation-map.main.js',
-    'js-refactor/map/map.model.js',
-    'js-refactor/map/map.repository.js',
-    'js-refactor/map/map.viewmodel.js',
-    'js-refactor/map/map.view.js',
-    'js-refactor/map/map.handlers.js',
-    'js-refactor/map/map.main.js',
-    'js-refactor/timeline-metro/timeline-metro.model.js',
-    'js-refactor/timeline-metro/timeline-metro.repository.js',
-    'js-refactor/timeline-metro/timeline-metro.viewmodel.js',
-    'js-refactor/timeline-metro/timeline-metro.view.js',
-    'js-refactor/timeline-metro/timeline-metro.handlers.js',
-    'js-refactor/timeline-metro/timeline-metro.main.js',
-    'js-refactor/theme-manager/theme-manager.model.js',
-    'js-refactor/theme-manager/theme-manager.repository.js',
-    'js-refactor/theme-manager/theme-manager.viewmodel.js',
-    'js-refactor/theme-manager/theme-manager.view.js',
-    'js-refactor/theme-manager/theme-manager.main.js',
-    # Import/Export Module
-    'js-refactor/import-export/import-export.model.js',
-    'js-refactor/import-export/import-export.repository.js',
-    'js-refactor/import-export/google-drive.service.js',
-    'js-refactor/import-export/import-export.viewmodel.js',
-    'js-refactor/import-export/import-export.view.js',
-    'js-refactor/import-export/import-export.handlers.js',
-    'js-refactor/import-export/import-export.main.js',
-    # Sidebar View Module
-    'js-refactor/sidebar-view/sidebar-view.model.js',
-    'js-refactor/sidebar-view/sidebar-view.repository.js',
-    'js-refactor/sidebar-view/sidebar-view.viewmodel.js',
-    'js-refactor/sidebar-view/sidebar-view.view.js',
-    'js-refactor/sidebar-view/sidebar-view.main.js',
-    # Storage Monitoring Refactored Module
-    'js-refactor/storageMonitoring/storageMonitoring.model.js',
-    'js-refactor/storageMonitoring/storageMonitoring.repository.js',
-    'js-refactor/storageMonitoring/storageMonitoring.viewmodel.js',
-    'js-refactor/storageMonitoring/storageMonitoring.view.js',
-    'js-refactor/storageMonitoring/storageMonitoring.main.js',
-    # Mobile Swipe refactored files
-    'js-refactor/mobile-swipe/mobile-swipe.model.js',
-    'js-refactor/mobile-swipe/mobile-swipe.repository.js',
-    'js-refactor/mobile-swipe/mobile-swipe.viewmodel.js',
-    'js-refactor/mobile-swipe/mobile-swipe.view.js',
-    'js-refactor/mobile-swipe/mobile-swipe.handlers.js',
-    'js-refactor/mobile-swipe/mobile-swipe.main.js',
-    # '44.storygrid.js',  # RETIRÉ pour version Light
-    # Arc Board
-    'js-refactor/arc-board/arc-board.config.js',
-    'js-refactor/arc-board/arc-board.models.js',
-    'js-refactor/arc-board/arc-board.repository.js',
-    'js-refactor/arc-board/arc-board.viewmodel.js',
-    'js-refactor/arc-board/arc-board.services.js',
-    'js-refactor/arc-board/arc-board.views.js',
-    'js-refactor/arc-board/arc-board.handlers.js',
-    'js-refactor/arc-board/arc-board.main.js',
-    # Plot Grid Module
-    'js-refactor/plotgrid/plot-grid.model.js',
-    'js-refactor/plotgrid/plot-grid.repository.js',
-    'js-refactor/plotgrid/plot-grid.viewmodel.js',
-    'js-refactor/plotgrid/plot-grid.import-export.js',
-    'js-refactor/plotgrid/plot-grid.view.js',
-    # Scene Navigation Module
-    'js-refactor/sceneNavigation/scene-navigation.model.js',
-    'js-refactor/sceneNavigation/scene-navigation.repository.js',
-    'js-refactor/sceneNavigation/scene-navigation.viewmodel.js',
-    'js-refactor/sceneNavigation/scene-navigation.view.js',
-    'js-refactor/sceneNavigation/scene-navigation.handlers.js',
-    'js-refactor/sceneNavigation/scene-navigation.main.js',
-    # Synonyms Module (French synonyms dictionary - local)
-    'js-refactor/synonyms/synonyms.config.js',
-    'js-refactor/synonyms/synonyms.model.js',
-    'js-refactor/synonyms/synonyms.dictionary.js',
-    'js-refactor/synonyms/synonyms.service.js',
-    'js-refactor/synonyms/synonyms.repository.js',
-    'js-refactor/synonyms/synonyms.viewmodel.js',
-    'js-refactor/synonyms/synonyms.view.js',
-    # Import Chapter Module (import .docx, .txt, .md, .epub, .pages)
-    'js-refactor/import-chapter/import-chapter.model.js',
-    'js-refactor/import-chapter/import-chapter.viewmodel.js',
-    'js-refactor/import-chapter/import-chapter.view.js',
-    # Word Repetition Analyzer Module
-    'js-refactor/word-repetition/word-repetition.model.js',
-    'js-refactor/word-repetition/word-repetition.repository.js',
-    'js-refactor/word-repetition/word-repetition.viewmodel.js',
-    'js-refactor/word-repetition/word-repetition.view.js',
-    'js-refactor/word-repetition/word-repetition.handlers.js',
-    'js-refactor/word-repetition/word-repetition.main.js',
-    # Product tour
-    'js-refactor/product-tour/product-tour.model.js',
-    'js-refactor/product-tour/product-tour.repository.js',
-    'js-refactor/product-tour/product-tour.viewmodel.js',
-    'js-refactor/product-tour/product-tour.view.js',
-    'js-refactor/product-tour/product-tour.handlers.js',
-    'js-refactor/product-tour/product-tour.main.js',
-]
+def decode_content(data, path):
+    """Décode le contenu brut d'un fichier (encodage détecté en une passe)"""
+    with profiler.phase('Decodage', path=path, bytes=len(data)):
+        content, _encoding = encoding_cache.decode(data, path)
+    # Mêmes fins de ligne qu'une lecture en mode texte
+    return content.replace('\r\n', '\n').replace('\r', '\n')
 
 def read_file(path):
-    """Lit un fichier et retourne son contenu, gère plusieurs encodages"""
+    """Lit un fichier et retourne son contenu (via le cache si actif)"""
     full_path = os.path.join(BUILD_DIR, path)
     if not os.path.exists(full_path):
         log(f"   [!] Fichier non trouve: {full_path}")
         return ''
     
-    encodings = ['utf-8', 'cp1252', 'latin-1', 'iso-8859-1']
-    for encoding in encodings:
-        try:
-            with open(full_path, 'r', encoding=encoding) as f:
-                content = f.read()
-                return content
-        except UnicodeDecodeError:
-            continue
-    
-    with open(full_path, 'rb') as f:
-        return f.read().decode('utf-8', errors='replace')
+    files_read.append(path)
+    if source_pool:
+        return source_pool.read(path)
+    with profiler.phase('Lecture fichier', path=path) as span:
+        if build_cache:
+            content = build_cache.read(path, decode_content)
+        else:
+            with open(full_path, 'rb') as f:
+                content = decode_content(f.read(), path)
+        if span:
+            span.count(files=1, bytes=os.path.getsize(full_path))
+    return content
 
-def collect_css():
-    """Collecte tous les fichiers CSS dans l'ordre"""
-    css_content = []
-    css_dir = os.path.join(BUILD_DIR, 'css')
-    found_count = 0
+def resolve_css():
+    """Retourne la liste ordonnée (chemin, libellé) des fichiers CSS"""
+    return build_manifest.resolve(VARIANT, 'css').entries
+
+def read_files(paths):
+    """Lit plusieurs fichiers en parallèle, résultats dans l'ordre donné"""
+    return ordered_map(read_file, paths, read_jobs)
+
+def derive_content(path, content, key, func):
+    """
+    func(content), mis en cache quand `content` est le source tel que lu
+    (un segment déjà transformé, par --tree-shake, est traité sans cache)
+    """
+    if build_cache and path in build_cache.sources and build_cache.sources[path]['content'] is content:
+        return build_cache.derive(path, key, func)
+    return func(content)
+
+def minify_contents(entries, contents, title, minifier, cache_key):
+    """Minifie chaque segment (résultat mis en cache) et affiche le gain par module"""
+    log(f"--- Minification {title} ---")
+    result = []
+    rows = []
+    for (path, label), content in zip(entries, contents):
+        minified = derive_content(path, content, cache_key, minifier)
+        rows.append((label, len(content), len(minified)))
+        result.append(minified)
+    log_size_table(rows, log)
+    return result
+
+def build_usage_index(html_parts):
+    """Index des mots utilisés par le HTML et les chaînes du JS (pour --optimize-css)"""
+    usage = UsageIndex(CSS_KEEP_SELECTORS)
+    for html in html_parts:
+        usage.add_words(html_words(html))
+    ordered, extra = resolve_js()
+    paths = [path for path, _ in ordered + extra]
+    for path, content in zip(paths, read_files(paths)):
+        usage.add_words(derive_content(path, content, f'jswords-{CSSMIN_VERSION}', js_words))
+    return usage
+
+def optimize_css_contents(entries, contents, usage):
+    """Purge les sélecteurs morts et minifie chaque feuille, affiche le gain par fichier"""
+    log("--- Optimisation CSS ---")
+    result = []
+    rows = []
+    removed_count = 0
+    for (_, label), content in zip(entries, contents):
+        removed = []
+        optimized = optimize_css(content, usage, removed)
+        removed_count += len(removed)
+        rows.append((f"{label} (-{len(removed)} sel.)" if removed else label, len(content), len(optimized)))
+        result.append(optimized)
+    log_size_table(rows, log)
+    log(f"   [i] {removed_count} selecteurs sans classe/id utilise retires")
+    return result
+
+def collect_css(usage=None):
+    """
+    Collecte tous les fichiers CSS dans l'ordre, retourne la liste des lignes du bloc <style>.
+    Avec un index d'usage (--optimize-css), les feuilles sont purgées et minifiées.
+    """
+    entries = resolve_css()
+    contents = read_files([path for path, _ in entries])
+    if usage:
+        with profiler.phase('Optimisation CSS', files=len(entries)):
+            contents = optimize_css_contents(entries, contents, usage)
     
-    for filename in CSS_ORDER:
-        if filename.startswith('../vendor/'):
-            # Vendor CSS files (bundled libraries)
-            vendor_path = filename.replace('../', '')
-            filepath = os.path.join(BUILD_DIR, vendor_path)
-            if os.path.exists(filepath):
-                content = read_file(vendor_path)
-                css_content.append(f'/* ========== {vendor_path} ========== */')
-                css_content.append(content)
-                css_content.append('')
-                found_count += 1
-        else:
-            filepath = os.path.join(css_dir, filename)
-            if os.path.exists(filepath):
-                content = read_file(f'css/{filename}')
-                css_content.append(f'/* ========== {filename} ========== */')
-                css_content.append(content)
-                css_content.append('')
-                found_count += 1
+    if size_report_enabled:
+        size_segments.extend(('css', path, content) for (path, _), content in zip(entries, contents))
     
-    # Ensuite les fichiers non listés (sauf Storygrid)
-    for filepath in glob.glob(os.path.join(css_dir, '*.css')):
-        filename = os.path.basename(filepath)
-        if filename not in CSS_ORDER and filename != '11.storygrid.css':
-            content = read_file(f'css/{filename}')
-            css_content.append(f'/* ========== {filename} ========== */')
-            css_content.append(content)
-            css_content.append('')
-            found_count += 1
+    css_content = []
+    for (path, label), content in zip(entries, contents):
+        css_content.append(f'/* ========== {label} ========== */')
+        segment_positions[path] = ('css', len(css_content), label)
+        css_content.append(content)
+        css_content.append('')
+
+    log(f"   [OK] {len(entries)} fichiers CSS trouves")
+    return css_content
+
+def resolve_js():
+    """Retourne les listes (chemin, libellé) des fichiers JS ordonnés et supplémentaires"""
+    resolved = build_manifest.resolve(VARIANT, 'js')
+    globbed = set(resolved.globbed)
+    ordered = [entry for entry in resolved.entries if entry[0] not in globbed]
+    extra = [entry for entry in resolved.entries if entry[0] in globbed]
+    return ordered, extra
+
+def order_by_dependencies(entries, contents):
+    """Réordonne les modules selon le graphe de dépendances, affiche le diagnostic"""
+    log("--- Dependances JS ---")
+    scans = []
+    for (path, _), content in zip(entries, contents):
+        scans.append((path, derive_content(path, content, f'depscan-{DEPSCAN_VERSION}', scan_js)))
+    graph = DependencyGraph(scans)
+    log_graph_report(graph, log)
     
-    # Ajouter les CSS des modules dans js-refactor/
-    module_css_files = [
-        'js-refactor/synonyms/synonyms.css',
-        'js-refactor/map/map.css',
-        'js-refactor/keyboard-shortcuts/keyboard-shortcuts.css'
-    ]
-    for css_path in module_css_files:
-        filepath = os.path.join(BUILD_DIR, css_path)
-        if os.path.exists(filepath):
-            content = read_file(css_path)
-            css_content.append(f'/* ========== {css_path} ========== */')
-            css_content.append(content)
-            css_content.append('')
-            found_count += 1
-
-    log(f"   [OK] {found_count} fichiers CSS trouves")
-    return '\n'.join(css_content)
-
-# Fichiers originaux à ignorer (déjà refactorisés ou retirés)
-IGNORED_ORIGINALS = [
-    '_01.app.js', '_03.project.js', '_05.undo-redo.js', '_06.structure.js', '_07.stats.js', 
-    '_08.auto-detect.js', '_09.floating-editor.js', '_10.colorpalette.js', '_11.updateStats.js',
-    '_15.characters.js', '_16.split-view.js', '_17.world.js', '_19.notes.js', '_21.sceneVersions.js', '_22.diff.js', 
-    '_23.stats.js', '_24.codex.js', '_25.globalSearch.js', '_26.focusMode.js', 
-    '_26.focusMode.refactor.js', 
-    '_28.revision.js', '_29.todos.js', '_30.corkboard.js', '_30.corkboard.refactor.js', 
-    '_31.mindmap.js', '_32.touch-events.js',
-    '_33.plot.js', '_34.relations-graph.js', '_35.renderMap.js', '_36.timeline-metro.js', '_43.arcs.js', '_44.storygrid.js', 
-    '_45.arc-board.js', '_45.arc-board.refactor.js', '_46.thriller-board.js', '38.tension.js', '40.sidebar-views.js',
-    '12.import-export.js', '39.export.js', '41.storageMonitoring.js', '02.storage.js', '20.snapshots.js', '13.mobile-menu.js',
-    '27.keyboardShortcuts.js', '42.mobile-swipe.js', '14.dragndrop-acts.js'
-]
+    position = {path: i for i, (path, _) in enumerate(entries)}
+    order = [position[path] for path in graph.topological_order()]
+    moved = sum(1 for i, index in enumerate(order) if i != index)
+    if moved:
+        log(f"   [i] {moved} modules deplaces par l'ordre calcule")
+    return [entries[i] for i in order], [contents[i] for i in order]
 
-def collect_js():
-    """Collecte tous les fichiers JS dans l'ordre"""
-    js_content = []
-    found_count = 0
+def pack_synonyms_contents(entries, contents):
+    """Remplace le littéral du dictionnaire de synonymes par sa forme compacte"""
+    log("--- Dictionnaire de synonymes ---")
+    result = list(contents)
+    for i, ((path, label), content) in enumerate(zip(entries, contents)):
+        if path != SYNONYMS_DICTIONARY:
+            continue
+        try:
+            result[i] = derive_content(path, content, f'synpack-{SYNPACK_VERSION}', pack_synonyms)
+        except ValueError as e:
+            log(f"   [!] {label}: dictionnaire non compacte ({e})")
+            return contents
+        before = gzip_size(content.encode('utf-8'))
+        after = gzip_size(result[i].encode('utf-8'))
+        log(f"   [OK] {label}: {len(content):,} -> {len(result[i]):,} caracteres, "
+            f"gzip {before:,} -> {after:,} octets, decode au premier acces")
+        return result
+    log(f"   [!] {SYNONYMS_DICTIONARY} absent de la variante")
+    return contents
+
+def fold_module(path, content, flags):
+    """Module sans le code des fonctionnalités à false (ValueError si non traité)"""
+    cache_key = f"features-{FEATURES_VERSION}-" + ','.join(f"{name}={int(on)}" for name, on in flags.items())
+    folded, _counts = derive_content(path, content, cache_key, lambda src: fold_features(src, flags))
+    if path == FLAGS_PATH:
+        folded = flags_source(folded, flags)
+    return folded
+
+def fold_feature_contents(entries, contents):
+    """Retire le code JS des fonctionnalités absentes de la variante (PLUME_FEATURES à false)"""
+    log("--- Fonctionnalites retirees ---")
+    flags = build_manifest.feature_flags(VARIANT)
+    result = list(contents)
+    removed = modules = 0
+    for i, ((path, label), content) in enumerate(zip(entries, contents)):
+        try:
+            folded = fold_module(path, content, flags)
+        except ValueError as e:
+            log(f"   [!] {label}: non traite ({e})")
+            continue
+        if folded != content:
+            result[i] = folded
+            removed += len(content) - len(folded)
+            modules += 1
+    if FLAGS_PATH not in {path for path, _ in entries}:
+        log(f"   [!] {FLAGS_PATH} absent de la variante")
+    absent = ', '.join(name for name, on in flags.items() if not on)
+    log(f"   [OK] {absent}: {removed:,} caracteres retires dans {modules} modules")
+    return result
+
+def add_tension_matcher(entries, contents):
+    """Ajoute après le modèle de tension le trie précompilé des mots par défaut"""
+    log("--- Mots de tension ---")
+    paths = [path for path, _ in entries]
+    if TENSION_MODEL not in paths:
+        log(f"   [!] {TENSION_MODEL} absent de la variante")
+        return entries, contents
+    position = paths.index(TENSION_MODEL)
+    lists = {level: parse_list(read_file(path)) for level, path in list_paths().items()}
+    mismatched = check_lists(lists, contents[position])
+    if mismatched:
+        log(f"   [!] Listes .txt differentes des mots par defaut du modele ({', '.join(mismatched)}), trie non genere")
+        return entries, contents
+    source = matcher_source(lists)
+    log(f"   [OK] {sum(len(words) for words in lists.values())} entrees, trie de {len(source):,} caracteres")
+    entry = ('[tension]', 'mots de tension (trie precompile)')
+    return (entries[:position + 1] + [entry] + entries[position + 1:],
+            contents[:position + 1] + [source] + contents[position + 1:])
+
+def tree_shake_contents(entries, contents, html_parts):
+    """Retire les fonctions de premier niveau inatteignables, affiche le rapport"""
+    log("--- Tree-shaking JS ---")
+    shapes = {}
+    for (path, _), content in zip(entries, contents):
+        shapes[path] = derive_content(path, content, f'treeshake-{TREESHAKE_VERSION}', scan_functions)
+    roots = set()
+    for html in html_parts:
+        roots |= html_handlers(html)
+    live = live_functions(shapes, roots, root_modules(shapes))
     
-    for filename in JS_ORDER:
-        if filename.startswith('vendor/'):
-            # Vendor files (bundled libraries)
-            filepath = os.path.join(BUILD_DIR, filename)
-            if os.path.exists(filepath):
-                content = read_file(filename)
-                js_content.append(f'// ========== {filename} ==========')
-                js_content.append(content)
-                js_content.append('')
-                found_count += 1
-        elif filename.startswith('js-refactor/'):
-            filepath = os.path.join(BUILD_DIR, filename)
-            if os.path.exists(filepath):
-                content = read_file(filename)
-                js_content.append(f'// ========== {filename} ==========')
-                js_content.append(content)
-                js_content.append('')
-                found_count += 1
-        else:
-            filepath = os.path.join(BUILD_DIR, 'js', filename)
-            if os.path.exists(filepath):
-                content = read_file(f'js/{filename}')
-                js_content.append(f'// ========== {filename} ==========')
-                js_content.append(content)
-                js_content.append('')
-                found_count += 1
+    result = []
+    rows = []
+    removed_names = []
+    for (path, label), content in zip(entries, contents):
+        shaken, removed = shake(content, shapes[path], live)
+        if removed:
+            rows.append((f"{label} (-{len(removed)} fn)", len(content), len(shaken)))
+            removed_names.append((label, removed))
+        result.append(shaken)
     
-    # Extra JS files (sans Storygrid ni Thriller)
-    js_dir = os.path.join(BUILD_DIR, 'js')
-    for filepath in glob.glob(os.path.join(js_dir, '*.js')):
-        filename = os.path.basename(filepath)
-        if (filename not in JS_ORDER and 
-            f'js-refactor/{filename}' not in JS_ORDER and 
-            filename not in IGNORED_ORIGINALS and
-            not filename.startswith('_') and
-            'thriller' not in filename.lower() and
-            'storygrid' not in filename.lower()):
-            content = read_file(f'js/{filename}')
-            js_content.append(f'// ========== {filename} ==========')
-            js_content.append(content)
-            js_content.append('')
+    total = sum(len(shape.functions) for shape in shapes.values())
+    if not rows:
+        log(f"   [OK] {total} fonctions de premier niveau, toutes atteignables")
+        return contents
+    log_size_table(rows, log)
+    removed_count = sum(len(names) for _, names in removed_names)
+    log(f"   [i] {removed_count} fonctions inatteignables retirees sur {total}:")
+    for label, names in removed_names:
+        log(f"      - {label}: {', '.join(names)}")
+    return result
+
+def split_chunks(entries, contents, html_parts):
+    """
+    Sépare les chunks différables du bundle principal, affiche le diagnostic.
+    Retourne (entrées, contenus) du bundle principal, chargeur compris, et
+    la liste [(nom, entrées, contenus)] des chunks différés.
+    """
+    log("--- Chunks differes ---")
+    sources = {path: content for (path, _), content in zip(entries, contents)}
+    scans = {path: derive_content(path, content, f'depscan-{DEPSCAN_VERSION}', scan_js)
+             for path, content in sources.items()}
+    handlers = set()
+    for html in html_parts:
+        handlers |= html_handlers(html)
+    words = lambda path: derive_content(path, sources[path], f'jswords-{CSSMIN_VERSION}', js_words)
+    plans = plan_chunks(build_manifest.chunks(VARIANT), scans, words, handlers, sources)
     
-    log(f"   [OK] {found_count} fichiers JS trouves")
-    return '\n'.join(js_content)
-
-def clean_html_menu(body_content):
-    """Retire les éléments du menu Header et Mobile liés à Thriller et Storygrid"""
-    # Header buttons (by ID)
-    body_content = re.sub(r'<button[^>]+id="header-tab-thriller"[^>]*>.*?</button>', '', body_content, flags=re.DOTALL)
-    body_content = re.sub(r'<button[^>]+id="header-tab-storygrid"[^>]*>.*?</button>', '', body_content, flags=re.DOTALL)
+    deferred = []
+    for plan in plans:
+        if not plan.paths:
+            continue
+        if plan.blockers:
+            log(f"   [!] {plan.name}: garde dans le bundle ({len(plan.blockers)} raisons)")
+            for reason in plan.blockers[:5]:
+                log(f"      - {reason}")
+            continue
+        size = sum(len(sources[path]) for path in plan.paths)
+        log(f"   [OK] {plan.name}: {len(plan.paths)} modules, {size:,} caracteres differes, "
+            f"{len(plan.stubs)} fonctions relais")
+        deferred.append(plan)
+    if not deferred:
+        return entries, contents, []
     
-    # Mobile buttons (by data-view)
-    body_content = re.sub(r'<button[^>]+data-view="thriller"[^>]*>.*?</button>', '', body_content, flags=re.DOTALL)
-    body_content = re.sub(r'<button[^>]+data-view="storygrid"[^>]*>.*?</button>', '', body_content, flags=re.DOTALL)
+    chunk_of = {path: plan.name for plan in deferred for path in plan.paths}
+    main = [(entry, content) for entry, content in zip(entries, contents) if entry[0] not in chunk_of]
+    runtime = [loader_source()] + [stub_source(plan) for plan in deferred if plan.stubs]
+    main.append((('[chunks]', 'chargeur de chunks'), '\n\n'.join(runtime)))
+    chunks = []
+    for plan in deferred:
+        members = [(entry, content) for entry, content in zip(entries, contents) if chunk_of.get(entry[0]) == plan.name]
+        chunks.append((plan.name, [entry for entry, _ in members], [content for _, content in members]))
+    return [entry for entry, _ in main], [content for _, content in main], chunks
+
+def js_lines(entries, contents):
+    """Lignes d'un bloc <script> : chaque module précédé de son libellé"""
+    js_content = []
+    for (_, label), content in zip(entries, contents):
+        js_content.append(f'// ========== {label} ==========')
+        js_content.append(content)
+        js_content.append('')
+    return js_content
+
+def collect_js(html_parts=()):
+    """
+    Collecte tous les fichiers JS dans l'ordre, retourne la liste des lignes du bloc <script>
+    et les chunks différés [(nom, lignes)].
+    Les attributs on*= de `html_parts` servent de racines au --tree-shake et à l'analyse des chunks.
+    """
+    ordered, extra = resolve_js()
+    entries = ordered + extra
+    contents = read_files([path for path, _ in entries])
+    if build_manifest.stripped_features(VARIANT):
+        with profiler.phase('Fonctionnalites retirees'):
+            contents = fold_feature_contents(entries, contents)
+    if pack_synonyms_enabled:
+        with profiler.phase('Dictionnaire de synonymes'):
+            contents = pack_synonyms_contents(entries, contents)
+    if precompile_tension_enabled:
+        with profiler.phase('Mots de tension'):
+            entries, contents = add_tension_matcher(entries, contents)
+    if tree_shake_enabled:
+        with profiler.phase('Tree-shaking JS'):
+            contents = tree_shake_contents(entries, contents, html_parts)
+    if auto_order_enabled:
+        with profiler.phase('Dependances JS'):
+            entries, contents = order_by_dependencies(entries, contents)
+    chunks = []
+    if lazy_chunks_enabled:
+        with profiler.phase('Chunks differes'):
+            entries, contents, chunks = split_chunks(entries, contents, html_parts)
+    if minify_enabled:
+        # Un seul tableau pour le bundle et ses chunks
+        all_entries = entries + [entry for _, chunk_entries, _ in chunks for entry in chunk_entries]
+        all_contents = contents + [content for _, _, chunk_contents in chunks for content in chunk_contents]
+        with profiler.phase('Minification JS', files=len(all_entries)):
+            minified = minify_contents(all_entries, all_contents, 'JS', minify_js, f'jsmin-{JSMIN_VERSION}')
+        contents = minified[:len(entries)]
+        position = len(entries)
+        for i, (name, chunk_entries, _) in enumerate(chunks):
+            chunks[i] = (name, chunk_entries, minified[position:position + len(chunk_entries)])
+            position += len(chunk_entries)
     
-    # Sidebar lists
-    body_content = re.sub(r'<div[^>]+id="thrillerList"[^>]*>.*?</div>', '', body_content, flags=re.DOTALL)
+    if size_report_enabled:
+        size_segments.extend(('js', path, content) for (path, _), content in zip(entries, contents))
+        for _, chunk_entries, chunk_contents in chunks:
+            size_segments.extend(('js', path, content) for (path, _), content in zip(chunk_entries, chunk_contents))
+    chunk_parts = [(name, js_lines(chunk_entries, [escape_script(content) for content in chunk_contents]))
+                   for name, chunk_entries, chunk_contents in chunks]
+    segment_positions.update((path, ('js', 3 * i + 1, label)) for i, (path, label) in enumerate(entries))
+    log(f"   [OK] {len(ordered)} fichiers JS trouves")
+    return js_lines(entries, contents), chunk_parts
+
+def derive_module(path, label, content):
+    """Étapes JS propres à un module (fonctionnalités, synonymes, minification), pour le rebuild --watch"""
+    if build_manifest.stripped_features(VARIANT):
+        try:
+            content = fold_module(path, content, build_manifest.feature_flags(VARIANT))
+        except ValueError as e:
+            log(f"   [!] {label}: non traite ({e})")
+    if pack_synonyms_enabled and path == SYNONYMS_DICTIONARY:
+        content = pack_synonyms_contents([(path, label)], [content])[0]
+    if minify_enabled:
+        content = minify_contents([(path, label)], [content], 'JS', minify_js, f'jsmin-{JSMIN_VERSION}')[0]
+    return content
 
-    # Template options
-    body_content = re.sub(r'<option[^>]+value="thriller"[^>]*>.*?</option>', '', body_content)
+def patch_assembly(segments, changed):
+    """
+    Rebuild --watch : relit et retraite les seuls modules modifiés dans les
+    segments du build précédent. Retourne False (build complet) si un fichier
+    modifié n'est pas un module déjà assemblé (template HTML, manifeste, listes
+    de tension, fichier ajouté ou supprimé) ou si une étape globale active
+    (--tree-shake, --auto-order, --lazy-chunks, --optimize-css, --defer-modals,
+    --compact-html pour le CSS, --hoist-styles, --precompile-tension) dépend
+    de son contenu.
+    """
+    positions = segments['positions']
+    whole_js = (tree_shake_enabled or auto_order_enabled or lazy_chunks_enabled or segments['usage']
+                or defer_modals_enabled or (compact_html_enabled and hoist_styles_enabled))
+    for path in changed:
+        if path not in positions or not os.path.exists(os.path.join(BUILD_DIR, path)):
+            return False
+        kind = positions[path][0]
+        if kind == 'css' and compact_html_enabled:
+            return False
+        if kind == 'js' and (whole_js or (precompile_tension_enabled and path == TENSION_MODEL)):
+            return False
     
-    return body_content
+    log("--- Rebuild incremental ---")
+    for path in changed:
+        kind, index, label = positions[path]
+        content = read_file(path)
+        if kind == 'css' and segments['usage']:
+            content = optimize_css_contents([(path, label)], [content], segments['usage'])[0]
+        elif kind == 'js':
+            content = derive_module(path, label, content)
+        segments[kind][index] = content
+        if size_report_enabled:
+            size_segments[:] = [(kind, path, content) if segment[1] == path else segment
+                                for segment in size_segments]
+    log(f"   [OK] {len(changed)} modules relus, {len(positions) - len(changed)} segments reutilises")
+    return True
 
-def build(output_file=None):
-    """Construit le fichier HTML final"""
-    global log_handle
+def strip_html(body):
+    """Retire du HTML les éléments des fonctionnalités exclues de la variante (manifeste, "strip")"""
+    features = build_manifest.stripped_features(VARIANT)
+    if not features:
+        return body
+    selectors = ','.join(selector for _, feature_selectors in features for selector in feature_selectors)
+    body, report = derive_content('html/body.html', body, f'htmlstrip-{HTMLSTRIP_VERSION}-{selectors}',
+                                  lambda content: strip_features(content, features))
+    log_strip_report(report, log)
+    return body
+
+def defer_body(body, js_parts, chunk_parts=()):
+    """Place les modales différables dans des <template>, retourne (body, lignes JS avec le runtime en tête)"""
+    log("--- Modales differees ---")
+    selectors = build_manifest.deferred_views(VARIANT)
+    if not selectors:
+        log(f"   [i] Aucune modale \"defer\" pour la variante {VARIANT}")
+        return body, js_parts
+    views = plan_views(body, selectors, js_parts + [line for _, lines in chunk_parts for line in lines])
+    log_views_report(views, log)
+    if all(view.blockers for view in views):
+        return body, js_parts
+    deferred = defer_views(body, views)
+    runtime = runtime_source()
+    if minify_enabled:
+        runtime = minify_js(runtime)
+    live = len(body) - sum(view.end - view.start for view in views if not view.blockers)
+    log(f"   [OK] HTML actif au demarrage: {len(body):,} -> {live:,} caracteres, runtime de {len(runtime):,} caracteres")
+    if size_report_enabled:
+        size_segments[:] = [('html', path, deferred) if path == 'html/body.html' else (kind, path, content)
+                            for kind, path, content in size_segments]
+        size_segments.append(('js', '[modales]', runtime))
+    return deferred, js_lines([('[modales]', 'modales differees (templates)')], [runtime]) + js_parts
+
+def compact_body(body, css_parts, js_parts, chunk_parts=()):
+    """Compacte le template HTML, retourne (body, lignes CSS avec les classes des styles remplacés)"""
+    log("--- Compaction HTML ---")
+    js = js_parts + [line for _, lines in chunk_parts for line in lines] if hoist_styles_enabled else []
+    result = compact_html(body, css_parts, js, hoist_styles_enabled)
+    log(f"   [OK] {result.comments} commentaires, {result.quotes} guillemets retires"
+        + (f", {result.hoisted} styles inline -> {result.classes} classes" if hoist_styles_enabled else ''))
+    before = gzip_size(body.encode('utf-8'))
+    after = gzip_size(result.html.encode('utf-8'))
+    css_size = gzip_size(result.css.encode('utf-8')) if result.css else 0
+    log(f"   [OK] HTML: {len(body):,} -> {len(result.html):,} caracteres (+{len(result.css):,} de CSS), "
+        f"gzip {before:,} -> {after:,} + {css_size:,} octets")
+    if size_report_enabled:
+        size_segments[:] = [('html', path, result.html) if path == 'html/body.html' else (kind, path, content)
+                            for kind, path, content in size_segments]
+        if result.css:
+            size_segments.append(('css', 'html/body.html', result.css))
+    if result.css:
+        css_parts = css_parts + ['/* ========== styles extraits du HTML ========== */', result.css, '']
+    return result.html, css_parts
+
+def iter_output(head, css_parts, body, js_parts, footer, chunk_parts=()):
+    """Morceaux du fichier HTML final, dans l'ordre du template"""
+    yield head
+    yield '\n    <style>\n'
+    yield from join_lines(css_parts)
+    yield '\n    </style>\n</head>\n'
+    yield body
+    yield '\n    <script>\n'
+    yield from join_lines(js_parts)
+    yield '\n    </script>\n'
+    for name, lines in chunk_parts:
+        # Bloc inerte : compilé seulement au premier appel (plumeLoadChunk)
+        yield f'    <script type="text/plain" id="{CHUNK_ID_PREFIX}{name}">\n'
+        yield from join_lines(lines)
+        yield '\n    </script>\n'
+    yield footer
+
+def report_sizes(output_path, budget_total=None, top=DEFAULT_TOP):
+    """Mesure les segments du bundle, met à jour l'historique, retourne les dépassements de budget"""
+    log("--- Tailles ---")
+    sizes = measure_segments(size_segments, build_manifest.group_of, derive_content)
+    with open(output_path, 'rb') as f:
+        record = make_record(VARIANT, output_path, sizes, gzip_size(f.read()))
+    budget = dict(build_manifest.budget(VARIANT))
+    if budget_total:
+        budget['total'] = budget_total
+    history = SizeHistory(BUILD_DIR).load()
+    overruns = log_size_report(record, history.last(VARIANT), budget, log, top)
+    history.append(record)
+    history.save()
+    return overruns
+
+def store_output(output_path, digest, write):
+    """Range la sortie dans le dépôt d'artefacts (si son contenu est nouveau) et la publie sous son nom"""
+    extension = os.path.splitext(output_path)[1]
+    object_name = artifact_store.object_name(digest, extension)
+    if artifact_store.store(digest, extension, write):
+        log(f"   [OK] Nouvel artefact: {object_name}")
+    else:
+        log(f"   [OK] Artefact {object_name} deja present, ecriture ignoree")
+    method = artifact_store.publish(digest, extension, output_path, VARIANT)
+    log(f"   [i] {os.path.basename(output_path)} -> {object_name} ({method})")
+
+def report_profile(output_path):
+    """Écrit la trace Chrome du build à côté du fichier généré et affiche le récapitulatif"""
+    log("--- Profil ---")
+    trace_path = os.path.splitext(output_path)[0] + '.trace.json'
+    log_profile_summary(profiler, log)
+    profiler.write_trace(trace_path)
+    log(f"   [OK] Trace: {trace_path} (chrome://tracing ou ui.perfetto.dev)")
+
+def report_encodings():
+    """Liste les fichiers lus qui ne sont pas en UTF-8"""
+    log("--- Encodages ---")
+    paths = list(dict.fromkeys(files_read))
+    non_utf8 = encoding_cache.non_utf8(paths)
+    if not non_utf8:
+        log(f"   [OK] {len(paths)} fichiers, tous en UTF-8")
+        return
+    log(f"   [!] {len(non_utf8)} fichiers ne sont pas en UTF-8 (a convertir):")
+    for path, encoding in non_utf8:
+        log(f"      - {path} ({encoding})")
+
+def build(output_file=None, use_cache=True, jobs=None, normalize_encodings=False, minify=False,
+          optimize_css=False, compress_levels=None, auto_order=False, tree_shake=False,
+          lazy_chunks=False, pack_synonyms=False, precompile_tension=False, size_report=False,
+          size_budget=None, size_top=DEFAULT_TOP, profile=False, store=False, keep_last=None,
+          keep_days=None, compact_html=False, hoist_styles=False, defer_modals=False, changed=None):
+    """
+    Construit le fichier HTML final.
+    `changed` (mode --watch) : fichiers modifiés depuis le build précédent,
+    seuls ces modules sont relus quand les segments gardés en mémoire le permettent.
+    """
+    global log_handle, build_manifest, build_cache, encoding_cache, read_jobs, minify_enabled
+    global auto_order_enabled, tree_shake_enabled, lazy_chunks_enabled, pack_synonyms_enabled
+    global precompile_tension_enabled, size_report_enabled, budget_overruns, profiler, artifact_store
+    global compact_html_enabled, hoist_styles_enabled, defer_modals_enabled, assembly
+    profiler = Profiler(enabled=profile)
+    artifact_store = ArtifactStore(BUILD_DIR).load() if store else None
+    read_jobs = jobs or default_jobs()
+    minify_enabled = minify
+    auto_order_enabled = auto_order
+    tree_shake_enabled = tree_shake
+    lazy_chunks_enabled = lazy_chunks
+    pack_synonyms_enabled = pack_synonyms
+    precompile_tension_enabled = precompile_tension
+    compact_html_enabled = compact_html
+    hoist_styles_enabled = hoist_styles
+    defer_modals_enabled = defer_modals
+    size_report_enabled = size_report
     log_handle = open(LOG_FILE, 'w', encoding='utf-8')
+    build_manifest = load_manifest(BUILD_DIR)
+    # En mode --watch le cache (et ses segments décodés) reste en mémoire
+    if not use_cache:
+        build_cache = None
+    elif build_cache is None:
+        build_cache = BuildCache(BUILD_DIR).load()
+    if build_cache:
+        build_cache.hits = build_cache.misses = 0
+    if encoding_cache is None:
+        encoding_cache = EncodingCache(BUILD_DIR).load()
+    budget_overruns = []
     
     log(f"========================================")
     log(f"Build Plume LIGHT - {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
     log(f"========================================")
     
-    head = read_file('html/head.html')
-    body = read_file('html/body.html')
-    footer = read_file('html/footer.html')
-    
-    # Nettoyage du menu
-    body = clean_html_menu(body)
+    # Remis à None pendant l'assemblage : une erreur en cours de rebuild force un build complet
+    options = (minify, optimize_css, auto_order, tree_shake, lazy_chunks, pack_synonyms,
+               precompile_tension, compact_html, hoist_styles, defer_modals, size_report)
+    segments, assembly = assembly, None
+    if not (changed and segments and segments['options'] == options):
+        segments = None
+    if segments:
+        with profiler.phase('Rebuild incremental', files=len(changed)):
+            if not patch_assembly(segments, changed):
+                segments = None
     
-    css = collect_css()
-    js = collect_js()
+    if segments is None:
+        files_read.clear()
+        size_segments.clear()
+        segment_positions.clear()
+        
+        with profiler.phase('Lecture des templates'):
+            head = read_file('html/head.html')
+            body = read_file('html/body.html')
+            footer = read_file('html/footer.html')
+        
+        # Retrait des éléments Thriller et Storygrid
+        with profiler.phase('Nettoyage du HTML', bytes=len(body)):
+            body = strip_html(body)
+        
+        if size_report_enabled:
+            size_segments.extend([('html', 'html/head.html', head), ('html', 'html/body.html', body),
+                                  ('html', 'html/footer.html', footer)])
+        
+        usage = None
+        if optimize_css:
+            with profiler.phase('Index des mots utilises'):
+                usage = build_usage_index([head, body, footer])
+        with profiler.phase('Assemblage CSS') as span:
+            css_parts = collect_css(usage)
+            span.count(files=len(css_parts) // 3)
+        with profiler.phase('Assemblage JS') as span:
+            js_parts, chunk_parts = collect_js([head, body, footer])
+            span.count(files=len(js_parts) // 3)
+        if defer_modals_enabled:
+            with profiler.phase('Modales differees', bytes=len(body)):
+                body, js_parts = defer_body(body, js_parts, chunk_parts)
+        if compact_html_enabled:
+            with profiler.phase('Compaction HTML', bytes=len(body)):
+                body, css_parts = compact_body(body, css_parts, js_parts, chunk_parts)
+        segments = dict(options=options, usage=usage, positions=dict(segment_positions), head=head,
+                        body=body, footer=footer, css=css_parts, js=js_parts, chunks=chunk_parts)
     
-    output = f"""{head}
-    <style>
-{css}
-    </style>
-</head>
-{body}
-    <script>
-{js}
-    </script>
-{footer}"""
+    head, body, footer = segments['head'], segments['body'], segments['footer']
+    css_parts, js_parts, chunk_parts = segments['css'], segments['js'], segments['chunks']
+    log(f"   Total CSS: {joined_length(css_parts):,} caracteres")
+    log(f"   Total JS: {joined_length(js_parts):,} caracteres")
+    if chunk_parts:
+        deferred = sum(joined_length(lines) for _, lines in chunk_parts)
+        log(f"   Total JS differe: {deferred:,} caracteres ({len(chunk_parts)} chunks)")
     
     output_path = os.path.join(BUILD_DIR, 'build', output_file)
     os.makedirs(os.path.dirname(output_path), exist_ok=True)
     
-    with open(output_path, 'w', encoding='utf-8') as f:
-        f.write(output)
+    # Le bundle n'est jamais assemblé en mémoire : il est haché puis écrit
+    # morceau par morceau
+    digest = None
+    with profiler.phase('Ecriture') as span:
+        if build_cache or artifact_store:
+            digest = hash_chunks(iter_output(head, css_parts, body, js_parts, footer, chunk_parts))
+        if artifact_store:
+            store_output(output_path, digest,
+                         lambda path: write_chunks(path, iter_output(head, css_parts, body, js_parts, footer, chunk_parts)))
+            if build_cache:
+                build_cache.record_output(output_path, digest)
+        elif digest and build_cache.output_unchanged(output_path, digest):
+            log(f"   [OK] Sortie inchangee, ecriture ignoree")
+        else:
+            write_chunks(output_path, iter_output(head, css_parts, body, js_parts, footer, chunk_parts))
+            if build_cache:
+                build_cache.record_output(output_path, digest)
+            if span:
+                span.count(files=1, bytes=os.path.getsize(output_path))
+    
+    if compress_levels:
+        log("--- Precompression ---")
+        with profiler.phase('Precompression'):
+            results = precompress(output_path, compress_levels, read_jobs, build_cache, digest)
+        log_compression_report(os.path.getsize(output_path), results, log)
+    
+    if size_report_enabled:
+        with profiler.phase('Rapport de tailles'):
+            budget_overruns = report_sizes(output_path, size_budget, size_top)
     
+    if artifact_store:
+        with profiler.phase('Retention des artefacts'):
+            log_prune_report(*artifact_store.prune(keep_last, keep_days, [output_file], variant=VARIANT), log)
+            artifact_store.save()
+    
+    if build_cache:
+        log(f"   [i] Cache: {build_cache.hits} fichiers reutilises, {build_cache.misses} decodes")
+        with profiler.phase('Sauvegarde du cache'):
+            build_cache.save()
+    
+    if normalize_encodings:
+        report_encodings()
+    encoding_cache.save()
+    
+    if profile:
+        report_profile(output_path)
     log(f"BUILD LIGHT TERMINE: {output_path}")
     log_handle.close()
+    assembly = segments
     return output_path
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build Plume LIGHT (sans Storygrid ni Thriller)")
+    parser.add_argument('--output', help="nom du fichier genere dans build/")
+    parser.add_argument('--no-cache', action='store_true',
+                        help="ignore le cache incremental (build/.build-cache.pickle)")
+    parser.add_argument('--watch', action='store_true',
+                        help="reste actif et reconstruit a chaque modification des sources")
+    parser.add_argument('--jobs', type=int, default=default_jobs(),
+                        help="nombre de fichiers lus en parallele (1 = sequentiel)")
+    parser.add_argument('--normalize-encodings', action='store_true',
+                        help="liste les fichiers sources qui ne sont pas en UTF-8")
+    parser.add_argument('--minify', action='store_true',
+                        help="minifie le JavaScript (commentaires et espaces superflus)")
+    parser.add_argument('--optimize-css', action='store_true',
+                        help="minifie le CSS et retire les selecteurs jamais utilises par le HTML/JS")
+    parser.add_argument('--auto-order', action='store_true',
+                        help="ordonne les JS selon leurs dependances (declarations de premier niveau)")
+    parser.add_argument('--tree-shake', action='store_true',
+                        help="retire les fonctions JS jamais appelees (depuis le JS ou les on*= du HTML)")
+    parser.add_argument('--lazy-chunks', action='store_true',
+                        help="charge a la demande les chunks JS du manifeste (arc board...)")
+    parser.add_argument('--pack-synonyms', action='store_true',
+                        help="compacte le dictionnaire de synonymes (decode au premier acces)")
+    parser.add_argument('--precompile-tension', action='store_true',
+                        help="integre le trie des mots de tension (mots de tension/*.txt)")
+    parser.add_argument('--compact-html', action='store_true',
+                        help="compacte le HTML (espaces, commentaires, guillemets)")
+    parser.add_argument('--hoist-styles', action='store_true',
+                        help="avec --compact-html, change les styles inline repetes en classes !important "
+                             "(heuristique sur le JS, gain gzip negatif sur body.html)")
+    parser.add_argument('--defer-modals', action='store_true',
+                        help="place les modales \"defer\" du manifeste dans des <template> instancies a l'ouverture")
+    parser.add_argument('--compress', action='store_true',
+                        help="genere aussi les versions .gz et .xz du fichier")
+    parser.add_argument('--gzip-level', type=int, default=DEFAULT_LEVELS['gzip'],
+                        help="niveau de compression gzip (1-9)")
+    parser.add_argument('--xz-level', type=int, default=DEFAULT_LEVELS['xz'],
+                        help="niveau de compression xz (0-9)")
+    parser.add_argument('--size-report', action='store_true',
+                        help="tailles par module et par groupe (build/size-history.json), echec si budget depasse")
+    parser.add_argument('--size-budget', type=int,
+                        help="taille gzip maximale du fichier en octets (remplace le budget \"total\" du manifeste)")
+    parser.add_argument('--size-top', type=int, default=DEFAULT_TOP,
+                        help="nombre de modules affiches dans les plus fortes hausses")
+    parser.add_argument('--profile', action='store_true',
+                        help="chronometre chaque phase (trace Chrome build/*.trace.json et recapitulatif)")
+    parser.add_argument('--store', action='store_true',
+                        help="range la sortie par hash dans build/.artifacts (nom horodate = lien physique)")
+    parser.add_argument('--keep-last', type=int,
+                        help="avec --store, ne garde que les N derniers fichiers generes")
+    parser.add_argument('--keep-days', type=float,
+                        help="avec --store, ne garde que les fichiers generes depuis J jours")
+    args = parser.parse_args()
+    
     timestamp = datetime.now().strftime('%Y.%m.%d.%H.%M')
-    output = f'plume-light-{timestamp}.html'
-    if len(sys.argv) > 2 and sys.argv[1] == '--output':
-        output = sys.argv[2]
+    output = args.output or f'plume-light-{timestamp}.html'
         
     print(f"Build Light -> {output}") 
-    build(output)
+    build_options = dict(use_cache=not args.no_cache, jobs=args.jobs,
+                         normalize_encodings=args.normalize_encodings, minify=args.minify,
+                         optimize_css=args.optimize_css, auto_order=args.auto_order,
+                         tree_shake=args.tree_shake, lazy_chunks=args.lazy_chunks,
+                         pack_synonyms=args.pack_synonyms, precompile_tension=args.precompile_tension,
+                         compact_html=args.compact_html, hoist_styles=args.hoist_styles,
+                         defer_modals=args.defer_modals,
+                         size_report=args.size_report, size_budget=args.size_budget, size_top=args.size_top,
+                         profile=args.profile, store=args.store, keep_last=args.keep_last,
+                         keep_days=args.keep_days)
+    if args.compress:
+        build_options['compress_levels'] = {'gzip': args.gzip_level, 'xz': args.xz_level}
+    build(output, **build_options)
+    
+    if args.watch:
+        watch(BUILD_DIR, lambda changed: build(output, changed=changed, **build_options), print)
+    elif budget_overruns:
+        sys.exit(1)
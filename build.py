@@ -2,20 +2,68 @@
 """
 Script de build Plume
 Reconstruit le fichier HTML complet à partir des modules
-Usage: python3 build.py [--output fichier.html]
+(variante "full" de build-manifest.json)
+Usage: python3 build.py [--output fichier.html] [--no-cache] [--watch]
+       [--normalize-encodings] [--size-report [--size-budget OCTETS] [--size-top N]]
+       [--profile]
 """
 
 import os
 import sys
-import glob
+import argparse
 from datetime import datetime
 
+from buildtools.cache import BuildCache
+from buildtools.manifest import load as load_manifest
+from buildtools.encoding import EncodingCache
+from buildtools.bundle import hash_chunks, join_lines, joined_length, write_chunks
+from buildtools.watch import watch
+from buildtools.phases import Profiler, log_profile_summary
+from buildtools.sizes import DEFAULT_TOP, SizeHistory, gzip_size, log_size_report, make_record, measure_segments
+
 BUILD_DIR = os.path.dirname(os.path.abspath(__file__))
 LOG_FILE = os.path.join(BUILD_DIR, 'build.log')
 
+# Variante du manifeste de build (build-manifest.json)
+VARIANT = 'full'
+
 # Fichier log global
 log_handle = None
 
+# Manifeste de build, rechargé à chaque build (prise en compte en --watch)
+build_manifest = None
+
+# Cache incrémental des sources (None si désactivé)
+build_cache = None
+
+# Encodage détecté de chaque source (build/.encodings.json)
+encoding_cache = None
+
+# Fichiers lus pendant le build courant
+files_read = []
+
+# Sources partagées par build-matrix.py (None pour un build isolé)
+source_pool = None
+
+# Segments écrits dans le bundle [(type, chemin, contenu)], mesurés par --size-report
+size_segments = []
+
+# Dépassements du budget de taille au dernier build (code de sortie non nul)
+budget_overruns = []
+
+# Phases chronométrées du build courant (actif avec --profile)
+profiler = Profiler(enabled=False)
+
+# Segments assemblés au dernier build, gardés en mémoire en mode --watch :
+# un rebuild ne relit que les fichiers modifiés
+assembly = None
+
+# Position de chaque fichier dans les segments assemblés {chemin: (type, index)}
+segment_positions = {}
+
+# Templates HTML, dans l'ordre du fichier
+TEMPLATES = [('head', 'html/head.html'), ('body', 'html/body.html'), ('footer', 'html/footer.html')]
+
 def log(message):
     """Écrit un message dans la console ET dans le fichier log"""
     print(message)
@@ -23,288 +71,178 @@ def log(message):
         log_handle.write(message + '\n')
         log_handle.flush()
 
-# Ordre des fichiers CSS
-CSS_ORDER = [
-    '01.variables.css',
-    '02.base.css',
-    '03.header.css',
-    '04.sidebar.css',
-    '05.modals.css',
-    '06.editor.css',
-    '07.characters.css',
-    '08.visualizations.css',
-    '09.utilities.css',
-    '10.mobile.css',
-    '11.storygrid.css',
-    '12.arc-board.css',
-    '13.thriller-board.css',
-    '14.word-repetition.css'
-]
-
-# Ordre des fichiers JS (selon concat.sh)
-JS_ORDER = [
-    '01.app.js',
-    '02.storage.js',
-    '03.project.js',
-    '04.init.js',
-    '05.undo-redo.js',
-    '06.structure.js',
-    '07.stats.js',
-    '08.auto-detect.js',
-    '09.floating-editor.js',
-    '10.colorpalette.js',
-    '11.updateStats.js',
-    '12.import-export.js',
-    '13.mobile-menu.js',
-    # '14.dragndrop-acts.js',  # Refactored to js-refactor/dragndrop-acts/
-    '15.characters.js',
-    '16.split-view.js',
-    '17.world.js',
-    '18.timeline.js',
-    '19.notes.js',
-    '20.snapshots.js',
-    '21.sceneVersions.js',
-    '22.diff.js',
-    '23.stats.js',
-    '24.codex.js',
-    '25.globalSearch.js',
-    '26.focusMode.js',
-    '27.keyboardShortcuts.js',
-    '28.revision.js',
-    '29.todos.js',
-    '30.corkboard.js',
-        'js-refactor/mindmap/mindmap.model.js',
-        'js-refactor/mindmap/mindmap.repository.js',
-        'js-refactor/mindmap/mindmap.viewmodel.js',
-        'js-refactor/mindmap/mindmap.view.js',
-        'js-refactor/mindmap/mindmap.handlers.js',
-        'js-refactor/mindmap/mindmap.main.js',
-    '33.plot.js',
-    '34.relations-graph.js',
-    '35.renderMap.js',
-    '36.timeline-metro.js',
-    '37.theme-manager.js',
-    '38.tension.js',
-    '39.export.js',
-    '40.sidebar-views.js',
-    '41.storageMonitoring.js',
-    '42.mobile-swipe.js',
-    '43.arcs.js',
-    '44.storygrid.js',
-    '45.arc-board.js',
-    '46.thriller-board.js'
-]
+def decode_content(data, path):
+    """Décode le contenu brut d'un fichier (encodage détecté en une passe)"""
+    with profiler.phase('Decodage', path=path, bytes=len(data)):
+        content, encoding = encoding_cache.decode(data, path)
+    if encoding != 'utf-8':
+        log(f"   [!] {path} lu en {encoding} (pas UTF-8)")
+    
+    # Mêmes fins de ligne qu'une lecture en mode texte
+    return content.replace('\r\n', '\n').replace('\r', '\n')
 
 def read_file(path):
-    """Lit un fichier et retourne son contenu, gère plusieurs encodages"""
+    """Lit un fichier et retourne son contenu (via le cache si actif)"""
     full_path = os.path.join(BUILD_DIR, path)
     if not os.path.exists(full_path):
         log(f"   [!] Fichier non trouve: {full_path}")
         return ''
     
-    # Essayer différents encodages
-    encodings = ['utf-8', 'cp1252', 'latin-1', 'iso-8859-1']
-    
-    for encoding in encodings:
-        try:
-            with open(full_path, 'r', encoding=encoding) as f:
-                content = f.read()
-                if encoding != 'utf-8':
-                    log(f"   [!] {path} lu en {encoding} (pas UTF-8)")
-                return content
-        except UnicodeDecodeError:
-            continue
-    
-    # Si aucun encodage ne fonctionne, lire en binaire et décoder avec erreurs ignorées
-    log(f"   [ERREUR] {path} - encodage inconnu, lecture forcee")
-    with open(full_path, 'rb') as f:
-        return f.read().decode('utf-8', errors='replace')
+    files_read.append(path)
+    if source_pool:
+        return source_pool.read(path)
+    with profiler.phase('Lecture fichier', path=path) as span:
+        if build_cache:
+            content = build_cache.read(path, decode_content)
+        else:
+            with open(full_path, 'rb') as f:
+                content = decode_content(f.read(), path)
+        if span:
+            span.count(files=1, bytes=os.path.getsize(full_path))
+    return content
 
 def collect_css():
-    """Collecte tous les fichiers CSS dans l'ordre"""
+    """Collecte tous les fichiers CSS dans l'ordre, retourne la liste des lignes du bloc <style>"""
     css_content = []
-    css_dir = os.path.join(BUILD_DIR, 'css')
-    found_count = 0
+    resolved = build_manifest.resolve(VARIANT, 'css')
     
-    # D'abord les fichiers ordonnés
-    for filename in CSS_ORDER:
-        filepath = os.path.join(css_dir, filename)
-        if os.path.exists(filepath):
-            content = read_file(f'css/{filename}')
-            css_content.append(f'/* ========== {filename} ========== */')
-            css_content.append(content)
-            css_content.append('')
-            found_count += 1
+    for path, label in resolved.entries:
+        content = read_file(path)
+        size_segments.append(('css', path, content))
+        css_content.append(f'/* ========== {label} ========== */')
+        segment_positions[path] = ('css', len(css_content))
+        css_content.append(content)
+        css_content.append('')
     
-    # Ensuite les fichiers non listés
-    for filepath in glob.glob(os.path.join(css_dir, '*.css')):
-        filename = os.path.basename(filepath)
-        if filename not in CSS_ORDER:
-            content = read_file(f'css/{filename}')
-            css_content.append(f'/* ========== {filename} ========== */')
-            css_content.append(content)
-            css_content.append('')
-            found_count += 1
-    
-    log(f"   [OK] {found_count} fichiers CSS trouves")
-    return '\n'.join(css_content)
+    log(f"   [OK] {len(resolved.entries)} fichiers CSS trouves")
+    return css_content
 
 def collect_js():
-    """Collecte tous les fichiers JS dans l'ordre"""
+    """Collecte tous les fichiers JS dans l'ordre, retourne la liste des lignes du bloc <script>"""
     js_content = []
-    js_dir = os.path.join(BUILD_DIR, 'js')
-    js_refactor_dir = os.path.join(BUILD_DIR, 'js-refactor')
-    found_count = 0
-    missing = []
-
-    # D'abord les fichiers ordonnés depuis js/
-    for filename in JS_ORDER:
-        filepath = os.path.join(js_dir, filename)
-        if os.path.exists(filepath):
-            content = read_file(f'js/{filename}')
-            js_content.append(f'// ========== {filename} ==========')
-            js_content.append(content)
-            js_content.append('')
-            found_count += 1
-        else:
-            missing.append(filename)
-
-    # Ensuite les fichiers non listés depuis js/
-    extra = []
-    for filepath in glob.glob(os.path.join(js_dir, '*.js')):
-        filename = os.path.basename(filepath)
-        if filename not in JS_ORDER:
-            content = read_file(f'js/{filename}')
-            js_content.append(f'// ========== {filename} ==========')
-            js_content.append(content)
-            js_content.append('')
-            extra.append(filename)
+    resolved = build_manifest.resolve(VARIANT, 'js')
+    
+    for path, label in resolved.entries:
+        content = read_file(path)
+        size_segments.append(('js', path, content))
+        js_content.append(f'// ========== {label} ==========')
+        segment_positions[path] = ('js', len(js_content))
+        js_content.append(content)
+        js_content.append('')
 
-    # Collecter les fichiers js-refactor/ (triés par nom)
-    refactor_files = []
-    if os.path.exists(js_refactor_dir):
-        for filepath in sorted(glob.glob(os.path.join(js_refactor_dir, '*.js'))):
-            filename = os.path.basename(filepath)
-            content = read_file(f'js-refactor/{filename}')
-            js_content.append(f'// ========== js-refactor/{filename} ==========')
-            js_content.append(content)
-            js_content.append('')
-            refactor_files.append(filename)
+    log(f"   [OK] {len(resolved.entries)} fichiers JS trouves")
+    if resolved.missing:
+        log(f"   [!] {len(resolved.missing)} fichiers JS manquants:")
+        for f in resolved.missing:
+            log(f"      - {f}")
+    if resolved.globbed:
+        log(f"   [i] {len(resolved.globbed)} fichiers JS supplementaires:")
+        for f in resolved.globbed:
+            log(f"      + {f}")
 
-        # Collecter les fichiers du sous-dossier arc-board/
-        arc_board_dir = os.path.join(js_refactor_dir, 'arc-board')
-        if os.path.exists(arc_board_dir):
-            for filepath in sorted(glob.glob(os.path.join(arc_board_dir, '*.js'))):
-                filename = os.path.basename(filepath)
-                content = read_file(f'js-refactor/arc-board/{filename}')
-                js_content.append(f'// ========== js-refactor/arc-board/{filename} ==========')
-                js_content.append(content)
-                js_content.append('')
-                refactor_files.append(f'arc-board/{filename}')
+    return js_content
 
-        # Collecter les fichiers du sous-dossier import-chapter/
-        import_chapter_dir = os.path.join(js_refactor_dir, 'import-chapter')
-        if os.path.exists(import_chapter_dir):
-            for filepath in sorted(glob.glob(os.path.join(import_chapter_dir, '*.js'))):
-                filename = os.path.basename(filepath)
-                content = read_file(f'js-refactor/import-chapter/{filename}')
-                js_content.append(f'// ========== js-refactor/import-chapter/{filename} ==========')
-                js_content.append(content)
-                js_content.append('')
-                refactor_files.append(f'import-chapter/{filename}')
+def patch_assembly(segments, changed):
+    """
+    Rebuild --watch : relit les seuls fichiers modifiés dans les segments du
+    build précédent. Retourne False (build complet) si un fichier modifié n'y
+    figure pas (manifeste, fichier ajouté ou supprimé).
+    """
+    positions = segments['positions']
+    if not all(path in positions and os.path.exists(os.path.join(BUILD_DIR, path)) for path in changed):
+        return False
+    log("--- Rebuild incremental ---")
+    for path in changed:
+        kind, index = positions[path]
+        content = read_file(path)
+        if kind == 'html':
+            segments[index] = content
+        else:
+            segments[kind][index] = content
+        size_segments[:] = [(segment[0], path, content) if segment[1] == path else segment
+                            for segment in size_segments]
+        log(f"   [OK] {path} ({len(content)} caracteres)")
+    log(f"   [OK] {len(changed)} fichiers relus, {len(positions) - len(changed)} segments reutilises")
+    log("")
+    return True
 
-        # Collecter les fichiers du sous-dossier word-repetition/
-        word_repetition_dir = os.path.join(js_refactor_dir, 'word-repetition')
-        if os.path.exists(word_repetition_dir):
-            for filepath in sorted(glob.glob(os.path.join(word_repetition_dir, '*.js'))):
-                filename = os.path.basename(filepath)
-                content = read_file(f'js-refactor/word-repetition/{filename}')
-                js_content.append(f'// ========== js-refactor/word-repetition/{filename} ==========')
-                js_content.append(content)
-                js_content.append('')
-                refactor_files.append(f'word-repetition/{filename}')
+def iter_output(head, css_parts, body, js_parts, footer):
+    """Morceaux du fichier HTML final, dans l'ordre du template"""
+    yield head
+    yield '\n    <style>\n'
+    yield from join_lines(css_parts)
+    yield '\n    </style>\n</head>\n'
+    yield body
+    yield '\n    <script>\n'
+    yield from join_lines(js_parts)
+    yield '\n    </script>\n'
+    yield footer
 
-        # Collecter les fichiers du sous-dossier revision/
-        revision_dir = os.path.join(js_refactor_dir, 'revision')
-        if os.path.exists(revision_dir):
-            # Order matters: model -> repository -> viewmodel -> view -> handlers -> main
-            revision_files_ordered = [
-                'revision.model.js',
-                'revision.repository.js',
-                'revision.viewmodel.js',
-                'revision.view.js',
-                'revision.handlers.js',
-                'revision.main.js'
-            ]
-            for filename in revision_files_ordered:
-                filepath = os.path.join(revision_dir, filename)
-                if os.path.exists(filepath):
-                    content = read_file(f'js-refactor/revision/{filename}')
-                    js_content.append(f'// ========== js-refactor/revision/{filename} ==========')
-                    js_content.append(content)
-                    js_content.append('')
-                    refactor_files.append(f'revision/{filename}')
+def derive_content(path, content, key, func):
+    """func(content), mis en cache quand le cache est actif"""
+    if build_cache and path in build_cache.sources:
+        return build_cache.derive(path, key, func)
+    return func(content)
 
-        # Collecter les fichiers du sous-dossier mindmap/
-        mindmap_dir = os.path.join(js_refactor_dir, 'mindmap')
-        if os.path.exists(mindmap_dir):
-            mindmap_files_ordered = [
-                'mindmap.model.js',
-                'mindmap.repository.js',
-                'mindmap.viewmodel.js',
-                'mindmap.view.js',
-                'mindmap.handlers.js',
-                'mindmap.main.js'
-            ]
-            for filename in mindmap_files_ordered:
-                filepath = os.path.join(mindmap_dir, filename)
-                if os.path.exists(filepath):
-                    content = read_file(f'js-refactor/mindmap/{filename}')
-                    js_content.append(f'// ========== js-refactor/mindmap/{filename} ==========')
-                    js_content.append(content)
-                    js_content.append('')
-                    refactor_files.append(f'mindmap/{filename}')
-        
-        # Collecter les fichiers du sous-dossier dragndrop-acts/
-        dragndrop_acts_dir = os.path.join(js_refactor_dir, 'dragndrop-acts')
-        if os.path.exists(dragndrop_acts_dir):
-            dragndrop_acts_files_ordered = [
-                'dragndrop-acts.model.js',
-                'dragndrop-acts.repository.js',
-                'dragndrop-acts.viewmodel.js',
-                'dragndrop-acts.view.js',
-                'dragndrop-acts.handlers.js',
-                'dragndrop-acts.main.js'
-            ]
-            for filename in dragndrop_acts_files_ordered:
-                filepath = os.path.join(dragndrop_acts_dir, filename)
-                if os.path.exists(filepath):
-                    content = read_file(f'js-refactor/dragndrop-acts/{filename}')
-                    js_content.append(f'// ========== js-refactor/dragndrop-acts/{filename} ==========')
-                    js_content.append(content)
-                    js_content.append('')
-                    refactor_files.append(f'dragndrop-acts/{filename}')
+def report_sizes(output_path, budget_total=None, top=DEFAULT_TOP):
+    """Mesure les segments du bundle, met à jour l'historique, retourne les dépassements de budget"""
+    log("--- Tailles ---")
+    sizes = measure_segments(size_segments, build_manifest.group_of, derive_content)
+    with open(output_path, 'rb') as f:
+        record = make_record(VARIANT, output_path, sizes, gzip_size(f.read()))
+    budget = dict(build_manifest.budget(VARIANT))
+    if budget_total:
+        budget['total'] = budget_total
+    history = SizeHistory(BUILD_DIR).load()
+    overruns = log_size_report(record, history.last(VARIANT), budget, log, top)
+    history.append(record)
+    history.save()
+    return overruns
 
-    log(f"   [OK] {found_count} fichiers JS trouves")
-    if missing:
-        log(f"   [!] {len(missing)} fichiers JS manquants:")
-        for f in missing:
-            log(f"      - {f}")
-    if extra:
-        log(f"   [i] {len(extra)} fichiers JS supplementaires:")
-        for f in extra:
-            log(f"      + {f}")
-    if refactor_files:
-        log(f"   [i] {len(refactor_files)} fichiers js-refactor/ inclus")
+def report_profile(output_path):
+    """Écrit la trace Chrome du build à côté du fichier généré et affiche le récapitulatif"""
+    log("--- Profil ---")
+    trace_path = os.path.splitext(output_path)[0] + '.trace.json'
+    log_profile_summary(profiler, log)
+    profiler.write_trace(trace_path)
+    log(f"   [OK] Trace: {trace_path} (chrome://tracing ou ui.perfetto.dev)")
 
-    return '\n'.join(js_content)
+def report_encodings():
+    """Liste les fichiers lus qui ne sont pas en UTF-8"""
+    log("--- Encodages ---")
+    paths = list(dict.fromkeys(files_read))
+    non_utf8 = encoding_cache.non_utf8(paths)
+    if not non_utf8:
+        log(f"   [OK] {len(paths)} fichiers, tous en UTF-8")
+        return
+    log(f"   [!] {len(non_utf8)} fichiers ne sont pas en UTF-8 (a convertir):")
+    for path, encoding in non_utf8:
+        log(f"      - {path} ({encoding})")
 
-def build(output_file='plume-build.html'):
-    """Construit le fichier HTML final"""
-    global log_handle
+def build(output_file='plume-build.html', use_cache=True, normalize_encodings=False, size_report=False,
+          size_budget=None, size_top=DEFAULT_TOP, profile=False, changed=None):
+    """
+    Construit le fichier HTML final.
+    `changed` (mode --watch) : fichiers modifiés depuis le build précédent,
+    seuls ces fichiers sont relus quand les segments gardés en mémoire le permettent.
+    """
+    global log_handle, build_manifest, build_cache, encoding_cache, budget_overruns, profiler, assembly
+    profiler = Profiler(enabled=profile)
     
     # Ouvrir le fichier log
     log_handle = open(LOG_FILE, 'w', encoding='utf-8')
+    build_manifest = load_manifest(BUILD_DIR)
+    
+    # Charger le cache incrémental (conservé en mémoire en mode --watch)
+    if not use_cache:
+        build_cache = None
+    elif build_cache is None:
+        build_cache = BuildCache(BUILD_DIR).load()
+    if build_cache:
+        build_cache.hits = build_cache.misses = 0
+    if encoding_cache is None:
+        encoding_cache = EncodingCache(BUILD_DIR).load()
+    budget_overruns = []
     
     log(f"========================================")
     log(f"Build Plume - {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
@@ -313,64 +251,86 @@ def build(output_file='plume-build.html'):
     log(f"Fichier log: {LOG_FILE}")
     log("")
     
-    # Vérifier que les dossiers existent
-    css_dir = os.path.join(BUILD_DIR, 'css')
-    js_dir = os.path.join(BUILD_DIR, 'js')
-    html_dir = os.path.join(BUILD_DIR, 'html')
+    # Remis à None pendant l'assemblage : une erreur en cours de rebuild force un build complet
+    segments, assembly = assembly, None
+    if not (changed and segments):
+        segments = None
+    if segments:
+        with profiler.phase('Rebuild incremental', files=len(changed)):
+            if not patch_assembly(segments, changed):
+                segments = None
     
-    log("--- Verification des dossiers ---")
-    for d, name in [(css_dir, 'css'), (js_dir, 'js'), (html_dir, 'html')]:
-        if os.path.exists(d):
-            files = os.listdir(d)
-            log(f"   [OK] {name}/ existe ({len(files)} fichiers)")
+    if segments is None:
+        files_read.clear()
+        size_segments.clear()
+        segment_positions.clear()
+        
+        # Vérifier que les dossiers existent
+        css_dir = os.path.join(BUILD_DIR, 'css')
+        js_dir = os.path.join(BUILD_DIR, 'js')
+        html_dir = os.path.join(BUILD_DIR, 'html')
+        
+        log("--- Verification des dossiers ---")
+        with profiler.phase('Verification des dossiers') as span:
+            for d, name in [(css_dir, 'css'), (js_dir, 'js'), (html_dir, 'html')]:
+                if os.path.exists(d):
+                    files = os.listdir(d)
+                    span.count(files=len(files))
+                    log(f"   [OK] {name}/ existe ({len(files)} fichiers)")
+                else:
+                    log(f"   [ERREUR] {name}/ N'EXISTE PAS!")
+        log("")
+        
+        # Lire les templates HTML
+        log("--- Lecture des templates HTML ---")
+        with profiler.phase('Lecture des templates'):
+            head = read_file('html/head.html')
+            body = read_file('html/body.html')
+            footer = read_file('html/footer.html')
+        
+        if not head:
+            log("   [ERREUR] head.html est vide ou manquant!")
         else:
-            log(f"   [ERREUR] {name}/ N'EXISTE PAS!")
-    log("")
-    
-    # Lire les templates HTML
-    log("--- Lecture des templates HTML ---")
-    head = read_file('html/head.html')
-    body = read_file('html/body.html')
-    footer = read_file('html/footer.html')
-    
-    if not head:
-        log("   [ERREUR] head.html est vide ou manquant!")
-    else:
-        log(f"   [OK] head.html ({len(head)} caracteres)")
-    
-    if not body:
-        log("   [ERREUR] body.html est vide ou manquant!")
-    else:
-        log(f"   [OK] body.html ({len(body)} caracteres)")
+            log(f"   [OK] head.html ({len(head)} caracteres)")
         
-    if not footer:
-        log("   [ERREUR] footer.html est vide ou manquant!")
-    else:
-        log(f"   [OK] footer.html ({len(footer)} caracteres)")
-    log("")
-    
-    # Collecter CSS et JS
-    log("--- Collecte CSS ---")
-    css = collect_css()
-    log(f"   Total: {len(css):,} caracteres")
-    log("")
+        if not body:
+            log("   [ERREUR] body.html est vide ou manquant!")
+        else:
+            log(f"   [OK] body.html ({len(body)} caracteres)")
+        
+        if not footer:
+            log("   [ERREUR] footer.html est vide ou manquant!")
+        else:
+            log(f"   [OK] footer.html ({len(footer)} caracteres)")
+        log("")
+        size_segments.extend([('html', 'html/head.html', head), ('html', 'html/body.html', body),
+                              ('html', 'html/footer.html', footer)])
+        segment_positions.update((path, ('html', name)) for name, path in TEMPLATES)
+        
+        # Collecter CSS et JS
+        log("--- Collecte CSS ---")
+        with profiler.phase('Assemblage CSS') as span:
+            css_parts = collect_css()
+            span.count(files=len(css_parts) // 3)
+        log(f"   Total: {joined_length(css_parts):,} caracteres")
+        log("")
+        
+        log("--- Collecte JavaScript ---")
+        with profiler.phase('Assemblage JS') as span:
+            js_parts = collect_js()
+            span.count(files=len(js_parts) // 3)
+        log(f"   Total: {joined_length(js_parts):,} caracteres")
+        log("")
+        segments = dict(positions=dict(segment_positions), head=head, body=body, footer=footer,
+                        css=css_parts, js=js_parts)
     
-    log("--- Collecte JavaScript ---")
-    js = collect_js()
-    log(f"   Total: {len(js):,} caracteres")
-    log("")
+    head, body, footer = segments['head'], segments['body'], segments['footer']
+    css_parts, js_parts = segments['css'], segments['js']
     
-    # Assembler le fichier
-    output = f"""{head}
-    <style>
-{css}
-    </style>
-</head>
-{body}
-    <script>
-{js}
-    </script>
-{footer}"""
+    # Le fichier n'est jamais assemblé en mémoire : il est haché puis écrit
+    # morceau par morceau
+    def output_chunks():
+        return iter_output(head, css_parts, body, js_parts, footer)
     
     # Écrire le fichier
     output_path = os.path.join(BUILD_DIR, 'build', output_file)
@@ -387,38 +347,88 @@ def build(output_file='plume-build.html'):
         log_handle.close()
         return None
     
-    try:
-        with open(output_path, 'w', encoding='utf-8') as f:
-            f.write(output)
-        log(f"   [OK] Fichier ecrit: {output_path}")
-    except Exception as e:
-        log(f"   [ERREUR] Ecriture: {e}")
-        log_handle.close()
-        return None
+    with profiler.phase('Ecriture') as span:
+        digest = hash_chunks(output_chunks()) if build_cache else None
+        if digest and build_cache.output_unchanged(output_path, digest):
+            log(f"   [OK] Sortie inchangee, ecriture ignoree: {output_path}")
+        else:
+            try:
+                write_chunks(output_path, output_chunks())
+                log(f"   [OK] Fichier ecrit: {output_path}")
+            except Exception as e:
+                log(f"   [ERREUR] Ecriture: {e}")
+                log_handle.close()
+                return None
+            if build_cache:
+                build_cache.record_output(output_path, digest)
+            if span:
+                span.count(files=1, bytes=os.path.getsize(output_path))
+    
+    if size_report:
+        with profiler.phase('Rapport de tailles'):
+            budget_overruns = report_sizes(output_path, size_budget, size_top)
+    
+    if build_cache:
+        log(f"   [i] Cache: {build_cache.hits} fichiers reutilises, {build_cache.misses} decodes")
+        with profiler.phase('Sauvegarde du cache'):
+            build_cache.save()
+    
+    if normalize_encodings:
+        report_encodings()
+    encoding_cache.save()
     
     # Vérifier que le fichier existe
-    if os.path.exists(output_path):
-        size = os.path.getsize(output_path)
-        log("")
-        log(f"========================================")
-        log(f"BUILD TERMINE AVEC SUCCES!")
-        log(f"========================================")
-        log(f"Fichier: {output_path}")
-        log(f"Taille: {size:,} octets ({len(output):,} caracteres)")
-    else:
-        log("")
-        log(f"[ERREUR] Le fichier n'a pas ete cree!")
+    with profiler.phase('Verification de la sortie') as span:
+        if os.path.exists(output_path):
+            size = os.path.getsize(output_path)
+            span.count(files=1, bytes=size)
+            log("")
+            log(f"========================================")
+            log(f"BUILD TERMINE AVEC SUCCES!")
+            log(f"========================================")
+            log(f"Fichier: {output_path}")
+            chars = sum(len(chunk) for chunk in output_chunks())
+            log(f"Taille: {size:,} octets ({chars:,} caracteres)")
+        else:
+            log("")
+            log(f"[ERREUR] Le fichier n'a pas ete cree!")
+    
+    if profile:
+        report_profile(output_path)
     
     log_handle.close()
+    assembly = segments
     return output_path
 
 if __name__ == "__main__":
-    output = 'plume-build.html'
-    if len(sys.argv) > 2 and sys.argv[1] == '--output':
-        output = sys.argv[2]
+    parser = argparse.ArgumentParser(description="Build Plume complet")
+    parser.add_argument('--output', default='plume-build.html',
+                        help="nom du fichier genere dans build/")
+    parser.add_argument('--no-cache', action='store_true',
+                        help="ignore le cache incremental (build/.build-cache.pickle)")
+    parser.add_argument('--watch', action='store_true',
+                        help="reste actif et reconstruit a chaque modification des sources")
+    parser.add_argument('--normalize-encodings', action='store_true',
+                        help="liste les fichiers sources qui ne sont pas en UTF-8")
+    parser.add_argument('--size-report', action='store_true',
+                        help="tailles par module et par groupe (build/size-history.json), echec si budget depasse")
+    parser.add_argument('--size-budget', type=int,
+                        help="taille gzip maximale du fichier en octets (remplace le budget \"total\" du manifeste)")
+    parser.add_argument('--size-top', type=int, default=DEFAULT_TOP,
+                        help="nombre de modules affiches dans les plus fortes hausses")
+    parser.add_argument('--profile', action='store_true',
+                        help="chronometre chaque phase (trace Chrome build/*.trace.json et recapitulatif)")
+    args = parser.parse_args()
     
     try:
-        build(output)
+        build_options = dict(use_cache=not args.no_cache,
+                             normalize_encodings=args.normalize_encodings, size_report=args.size_report,
+                             size_budget=args.size_budget, size_top=args.size_top, profile=args.profile)
+        build(args.output, **build_options)
+        if args.watch:
+            watch(BUILD_DIR, lambda changed: build(args.output, changed=changed, **build_options), print)
+        elif budget_overruns:
+            sys.exit(1)
     except Exception as e:
         # En cas d'erreur, écrire dans le log
         with open(LOG_FILE, 'a', encoding='utf-8') as f:
@@ -2,21 +2,35 @@
 """
 Script de build Plume (Version TEST / REFACTOR)
 Collecte les fichiers HTML (head, body, footer), CSS et JS pour produire un fichier unique.
-Usage: python3 build.test.py [--output fichier.html]
+L'ordre des fichiers est celui de la variante "test" de build-manifest.json.
+Usage: python3 build.test.py [--output fichier.html] [--normalize-encodings]
 """
 
 import os
-import sys
-import glob
-import re
+import argparse
 from datetime import datetime
 
+from buildtools.manifest import load as load_manifest
+from buildtools.encoding import EncodingCache
+
 BUILD_DIR = os.path.dirname(os.path.abspath(__file__))
 LOG_FILE = os.path.join(BUILD_DIR, 'build.test.log')
 
+# Variante du manifeste de build (build-manifest.json)
+VARIANT = 'test'
+
 # Fichier log global pour tracer les inclusions
 log_handle = None
 
+# Sources partagées par build-matrix.py (None pour un build isolé)
+source_pool = None
+
+# Encodage détecté de chaque source (build/.encodings.json)
+encoding_cache = None
+
+# Fichiers lus pendant le build courant
+files_read = []
+
 def log(message):
     """Écrit un message dans la console ET dans le fichier log"""
     print(message)
@@ -24,368 +38,75 @@ def log(message):
         log_handle.write(message + '\n')
         log_handle.flush()
 
-# Ordre des fichiers CSS
-CSS_ORDER = [
-    # Vendor CSS (bundled)
-    '../vendor/driver.css',
-    '01.variables.css',
-    '02.base.css',
-    '03.header.css',
-    '04.sidebar.css',
-    '05.modals.css',
-    '06.editor.css',
-    '07.characters.css',
-    '08.visualizations.css',
-    '09.utilities.css',
-    '10.mobile.css',
-    '11.storygrid.css',
-    '12.arc-board.css',
-    '13.thriller-board.css',
-    '14.word-repetition.css' ,
-    '14.product-tour.css' ,
-]
-
-# Ordre des fichiers JS
-JS_ORDER = [
-    # Vendor libraries (bundled)
-    'vendor/driver.js.iife.js',
-    'js-refactor/01.app.refactor.js',
-    '38.tension.js',
-    '02.storage.js',
-    'js-refactor/project/project.model.js',
-    'js-refactor/project/project.repository.js',
-    'js-refactor/project/project.viewmodel.js',
-    'js-refactor/project/project.view.js',
-    'js-refactor/project/project.handlers.js',
-    'js-refactor/project/project.main.js',
-    '04.init.js',
-    'js-refactor/undo-redo/undo-redo.model.js',
-    'js-refactor/undo-redo/undo-redo.repository.js',
-    'js-refactor/undo-redo/undo-redo.viewmodel.js',
-    'js-refactor/undo-redo/undo-redo.view.js',
-    'js-refactor/undo-redo/undo-redo.handlers.js',
-    'js-refactor/undo-redo/undo-redo.main.js',
-    # Structure refactored files 1/2
-    'js-refactor/structure/structure.model.js',
-    'js-refactor/structure/structure.repository.js',
-    'js-refactor/structure/structure.viewmodel.js',
-    # App
-    'js-refactor/00.app.view.js',
-    # Structure refactored files 2/2
-    'js-refactor/structure/structure.view.js',
-    'js-refactor/structure/structure-organizer.view.js',
-    'js-refactor/structure/structure.helpers.js',
-    'js-refactor/stats/stats.model.js',
-    'js-refactor/stats/stats.repository.js',
-    'js-refactor/stats/stats.viewmodel.js',
-    'js-refactor/stats/stats.view.js',
-    'js-refactor/stats/stats.main.js',
-    'js-refactor/auto-detect/auto-detect.model.js',
-    'js-refactor/auto-detect/auto-detect.repository.js',
-    'js-refactor/auto-detect/auto-detect.viewmodel.js',
-    'js-refactor/auto-detect/auto-detect.view.js',
-    'js-refactor/auto-detect/auto-detect.handlers.js',
-    'js-refactor/auto-detect/auto-detect.main.js',
-    '09.floating-editor.js',
-    'js-refactor/10.colorpalette.refactor.js',
-    '12.import-export.js',
-    '13.mobile-menu.js',
-    # Drag and Drop Acts Module
-    'js-refactor/dragndrop-acts/dragndrop-acts.model.js',
-    'js-refactor/dragndrop-acts/dragndrop-acts.repository.js',
-    'js-refactor/dragndrop-acts/dragndrop-acts.viewmodel.js',
-    'js-refactor/dragndrop-acts/dragndrop-acts.view.js',
-    'js-refactor/dragndrop-acts/dragndrop-acts.handlers.js',
-    'js-refactor/dragndrop-acts/dragndrop-acts.main.js',
-    # Characters refactored files 
-    'js-refactor/characters/characters.model.js',
-    'js-refactor/characters/characters.repository.js',
-    'js-refactor/characters/characters.viewmodel.js',
-    'js-refactor/characters/characters.view.js',
-    'js-refactor/16.split-view.js',
-    # World refactored files 
-    'js-refactor/world/world.model.js',
-    'js-refactor/world/world.repository.js',
-    'js-refactor/world/world.viewmodel.js',
-    'js-refactor/world/world.view.js',
-    '18.timeline.js',
-    'js-refactor/notes/notes.model.js',
-    'js-refactor/notes/notes.repository.js',
-    'js-refactor/notes/notes.viewmodel.js',
-    'js-refactor/notes/notes.view.js',
-    'js-refactor/notes/notes.handlers.js',
-    'js-refactor/notes/notes.main.js',
-    '20.snapshots.js',
-    'js-refactor/sceneVersion/sceneVersion.model.js',
-    'js-refactor/sceneVersion/sceneVersion.repository.js',
-    'js-refactor/sceneVersion/sceneVersion.viewmodel.js',
-    'js-refactor/sceneVersion/sceneVersion.view.js',
-    'js-refactor/sceneVersion/sceneVersion.main.js',
-    # Diff refactored files
-    'js-refactor/diff/diff.model.js',
-    'js-refactor/diff/diff.repository.js',
-    'js-refactor/diff/diff.viewmodel.js',
-    'js-refactor/diff/diff.view.js',
-    'js-refactor/diff/diff.handlers.js',
-    'js-refactor/diff/diff.main.js',
-    # Codex refactored files
-    'js-refactor/codex/codex.model.js',
-    'js-refactor/codex/codex.repository.js',
-    'js-refactor/codex/codex.viewmodel.js',
-    'js-refactor/codex/codex.view.js',
-    # Search refactored files (order: model -> repository -> viewmodel -> view -> handlers -> main)
-    'js-refactor/search/search.model.js',
-    'js-refactor/search/search.repository.js',
-    'js-refactor/search/search.viewmodel.js',
-    'js-refactor/search/search.view.js',
-    'js-refactor/search/search.handlers.js',
-    'js-refactor/search/search.main.js',
-    'js-refactor/26.focusMode.refactor.js',
-    '27.keyboardShortcuts.js',
-    'js-refactor/revision/revision.model.js',
-    'js-refactor/revision/revision.repository.js',
-    'js-refactor/revision/revision.viewmodel.js',
-    'js-refactor/revision/revision.view.js',
-    'js-refactor/revision/revision.handlers.js',
-    'js-refactor/revision/revision.main.js',
-    # Todo refactored files (order: model -> repository -> viewmodel -> view -> handlers -> main)
-    'js-refactor/todo/todo.model.js',
-    'js-refactor/todo/todo.repository.js',
-    'js-refactor/todo/todo.viewmodel.js',
-    'js-refactor/todo/todo.view.js',
-    'js-refactor/todo/todo.handlers.js',
-    'js-refactor/todo/todo.main.js',
-    # Corkboard refactored files (order: model -> repository -> viewmodel -> view -> handlers -> main)
-    'js-refactor/corkboard/corkboard.model.js',
-    'js-refactor/corkboard/corkboard.repository.js',
-    'js-refactor/corkboard/corkboard.viewmodel.js',
-    'js-refactor/corkboard/corkboard.view.js',
-    'js-refactor/corkboard/corkboard.handlers.js',
-    'js-refactor/corkboard/corkboard.main.js',
-    # Mindmap refactored files (order: model -> repository -> viewmodel -> view -> handlers -> main)
-    'js-refactor/mindmap/mindmap.model.js',
-    'js-refactor/mindmap/mindmap.repository.js',
-    'js-refactor/mindmap/mindmap.viewmodel.js',
-    'js-refactor/mindmap/mindmap.view.js',
-    'js-refactor/mindmap/mindmap.handlers.js',
-    'js-refactor/mindmap/mindmap.main.js',
-    # Plot module refactored files
-    'js-refactor/plot/plot.model.js',
-    'js-refactor/plot/plot.repository.js',
-    'js-refactor/plot/plot.viewmodel.js',
-    'js-refactor/plot/plot.view.js',
-    'js-refactor/plot/plot.init.js',
-    '34.relations-graph.js',
-    'js-refactor/map/map.model.js',
-    'js-refactor/map/map.repository.js',
-    'js-refactor/map/map.viewmodel.js',
-    'js-refactor/map/map.view.js',
-    'js-refactor/map/map.handlers.js',
-    'js-refactor/map/map.main.js',
-    'js-refactor/timeline-metro/timeline-metro.model.js',
-    'js-refactor/timeline-metro/timeline-metro.repository.js',
-    'js-refactor/timeline-metro/timeline-metro.viewmodel.js',
-    'js-refactor/timeline-metro/timeline-metro.view.js',
-    'js-refactor/timeline-metro/timeline-metro.handlers.js',
-    'js-refactor/timeline-metro/timeline-metro.main.js',
-    '37.theme-manager.js',
-    '39.export.js',
-    '40.sidebar-views.js',
-    '41.storageMonitoring.js',
-    '42.mobile-swipe.js',
-    '44.storygrid.js',
-    # Arc Board
-    'js-refactor/arc-board/arc-board.config.js',
-    'js-refactor/arc-board/arc-board.models.js',
-    'js-refactor/arc-board/arc-board.repository.js',
-    'js-refactor/arc-board/arc-board.viewmodel.js',
-    'js-refactor/arc-board/arc-board.services.js',
-    'js-refactor/arc-board/arc-board.views.js',
-    'js-refactor/arc-board/arc-board.handlers.js',
-    'js-refactor/arc-board/arc-board.main.js',
-    '46.thriller-board.js',
-    # Plot Grid Module
-    'js-refactor/plotgrid/plot-grid.model.js',
-    'js-refactor/plotgrid/plot-grid.repository.js',
-    'js-refactor/plotgrid/plot-grid.viewmodel.js',
-    'js-refactor/plotgrid/plot-grid.import-export.js',
-    'js-refactor/plotgrid/plot-grid.view.js',
-    # Scene Navigation Module
-    'js-refactor/sceneNavigation/scene-navigation.model.js',
-    'js-refactor/sceneNavigation/scene-navigation.repository.js',
-    'js-refactor/sceneNavigation/scene-navigation.viewmodel.js',
-    'js-refactor/sceneNavigation/scene-navigation.view.js',
-    'js-refactor/sceneNavigation/scene-navigation.handlers.js',
-    'js-refactor/sceneNavigation/scene-navigation.main.js',
-    # Synonyms Module (French synonyms dictionary - local)
-    'js-refactor/synonyms/synonyms.config.js',
-    'js-refactor/synonyms/synonyms.model.js',
-    'js-refactor/synonyms/synonyms.dictionary.js',
-    'js-refactor/synonyms/synonyms.service.js',
-    'js-refactor/synonyms/synonyms.repository.js',
-    'js-refactor/synonyms/synonyms.viewmodel.js',
-    'js-refactor/synonyms/synonyms.view.js',
-    # Import Chapter Module (import .docx, .txt, .md, .epub, .pages)
-    'js-refactor/import-chapter/import-chapter.model.js',
-    'js-refactor/import-chapter/import-chapter.viewmodel.js',
-    'js-refactor/import-chapter/import-chapter.view.js',
-    # Word Repetition Analyzer Module
-    'js-refactor/word-repetition/word-repetition.model.js',
-    'js-refactor/word-repetition/word-repetition.repository.js',
-    'js-refactor/word-repetition/word-repetition.viewmodel.js',
-    'js-refactor/word-repetition/word-repetition.view.js',
-    'js-refactor/word-repetition/word-repetition.handlers.js',
-    'js-refactor/word-repetition/word-repetition.main.js',
-    # Product tour
-    'js-refactor/product-tour/product-tour.model.js',
-    'js-refactor/product-tour/product-tour.repository.js',
-    'js-refactor/product-tour/product-tour.viewmodel.js',
-    'js-refactor/product-tour/product-tour.view.js',
-    'js-refactor/product-tour/product-tour.handlers.js',
-    'js-refactor/product-tour/product-tour.main.js',
-]
+def decode_content(data, path):
+    """Décode le contenu brut d'un fichier (encodage détecté en une passe)"""
+    content, encoding = encoding_cache.decode(data, path)
+    if encoding != 'utf-8':
+        log(f"   [!] {path} lu en {encoding} (pas UTF-8)")
+    
+    # Mêmes fins de ligne qu'une lecture en mode texte
+    return content.replace('\r\n', '\n').replace('\r', '\n')
 
 def read_file(path):
-    """Lit un fichier et retourne son contenu, gère plusieurs encodages"""
+    """Lit un fichier et retourne son contenu (encodage détecté en une lecture)"""
     full_path = os.path.join(BUILD_DIR, path)
     if not os.path.exists(full_path):
         log(f"   [!] Fichier non trouve: {full_path}")
         return ''
     
-    # Essayer UTF-8 puis Windows-1252
-    encodings = ['utf-8', 'cp1252', 'latin-1', 'iso-8859-1']
-    for encoding in encodings:
-        try:
-            with open(full_path, 'r', encoding=encoding) as f:
-                content = f.read()
-                return content
-        except UnicodeDecodeError:
-            continue
-    
-    # Si tout échoue, on lit brute
+    files_read.append(path)
+    if source_pool:
+        return source_pool.read(path)
     with open(full_path, 'rb') as f:
-        return f.read().decode('utf-8', errors='replace')
+        return decode_content(f.read(), path)
 
 def collect_css():
     """Collecte tous les fichiers CSS dans l'ordre"""
     css_content = []
-    css_dir = os.path.join(BUILD_DIR, 'css')
-    found_count = 0
-    
-    # D'abord les fichiers dans l'ordre spécifié
-    for filename in CSS_ORDER:
-        if filename.startswith('../vendor/'):
-            # Vendor CSS files (bundled libraries)
-            vendor_path = filename.replace('../', '')
-            filepath = os.path.join(BUILD_DIR, vendor_path)
-            if os.path.exists(filepath):
-                content = read_file(vendor_path)
-                css_content.append(f'/* ========== {vendor_path} ========== */')
-                css_content.append(content)
-                css_content.append('')
-                found_count += 1
-        else:
-            filepath = os.path.join(css_dir, filename)
-            if os.path.exists(filepath):
-                content = read_file(f'css/{filename}')
-                css_content.append(f'/* ========== {filename} ========== */')
-                css_content.append(content)
-                css_content.append('')
-                found_count += 1
+    entries = load_manifest(BUILD_DIR).resolve(VARIANT, 'css').entries
     
-    # Ensuite les fichiers non listés (automatique)
-    for filepath in glob.glob(os.path.join(css_dir, '*.css')):
-        filename = os.path.basename(filepath)
-        if filename not in CSS_ORDER:
-            content = read_file(f'css/{filename}')
-            css_content.append(f'/* ========== {filename} ========== */')
-            css_content.append(content)
-            css_content.append('')
-            found_count += 1
-    
-    # Ajouter les CSS des modules dans js-refactor/
-    module_css_files = [
-        'js-refactor/synonyms/synonyms.css',
-        'js-refactor/map/map.css'
-    ]
-    for css_path in module_css_files:
-        filepath = os.path.join(BUILD_DIR, css_path)
-        if os.path.exists(filepath):
-            content = read_file(css_path)
-            css_content.append(f'/* ========== {css_path} ========== */')
-            css_content.append(content)
-            css_content.append('')
-            found_count += 1
+    for path, label in entries:
+        content = read_file(path)
+        css_content.append(f'/* ========== {label} ========== */')
+        css_content.append(content)
+        css_content.append('')
 
-    log(f"   [OK] {found_count} fichiers CSS trouves")
+    log(f"   [OK] {len(entries)} fichiers CSS trouves")
     return '\n'.join(css_content)
 
-# Fichiers originaux à ignorer s'ils sont dans js/ (car refactorisés dans js-refactor/)
-IGNORED_ORIGINALS = [
-    '03.project.js', '06.structure.js', '07.stats.js', '08.auto-detect.js',
-    '15.characters.js', '17.world.js', '01.app.js', '10.colorpalette.js',
-    '21.sceneVersions.js', '22.diff.js', '_22.diff.js', '26.focusMode.js', '28.revision.js', '29.todos.js',
-    '24.codex.js', '25.globalSearch.js', '19.notes.js',
-    '30.corkboard.js', '30.corkboard.refactor.js', '31.mindmap.js', '32.touch-events.js', '33.plot.js', '35.renderMap.js', '43.arcs.js', '45.arc-board.js',
-    '45.arc-board.refactor.js', '46.thriller-board.js', '44.storygrid.js', '36.timeline-metro.js',
-    '11.updateStats.js', '23.stats.js', '_35.renderMap.js', '14.dragndrop-acts.js'
-]
-
 def collect_js():
     """Collecte tous les fichiers JS dans l'ordre"""
     js_content = []
-    found_count = 0
+    entries = load_manifest(BUILD_DIR).resolve(VARIANT, 'js').entries
     
-    # D'abord les fichiers dans l'ordre spécifié
-    for filename in JS_ORDER:
-        if filename.startswith('vendor/'):
-            # Vendor files (bundled libraries)
-            filepath = os.path.join(BUILD_DIR, filename)
-            if os.path.exists(filepath):
-                content = read_file(filename)
-                js_content.append(f'// ========== {filename} ==========')
-                js_content.append(content)
-                js_content.append('')
-                found_count += 1
-        elif filename.startswith('js-refactor/'):
-            filepath = os.path.join(BUILD_DIR, filename)
-            if os.path.exists(filepath):
-                content = read_file(filename)
-                js_content.append(f'// ========== {filename} ==========')
-                js_content.append(content)
-                js_content.append('')
-                found_count += 1
-        else:
-            filepath = os.path.join(BUILD_DIR, 'js', filename)
-            if os.path.exists(filepath):
-                content = read_file(f'js/{filename}')
-                js_content.append(f'// ========== {filename} ==========')
-                js_content.append(content)
-                js_content.append('')
-                found_count += 1
-    
-    # Ensuite les fichiers non listés dans js/
-    js_dir = os.path.join(BUILD_DIR, 'js')
-    for filepath in glob.glob(os.path.join(js_dir, '*.js')):
-        filename = os.path.basename(filepath)
-        # Ne pas inclure si déjà dans JS_ORDER ou si c'est un original refactorisé
-        if (filename not in JS_ORDER and 
-            f'js-refactor/{filename}' not in JS_ORDER and 
-            filename not in IGNORED_ORIGINALS and
-            not filename.startswith('_')):
-            content = read_file(f'js/{filename}')
-            js_content.append(f'// ========== {filename} ==========')
-            js_content.append(content)
-            js_content.append('')
-            found_count += 1
+    for path, label in entries:
+        content = read_file(path)
+        js_content.append(f'// ========== {label} ==========')
+        js_content.append(content)
+        js_content.append('')
             
-    log(f"   [OK] {found_count} fichiers JS trouves")
+    log(f"   [OK] {len(entries)} fichiers JS trouves")
     return '\n'.join(js_content)
 
-def build(output_file=None):
+def report_encodings():
+    """Liste les fichiers lus qui ne sont pas en UTF-8"""
+    log("--- Encodages ---")
+    paths = list(dict.fromkeys(files_read))
+    non_utf8 = encoding_cache.non_utf8(paths)
+    if not non_utf8:
+        log(f"   [OK] {len(paths)} fichiers, tous en UTF-8")
+        return
+    log(f"   [!] {len(non_utf8)} fichiers ne sont pas en UTF-8 (a convertir):")
+    for path, encoding in non_utf8:
+        log(f"      - {path} ({encoding})")
+
+def build(output_file=None, normalize_encodings=False):
     """Construit le fichier HTML final"""
-    global log_handle
+    global log_handle, encoding_cache
     log_handle = open(LOG_FILE, 'w', encoding='utf-8')
+    if encoding_cache is None:
+        encoding_cache = EncodingCache(BUILD_DIR).load()
+    files_read.clear()
     
     log(f"========================================")
     log(f"Build Plume TEST - {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
@@ -423,14 +144,21 @@ def build(output_file=None):
     with open(output_path, 'w', encoding='utf-8') as f:
         f.write(output)
     
+    if normalize_encodings:
+        report_encodings()
+    encoding_cache.save()
+    
     log(f"BUILD TERMINE: {output_path}")
     log_handle.close()
     return output_path
 
 if __name__ == "__main__":
-    output = None
-    if len(sys.argv) > 2 and sys.argv[1] == '--output':
-        output = sys.argv[2]
+    parser = argparse.ArgumentParser(description="Build Plume TEST / REFACTOR")
+    parser.add_argument('--output', help="nom du fichier genere dans build/")
+    parser.add_argument('--normalize-encodings', action='store_true',
+                        help="liste les fichiers sources qui ne sont pas en UTF-8")
+    args = parser.parse_args()
+    output = args.output
         
     print(f"Build Test -> {output if output else 'auto-generated name'}") 
-    build(output)
+    build(output, normalize_encodings=args.normalize_encodings)
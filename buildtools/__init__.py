@@ -0,0 +1,4 @@
+"""
+Outils partagés par les scripts de build et de déploiement de Plume
+(build.py, build.light.py, deploy-to-live.py...).
+"""
@@ -0,0 +1,248 @@
+"""
+Dépôt d'artefacts de build adressé par contenu (build/.artifacts/).
+
+Chaque fichier généré est rangé une seule fois sous le hash de son contenu
+(objects/<hash>.html) ; le nom horodaté demandé dans build/
+(plume-light-AAAA.MM.JJ.HH.MM.html...) n'est qu'un lien physique vers cet
+objet, ou une copie si le système de fichiers ne le permet pas. Un build
+identique au précédent n'écrit donc rien : le nom est simplement lié à
+l'objet existant.
+
+L'index (build/.artifacts/index.json) associe chaque nom publié à son hash,
+à sa date et à la variante qui l'a produit. La rétention s'applique à
+chaque variante séparément (un --keep-last du build light ne touche pas
+aux sorties de build-timestamp.py) : elle garde les N derniers noms et/ou
+ceux des N derniers jours ; les noms plus anciens sont supprimés de build/
+avec leurs versions précompressées (.gz, .xz), puis les objets qui ne sont
+plus référencés.
+
+Utilisable seul :  python3 -m buildtools.artifacts list
+                   python3 -m buildtools.artifacts prune --keep-last 20 --keep-days 14 [--variant light]
+"""
+
+import argparse
+import json
+import os
+import re
+import sys
+import time
+from datetime import datetime
+
+from buildtools import fastcopy
+from buildtools.cache import hash_bytes
+from buildtools.compress import CODECS
+
+STORE_DIRNAME = '.artifacts'
+INDEX_FILENAME = 'index.json'
+INDEX_VERSION = 1
+
+# Caractères du hash gardés dans le nom d'un objet (80 bits)
+OBJECT_HASH_LENGTH = 20
+
+# Versions précompressées publiées à côté d'un nom (buildtools/compress.py)
+SIBLING_EXTENSIONS = tuple(extension for extension, _ in CODECS.values())
+
+# Horodatage des noms par défaut (plume-light-AAAA.MM.JJ.HH.MM.html)
+TIMESTAMP_SUFFIX_RE = re.compile(r'-\d{4}(?:\.\d{2}){4}$')
+
+
+def variant_of(name, entry):
+    """Variante d'un nom publié ; pour les entrées antérieures au champ, son préfixe sans horodatage"""
+    if entry.get('variant'):
+        return entry['variant']
+    return TIMESTAMP_SUFFIX_RE.sub('', os.path.splitext(os.path.basename(name))[0])
+
+
+class ArtifactStore:
+    """Objets adressés par contenu et noms publiés dans build/"""
+
+    def __init__(self, build_dir):
+        self.output_dir = os.path.join(build_dir, 'build')
+        self.root = os.path.join(self.output_dir, STORE_DIRNAME)
+        self.objects_dir = os.path.join(self.root, 'objects')
+        self.index_path = os.path.join(self.root, INDEX_FILENAME)
+        self.names = {}
+
+    def load(self):
+        """Charge l'index existant (ignoré s'il est absent ou invalide)"""
+        try:
+            with open(self.index_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return self
+        if isinstance(data, dict) and data.get('version') == INDEX_VERSION:
+            self.names = data.get('names', {})
+        return self
+
+    def save(self):
+        """Écrit l'index (écriture atomique)"""
+        os.makedirs(self.root, exist_ok=True)
+        tmp_path = self.index_path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'version': INDEX_VERSION, 'names': self.names}, f, indent=1, sort_keys=True)
+        os.replace(tmp_path, self.index_path)
+
+    def object_name(self, digest, extension):
+        return digest[:OBJECT_HASH_LENGTH] + extension
+
+    def object_path(self, digest, extension):
+        """Chemin de l'objet d'un contenu de hash `digest`"""
+        return os.path.join(self.objects_dir, self.object_name(digest, extension))
+
+    def has(self, digest, extension):
+        return os.path.exists(self.object_path(digest, extension))
+
+    def store(self, digest, extension, write):
+        """
+        Range un contenu s'il n'est pas déjà présent : `write(chemin)` écrit
+        le fichier. Retourne False si l'objet existait (rien n'est écrit).
+        """
+        path = self.object_path(digest, extension)
+        if os.path.exists(path):
+            return False
+        os.makedirs(self.objects_dir, exist_ok=True)
+        write(path)
+        return True
+
+    def publish(self, digest, extension, output_path, variant=None):
+        """
+        Publie l'objet sous `output_path` (lien physique, sinon copie) et
+        l'inscrit dans l'index pour `variant`. Retourne la méthode utilisée.
+        """
+        source = self.object_path(digest, extension)
+        if fastcopy.same_file(source, output_path):
+            method = 'present'
+        else:
+            method = fastcopy.copy_file(source, output_path, link=True)
+        entry = {
+            'object': self.object_name(digest, extension),
+            'date': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+            'time': time.time(),
+            'size': os.path.getsize(source),
+        }
+        if variant:
+            entry['variant'] = variant
+        self.names[os.path.relpath(output_path, self.output_dir)] = entry
+        return method
+
+    def prune(self, keep_last=None, keep_days=None, protected=(), now=None, variant=None):
+        """
+        Applique la rétention à chaque variante (à `variant` seulement si
+        indiquée) : un nom est gardé s'il fait partie des `keep_last` plus
+        récents de sa variante, s'il a moins de `keep_days` jours (sans
+        limite, tous les noms sont gardés) ou s'il est dans `protected` (sortie
+        du build en cours, chemin relatif à build/). Supprime les noms expirés
+        et leurs .gz/.xz, puis les objets orphelins. Retourne (fichiers
+        supprimés de build/, objets supprimés, octets libérés).
+        """
+        if keep_last is None and keep_days is None:
+            removed_objects, freed = self.collect_garbage()
+            return [], removed_objects, freed
+        now = now or time.time()
+        groups = {}
+        for name, entry in self.names.items():
+            groups.setdefault(variant_of(name, entry), []).append((name, entry))
+        expired = []
+        for group, members in groups.items():
+            if variant is not None and group != variant:
+                continue
+            ordered = sorted(members, key=lambda item: item[1]['time'], reverse=True)
+            for rank, (name, entry) in enumerate(ordered):
+                recent = keep_last is not None and rank < keep_last
+                age = now - entry['time']
+                young = keep_days is not None and age < keep_days * 86400
+                if not (recent or young or name in protected):
+                    expired.append(name)
+
+        removed = []
+        freed = 0
+        for name in expired:
+            entry = self.names.pop(name)
+            if not self.owns(name, entry):
+                continue
+            for path in [name] + [name + extension for extension in SIBLING_EXTENSIONS]:
+                full_path = os.path.join(self.output_dir, path)
+                if os.path.isfile(full_path):
+                    if path != name:
+                        freed += os.path.getsize(full_path)
+                    os.remove(full_path)
+                    removed.append(path)
+        removed_objects, freed_objects = self.collect_garbage()
+        return removed, removed_objects, freed + freed_objects
+
+    def owns(self, name, entry):
+        """Vrai si build/`name` est toujours la publication de l'objet (lien, ou copie identique)"""
+        path = os.path.join(self.output_dir, name)
+        if not os.path.isfile(path):
+            return False
+        if fastcopy.same_file(os.path.join(self.objects_dir, entry['object']), path):
+            return True
+        # Fichier remplacé depuis par un autre contenu : il n'appartient plus au dépôt
+        with open(path, 'rb') as f:
+            return hash_bytes(f.read()).startswith(os.path.splitext(entry['object'])[0])
+
+    def collect_garbage(self):
+        """Supprime les objets qu'aucun nom ne référence, retourne (objets, octets)"""
+        referenced = {entry['object'] for entry in self.names.values()}
+        removed = []
+        freed = 0
+        if not os.path.isdir(self.objects_dir):
+            return removed, freed
+        for name in sorted(os.listdir(self.objects_dir)):
+            if name in referenced:
+                continue
+            path = os.path.join(self.objects_dir, name)
+            freed += os.path.getsize(path)
+            os.remove(path)
+            removed.append(name)
+        return removed, freed
+
+    def disk_usage(self):
+        """(nombre d'objets, octets occupés par les objets)"""
+        if not os.path.isdir(self.objects_dir):
+            return 0, 0
+        names = os.listdir(self.objects_dir)
+        return len(names), sum(os.path.getsize(os.path.join(self.objects_dir, name)) for name in names)
+
+
+def log_prune_report(removed_names, removed_objects, freed, log):
+    """Affiche le résultat de la rétention"""
+    if not removed_names and not removed_objects:
+        log("   [OK] Retention: aucun artefact expire")
+        return
+    log(f"   [i] Retention: {len(removed_names)} fichiers et {len(removed_objects)} objets supprimes "
+        f"({freed:,} octets liberes)")
+    for name in removed_names:
+        log(f"      - {name}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Depot d'artefacts de build (build/.artifacts)")
+    sub = parser.add_subparsers(dest='command', required=True)
+    sub.add_parser('list', help="noms publies et objets correspondants")
+    prune = sub.add_parser('prune', help="applique la retention et supprime les objets orphelins")
+    prune.add_argument('--keep-last', type=int, help="nombre de noms les plus recents conserves")
+    prune.add_argument('--keep-days', type=float, help="age maximal (jours) des noms conserves")
+    prune.add_argument('--variant', help="ne traite que cette variante (defaut: chacune separement)")
+    args = parser.parse_args(argv)
+
+    build_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    store = ArtifactStore(build_dir).load()
+    if args.command == 'list':
+        for name, entry in sorted(store.names.items(), key=lambda item: item[1]['time']):
+            print(f"   {entry['date']}  {variant_of(name, entry):<16} {name:<45} {entry['object']}  {entry['size']:>11,}")
+        objects, size = store.disk_usage()
+        published = sum(entry['size'] for entry in store.names.values())
+        print(f"[OK] {len(store.names)} noms, {objects} objets ({size:,} octets pour {published:,} publies)")
+        return 0
+    if args.keep_last is None and args.keep_days is None:
+        print("[!] Indiquer --keep-last et/ou --keep-days", file=sys.stderr)
+        return 2
+    removed_names, removed_objects, freed = store.prune(args.keep_last, args.keep_days, variant=args.variant)
+    store.save()
+    log_prune_report(removed_names, removed_objects, freed, print)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,305 @@
+"""
+Banc de mesure des scripts de build et de déploiement.
+
+Génère une arborescence source synthétique (N modules JS de taille
+configurable, feuilles CSS, une part de fichiers en cp1252 pour exercer la
+détection d'encodage de read_file()), y copie les scripts et buildtools/,
+puis chronomètre chaque script sur plusieurs exécutions :
+- cold : caches et manifestes de build/ supprimés (et /live vidé pour le
+  déploiement) ;
+- warm : rien n'a changé depuis l'exécution précédente ;
+- edit : un module modifié avant chaque exécution.
+Chaque exécution est un processus séparé, démarrage de l'interpréteur
+compris (mesuré à part dans la phase "startup").
+
+Le résultat (médiane, percentiles, min, max par script et par phase) est
+écrit en JSON. Par défaut le nombre de modules est celui de la variante
+light actuelle ; --scale 10 mesure un projet dix fois plus gros.
+
+Utilisable seul :  python3 -m buildtools.bench --scale 10 --runs 5
+"""
+
+import argparse
+import json
+import os
+import platform
+import random
+import shlex
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+BENCH_VERSION = 1
+
+# Script -> arguments, dans l'ordre des mesures
+SCRIPTS = {
+    'build.py': ['--output', 'bench-full.html'],
+    'build.light.py': ['--output', 'bench-light.html'],
+    'build.test.py': ['--output', 'bench-test.html'],
+    'build-timestamp.py': ['--output', 'bench-timestamp.html'],
+    'deploy-to-live.py': [],
+}
+
+PHASES = ['cold', 'warm', 'edit']
+
+# État de build/ supprimé avant une mesure "cold"
+COLD_FILES = ['.build-cache.pickle', '.encodings.json', '.manifest.pickle', '.deploy-manifest.json']
+
+PERCENTILES = [50, 90, 95, 99]
+
+# Modules par groupe de js-refactor/ (un groupe = une fonctionnalité)
+GROUP_SIZE = 5
+# Un fichier CSS pour CSS_RATIO modules JS
+CSS_RATIO = 10
+
+WORDS = ['scene', 'chapitre', 'personnage', 'projet', 'revision', 'note', 'intrigue', 'lieu',
+         'chronologie', 'statistique', 'editeur', 'sauvegarde', 'export', 'recherche', 'theme']
+ACCENTED = ['é', 'è', 'à', 'ç', 'ê', 'ô', 'œ', 'ù']
+
+
+def percentile(values, p):
+    """Percentile `p` (0-100) par interpolation linéaire entre les rangs"""
+    ordered = sorted(values)
+    if not ordered:
+        return None
+    rank = (len(ordered) - 1) * p / 100.0
+    low = int(rank)
+    high = min(low + 1, len(ordered) - 1)
+    return ordered[low] + (ordered[high] - ordered[low]) * (rank - low)
+
+
+def summarize(seconds):
+    """Statistiques d'une série de durées"""
+    stats = {'runs': len(seconds), 'seconds': [round(value, 6) for value in seconds]}
+    stats['min'] = round(min(seconds), 6)
+    stats['max'] = round(max(seconds), 6)
+    stats['mean'] = round(sum(seconds) / len(seconds), 6)
+    for p in PERCENTILES:
+        stats['median' if p == 50 else f'p{p}'] = round(percentile(seconds, p), 6)
+    return stats
+
+
+def current_shape(build_dir):
+    """(nombre de modules JS, taille moyenne en octets) de la variante light actuelle"""
+    from buildtools.manifest import load as load_manifest
+
+    paths = [path for path, _ in load_manifest(build_dir).resolve('light', 'js').entries]
+    total = sum(os.path.getsize(os.path.join(build_dir, path)) for path in paths)
+    return len(paths), total // max(1, len(paths))
+
+
+def js_module(rng, name, size, accented):
+    """Source JS synthétique d'environ `size` caractères"""
+    parts = [f'/**\n * Module synthetique {name}\n */\n']
+    length = len(parts[0])
+    index = 0
+    while length < size:
+        word = rng.choice(WORDS)
+        label = word + (rng.choice(ACCENTED) if accented else '')
+        part = (f'// Mise a jour de {label} {index}\n'
+                f'function {name}_{word}{index}(items, options) {{\n'
+                f'    const result = items.filter(item => item.type === "{label}");\n'
+                f'    if (options && options.sort) result.sort((a, b) => a.order - b.order);\n'
+                f'    return result.map(item => `<div class="{word}-item">${{item.title}}</div>`).join("");\n'
+                f'}}\n\n')
+        parts.append(part)
+        length += len(part)
+        index += 1
+    return ''.join(parts)
+
+
+def css_sheet(rng, name, size, accented):
+    """Feuille CSS synthétique d'environ `size` caractères"""
+    parts = [f'/* Feuille synthetique {name}{" - " + "".join(ACCENTED) if accented else ""} */\n']
+    length = len(parts[0])
+    index = 0
+    while length < size:
+        word = rng.choice(WORDS)
+        part = (f'.{name}-{word}-{index} {{\n    display: flex;\n    margin: {index % 16}px;\n'
+                f'    color: var(--{word}-color, #{rng.randrange(0x1000000):06x});\n}}\n\n')
+        parts.append(part)
+        length += len(part)
+        index += 1
+    return ''.join(parts)
+
+
+def write_source(path, content, legacy):
+    """Écrit un fichier source en UTF-8, ou en cp1252 (`legacy`)"""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'w', encoding='cp1252' if legacy else 'utf-8', newline='\n') as f:
+        f.write(content)
+
+
+def generate_tree(source_dir, tree_dir, modules, module_size, non_utf8, seed):
+    """
+    Crée l'arborescence synthétique dans `tree_dir`. Retourne sa description
+    (nombres de fichiers, octets) et le chemin du module modifié en phase "edit".
+    """
+    rng = random.Random(seed)
+    for name in list(SCRIPTS):
+        shutil.copy2(os.path.join(source_dir, name), os.path.join(tree_dir, name))
+    shutil.copytree(os.path.join(source_dir, 'buildtools'), os.path.join(tree_dir, 'buildtools'),
+                    ignore=shutil.ignore_patterns('__pycache__'))
+    shutil.copytree(os.path.join(source_dir, 'html'), os.path.join(tree_dir, 'html'))
+
+    groups = {}
+    legacy_count = 0
+    total = 0
+    js_paths = []
+    for i in range(modules):
+        # Moitié de modules historiques (js/, inclus par motif glob), moitié de groupes js-refactor/
+        if i % 2:
+            group = f'feature{i // (2 * GROUP_SIZE):04d}'
+            path = f'js-refactor/{group}/{group}.part{i:05d}.js'
+            groups.setdefault(group, []).append(path)
+        else:
+            path = f'js/{i:05d}.module.js'
+        legacy = rng.random() < non_utf8
+        size = int(module_size * rng.uniform(0.5, 1.5))
+        content = js_module(rng, f'm{i}', size, legacy)
+        write_source(os.path.join(tree_dir, path), content, legacy)
+        legacy_count += legacy
+        total += len(content)
+        js_paths.append(path)
+    for i in range(max(1, modules // CSS_RATIO)):
+        legacy = rng.random() < non_utf8
+        content = css_sheet(rng, f's{i}', int(module_size * rng.uniform(0.5, 1.5)), legacy)
+        write_source(os.path.join(tree_dir, f'css/{i:04d}.synthetic.css'), content, legacy)
+        legacy_count += legacy
+        total += len(content)
+
+    variant = {
+        'css': [{'glob': 'css/*.css'}],
+        'js': [{'group': group} for group in groups] + [{'glob': 'js/*.js'}],
+    }
+    manifest = {
+        'groups': dict(groups, html=['html/head.html', 'html/body.html', 'html/footer.html']),
+        'variants': {name: dict(variant, description=f'Variante synthetique {name}')
+                     for name in ('full', 'test', 'light')},
+        'deploy': {'variant': 'light', 'files': [{'group': 'html'}]},
+    }
+    with open(os.path.join(tree_dir, 'build-manifest.json'), 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2)
+
+    shape = {
+        'modules': modules,
+        'css_files': max(1, modules // CSS_RATIO),
+        'groups': len(groups),
+        'non_utf8_files': legacy_count,
+        'characters': total,
+    }
+    return shape, js_paths[len(js_paths) // 2]
+
+
+def prepare(tree_dir, phase, run, edit_path):
+    """Met l'arborescence dans l'état de la phase avant une exécution"""
+    if phase == 'cold':
+        for name in COLD_FILES:
+            path = os.path.join(tree_dir, 'build', name)
+            if os.path.exists(path):
+                os.remove(path)
+        shutil.rmtree(os.path.join(tree_dir, 'live'), ignore_errors=True)
+    elif phase == 'edit':
+        with open(os.path.join(tree_dir, edit_path), 'a', encoding='utf-8') as f:
+            f.write(f'\n// Modification {run}\n')
+
+
+def run_script(tree_dir, command):
+    """Durée (secondes) d'une exécution ; échec si le script échoue"""
+    start = time.perf_counter()
+    result = subprocess.run(command, cwd=tree_dir, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+    elapsed = time.perf_counter() - start
+    if result.returncode:
+        raise RuntimeError(f"{' '.join(command[1:])}: code {result.returncode}\n"
+                           f"{result.stderr.decode('utf-8', 'replace')}")
+    return elapsed
+
+
+def bench(tree_dir, scripts, phases, runs, edit_path, extra_args, log=print):
+    """Mesure chaque script et chaque phase, retourne la liste des résultats"""
+    results = []
+    startup = [run_script(tree_dir, [sys.executable, '-c', 'pass']) for _ in range(runs)]
+    results.append(dict(script='python', phase='startup', **summarize(startup)))
+    for script in scripts:
+        command = [sys.executable, script] + SCRIPTS[script] + extra_args.get(script, [])
+        for phase in phases:
+            if phase != 'cold':
+                # Exécution non mesurée : caches à jour pour la phase
+                run_script(tree_dir, command)
+            seconds = []
+            for run in range(runs):
+                prepare(tree_dir, phase, run, edit_path)
+                seconds.append(run_script(tree_dir, command))
+            stats = summarize(seconds)
+            log(f"   {script:<20} {phase:<6} median {stats['median'] * 1000:>9.1f} ms   "
+                f"p90 {stats['p90'] * 1000:>9.1f} ms   max {stats['max'] * 1000:>9.1f} ms")
+            results.append(dict(script=script, phase=phase, **stats))
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Mesure les scripts de build et de deploiement sur un projet synthetique")
+    parser.add_argument('--scale', type=float, default=1.0,
+                        help="multiplie le nombre de modules de la variante light actuelle")
+    parser.add_argument('--modules', type=int, help="nombre de modules JS (remplace --scale)")
+    parser.add_argument('--module-size', type=int,
+                        help="taille moyenne d'un module en caracteres (defaut: moyenne actuelle)")
+    parser.add_argument('--non-utf8', type=float, default=0.05,
+                        help="part des fichiers ecrits en cp1252 (0-1)")
+    parser.add_argument('--runs', type=int, default=5, help="executions mesurees par phase")
+    parser.add_argument('--script', action='append', choices=list(SCRIPTS), dest='scripts',
+                        help="script a mesurer (repetable, defaut: tous)")
+    parser.add_argument('--phase', action='append', choices=PHASES, dest='phases',
+                        help="phase a mesurer (repetable, defaut: toutes)")
+    parser.add_argument('--light-options', default='',
+                        help="options ajoutees a build.light.py (ex: --light-options=\"--minify --tree-shake\")")
+    parser.add_argument('--seed', type=int, default=1, help="graine du generateur de sources")
+    parser.add_argument('--json', help="fichier de resultats (defaut: build/bench-AAAAMMJJ-HHMMSS.json)")
+    parser.add_argument('--keep', action='store_true', help="conserve l'arborescence synthetique")
+    args = parser.parse_args(argv)
+
+    build_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    count, average = current_shape(build_dir)
+    modules = args.modules or max(1, round(count * args.scale))
+    module_size = args.module_size or average
+
+    tree_dir = tempfile.mkdtemp(prefix='plume-bench-')
+    try:
+        print(f"--- Arborescence synthetique: {tree_dir} ---")
+        shape, edit_path = generate_tree(build_dir, tree_dir, modules, module_size, args.non_utf8, args.seed)
+        print(f"   [OK] {shape['modules']} modules JS, {shape['css_files']} CSS, "
+              f"{shape['non_utf8_files']} fichiers cp1252, {shape['characters']:,} caracteres")
+        print(f"--- Mesures ({args.runs} executions par phase) ---")
+        results = bench(tree_dir, args.scripts or list(SCRIPTS), args.phases or PHASES, args.runs,
+                        edit_path, {'build.light.py': shlex.split(args.light_options)})
+    except RuntimeError as e:
+        print(f"   [ERREUR] {e}")
+        return 1
+    finally:
+        if not args.keep:
+            shutil.rmtree(tree_dir, ignore_errors=True)
+
+    report = {
+        'version': BENCH_VERSION,
+        'date': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpus': os.cpu_count(),
+        'tree': dict(shape, scale=args.scale if not args.modules else modules / count,
+                     module_size=module_size, non_utf8=args.non_utf8, seed=args.seed),
+        'options': {'build.light.py': args.light_options},
+        'results': results,
+    }
+    json_path = args.json or os.path.join(build_dir, 'build', f"bench-{datetime.now().strftime('%Y%m%d-%H%M%S')}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(json_path)), exist_ok=True)
+    with open(json_path, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2)
+    print(f"[OK] Resultats: {json_path}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,57 @@
+"""
+Écriture en flux du fichier HTML final.
+
+Plutôt que d'assembler le bundle dans une seule chaîne (plusieurs copies de
+plusieurs Mo en mémoire), les scripts de build décrivent la sortie comme une
+suite de morceaux (head, balise <style>, chaque segment CSS, body...). Ces
+morceaux sont hachés puis écrits un par un : la mémoire consommée ne dépend
+plus du nombre de modules.
+"""
+
+import hashlib
+import os
+
+
+def join_lines(parts):
+    """Équivalent en flux de '\\n'.join(parts)"""
+    first = True
+    for part in parts:
+        if not first:
+            yield '\n'
+        first = False
+        yield part
+
+
+def joined_length(parts):
+    """Longueur de '\\n'.join(parts) sans construire la chaîne"""
+    if not parts:
+        return 0
+    return sum(len(part) for part in parts) + len(parts) - 1
+
+
+def hash_chunks(chunks):
+    """Hash SHA-256 (hex) de la concaténation UTF-8 des morceaux"""
+    digest = hashlib.sha256()
+    for chunk in chunks:
+        digest.update(chunk.encode('utf-8'))
+    return digest.hexdigest()
+
+
+def write_chunks(output_path, chunks):
+    """
+    Écrit les morceaux dans `output_path` via un fichier temporaire remplacé
+    atomiquement. Retourne le nombre de caractères écrits.
+    """
+    tmp_path = output_path + '.tmp'
+    chars = 0
+    try:
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            for chunk in chunks:
+                f.write(chunk)
+                chars += len(chunk)
+        os.replace(tmp_path, output_path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    return chars
@@ -0,0 +1,163 @@
+"""
+Cache de build incrémental.
+
+Le manifeste (build/.build-cache.pickle) associe chaque fichier source à sa
+taille, sa date de modification, le hash de son contenu brut et le texte
+décodé, ainsi que les transformations qui en dérivent (minification...).
+Un fichier dont la taille et la date n'ont pas bougé n'est ni relu ni
+redécodé ; un fichier « touché » mais identique (checkout git...) est relu
+mais pas redécodé. Le hash de chaque sortie est aussi conservé pour éviter de
+réécrire un bundle identique. `read()` peut être appelé depuis plusieurs
+threads (collecte parallèle).
+
+Le manifeste est sérialisé avec pickle plutôt qu'en JSON : il contient
+plusieurs Mo de texte et son chargement doit rester négligeable.
+"""
+
+import hashlib
+import os
+import pickle
+import threading
+
+CACHE_VERSION = 1
+CACHE_FILENAME = '.build-cache.pickle'
+
+
+def hash_bytes(data):
+    """Retourne le hash SHA-256 (hex) d'un contenu binaire"""
+    return hashlib.sha256(data).hexdigest()
+
+
+def hash_text(text):
+    """Retourne le hash SHA-256 (hex) d'un texte encodé en UTF-8"""
+    return hash_bytes(text.encode('utf-8'))
+
+
+class BuildCache:
+    """Manifeste persistant des sources décodées et des sorties écrites"""
+
+    def __init__(self, build_dir):
+        self.build_dir = build_dir
+        self.path = os.path.join(build_dir, 'build', CACHE_FILENAME)
+        self.sources = {}
+        self.outputs = {}
+        self.hits = 0
+        self.misses = 0
+        self.dirty = False
+        self._lock = threading.Lock()
+
+    def load(self):
+        """Charge le manifeste existant (ignoré s'il est absent ou invalide)"""
+        try:
+            with open(self.path, 'rb') as f:
+                data = pickle.load(f)
+        except (OSError, pickle.UnpicklingError, EOFError, AttributeError, ImportError):
+            # AttributeError/ImportError : classe d'un résultat dérivé introuvable
+            return self
+        if not isinstance(data, dict) or data.get('version') != CACHE_VERSION:
+            return self
+        self.sources = data.get('sources', {})
+        self.outputs = data.get('outputs', {})
+        return self
+
+    def save(self):
+        """Écrit le manifeste s'il a changé (écriture atomique)"""
+        if not self.dirty:
+            return
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        tmp_path = self.path + '.tmp'
+        with open(tmp_path, 'wb') as f:
+            pickle.dump({
+                'version': CACHE_VERSION,
+                'sources': self.sources,
+                'outputs': self.outputs,
+            }, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, self.path)
+        self.dirty = False
+
+    def read(self, path, decode):
+        """
+        Retourne le contenu décodé de `path` (relatif à build_dir).
+        `decode(data, path)` n'est appelé que si le contenu brut a changé.
+        """
+        full_path = os.path.join(self.build_dir, path)
+        st = os.stat(full_path)
+        entry = self.sources.get(path)
+        if entry and entry['size'] == st.st_size and entry['mtime_ns'] == st.st_mtime_ns:
+            with self._lock:
+                self.hits += 1
+            return entry['content']
+
+        with open(full_path, 'rb') as f:
+            data = f.read()
+        digest = hash_bytes(data)
+        reused = bool(entry) and entry['sha256'] == digest
+        content = entry['content'] if reused else decode(data, path)
+
+        with self._lock:
+            if reused:
+                self.hits += 1
+            else:
+                self.misses += 1
+            self.sources[path] = {
+                'size': st.st_size,
+                'mtime_ns': st.st_mtime_ns,
+                'sha256': digest,
+                'content': content,
+                'derived': entry.get('derived', {}) if reused else {},
+            }
+            self.dirty = True
+        return content
+
+    def derive(self, path, key, func):
+        """
+        Retourne func(contenu de `path`), mémorisé sous `key` tant que le
+        source ne change pas (minification...). `path` doit avoir été lu.
+        """
+        entry = self.sources[path]
+        derived = entry.setdefault('derived', {})
+        if key not in derived:
+            derived[key] = func(entry['content'])
+            self.dirty = True
+        return derived[key]
+
+    def output_unchanged(self, output_path, digest):
+        """Vrai si `output_path` existe déjà avec exactement ce contenu"""
+        entry = self.outputs.get(os.path.relpath(output_path, self.build_dir))
+        if not entry or entry['sha256'] != digest:
+            return False
+        try:
+            return os.path.getsize(output_path) == entry['size']
+        except OSError:
+            return False
+
+    def output_built_from(self, output_path, source):
+        """
+        Vrai si `output_path` est encore la sortie enregistrée pour `source`
+        (version compressée d'un bundle...) : le fichier présent est rehaché
+        et comparé au hash mémorisé.
+        """
+        entry = self.outputs.get(os.path.relpath(output_path, self.build_dir))
+        if not entry or entry.get('source') != source:
+            return False
+        try:
+            if os.path.getsize(output_path) != entry['size']:
+                return False
+            with open(output_path, 'rb') as f:
+                return hash_bytes(f.read()) == entry['sha256']
+        except OSError:
+            return False
+
+    def record_output(self, output_path, digest, source=None):
+        """
+        Mémorise le hash d'une sortie qui vient d'être écrite et, pour une
+        sortie dérivée d'un autre fichier, ce dont elle est issue (`source`)
+        """
+        entry = {
+            'sha256': digest,
+            'size': os.path.getsize(output_path),
+        }
+        if source is not None:
+            entry['source'] = source
+        self.outputs[os.path.relpath(output_path, self.build_dir)] = entry
+        self.dirty = True
@@ -0,0 +1,144 @@
+"""
+Découpage du bundle JavaScript en chunks chargés à la demande.
+
+Un chunk (modules d'une vue lourde : arc board...) est écrit dans un bloc
+inerte <script type="text/plain"> que le navigateur ne compile pas. Le
+bundle principal contient à la place un petit chargeur et une fonction
+relais (« stub ») pour chaque fonction du chunk appelée depuis l'extérieur
+(autre module, attribut on*= du HTML, HTML généré dans une chaîne). Le
+premier appel d'un stub évalue le chunk dans la portée globale, puis
+transmet l'appel à la vraie fonction, qui a remplacé le stub.
+
+Un chunk n'est différé que si c'est sans risque :
+- aucun module extérieur ne l'utilise au chargement ;
+- ses classes, constantes et variables ne sont utilisées à l'extérieur que
+  derrière un test `typeof NOM` (jamais depuis le HTML ni une chaîne) ;
+- aucun de ses symboles n'est aussi déclaré hors du chunk ;
+- il ne réaffecte pas au chargement une globale du bundle (`switchView =
+  function...`) : le comportement changerait selon qu'il est chargé ou non.
+Sinon il reste dans le bundle principal et le rapport en donne la raison.
+
+Les écouteurs DOMContentLoaded/load enregistrés par un chunk évalué après
+ces événements sont appelés immédiatement.
+"""
+
+from collections import namedtuple
+
+CHUNK_ID_PREFIX = 'plume-chunk-'
+
+# Chunk prévu : modules, fonctions à relayer, raisons de le garder inline
+Chunk = namedtuple('Chunk', ['name', 'paths', 'stubs', 'blockers'])
+
+# Le chargeur n'a aucun code exécuté au chargement (état conservé sur la
+# fonction elle-même) : un stub peut être appelé avant la fin du bundle
+LOADER_SOURCE = '''function plumeLoadChunk(name) {
+    var loaded = plumeLoadChunk.loaded || (plumeLoadChunk.loaded = {});
+    var block = document.getElementById('%(prefix)s' + name);
+    if (loaded[name] || !block) return;
+    loaded[name] = true;
+    block.parentNode.removeChild(block);
+    var queued = [];
+    var targets = [document, window];
+    var originals = targets.map(function (target) { return target.addEventListener; });
+    targets.forEach(function (target, i) {
+        target.addEventListener = function (type, listener, options) {
+            var fired = type === 'load' ? document.readyState === 'complete' : document.readyState !== 'loading';
+            if ((type === 'DOMContentLoaded' || type === 'load') && fired) {
+                queued.push([target, listener]);
+                return;
+            }
+            return originals[i].call(this, type, listener, options);
+        };
+    });
+    try {
+        var script = document.createElement('script');
+        script.textContent = block.textContent;
+        document.head.appendChild(script);
+    } finally {
+        targets.forEach(function (target, i) { target.addEventListener = originals[i]; });
+    }
+    queued.forEach(function (entry) {
+        var listener = entry[1];
+        if (typeof listener === 'function') listener.call(entry[0], new Event('DOMContentLoaded'));
+        else if (listener && listener.handleEvent) listener.handleEvent(new Event('DOMContentLoaded'));
+    });
+}
+
+function plumeCallChunk(name, fn, self, args) {
+    if (!(plumeLoadChunk.loaded && plumeLoadChunk.loaded[name])) {
+        var stub = window[fn];
+        plumeLoadChunk(name);
+        if (window[fn] === stub) throw new Error('Chunk ' + name + ': ' + fn + ' introuvable');
+    }
+    return window[fn].apply(self, args);
+}'''
+
+STUB_SOURCE = "function %(fn)s() { return plumeCallChunk('%(chunk)s', '%(fn)s', this, arguments); }"
+
+
+def plan_chunks(chunk_paths, scans, words, handlers, sources):
+    """
+    Analyse les chunks demandés et retourne une liste de Chunk.
+    `chunk_paths` : {nom: [chemins]} ; `scans` : {chemin: ModuleScan} de
+    tous les modules du bundle ; `words(chemin)` : mots des chaînes du
+    module ; `handlers` : identifiants des attributs on*= du HTML ;
+    `sources` : {chemin: source}.
+    """
+    declared_by = {}
+    for path, result in scans.items():
+        for name in dict.fromkeys(result.declares):
+            declared_by.setdefault(name, []).append(path)
+
+    plans = []
+    for name, paths in chunk_paths.items():
+        inside = set(paths)
+        blockers = []
+        functions = set()
+        others = set()
+        for path in paths:
+            functions |= scans[path].hoisted
+            others |= set(scans[path].declares) - scans[path].hoisted
+        declared = functions | others
+
+        for symbol in sorted(declared):
+            outside = [path for path in declared_by[symbol] if path not in inside]
+            if outside:
+                blockers.append(f"{symbol} aussi declare par {outside[0]}")
+        for path in paths:
+            for symbol in sorted(scans[path].assigns - declared):
+                if symbol in declared_by:
+                    blockers.append(f"{symbol} reaffecte au chargement par {path}")
+
+        stubs = set(functions & handlers)
+        for symbol in sorted(others & handlers):
+            blockers.append(f"{symbol} utilise par un attribut on*= du HTML")
+        for path, result in scans.items():
+            if path in inside:
+                continue
+            for symbol in sorted(result.eager & declared):
+                blockers.append(f"{symbol} utilise au chargement par {path}")
+            stubs |= result.lazy & functions
+            for symbol in sorted(result.lazy & others):
+                if f'typeof {symbol}' not in sources[path]:
+                    blockers.append(f"{symbol} utilise sans test typeof par {path}")
+            found = words(path) & declared
+            stubs |= found & functions
+            for symbol in sorted(found & others):
+                blockers.append(f"{symbol} cite dans une chaine de {path}")
+        plans.append(Chunk(name, list(paths), sorted(stubs), blockers))
+    return plans
+
+
+def loader_source():
+    """Source du chargeur de chunks, ajouté au bundle principal"""
+    return LOADER_SOURCE % {'prefix': CHUNK_ID_PREFIX}
+
+
+def stub_source(chunk):
+    """Source des fonctions relais d'un chunk différé"""
+    return '\n'.join(STUB_SOURCE % {'fn': fn, 'chunk': chunk.name} for fn in chunk.stubs)
+
+
+def escape_script(content):
+    """Empêche une séquence </script de fermer le bloc qui contient le chunk"""
+    return content.replace('</script', '<\\/script').replace('</SCRIPT', '<\\/SCRIPT')
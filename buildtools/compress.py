@@ -0,0 +1,116 @@
+"""
+Versions précompressées (.gz, .xz) des fichiers HTML générés.
+
+L'hébergeur statique sert directement index.html.gz lorsque le navigateur
+l'accepte : un bundle de plusieurs Mo passe à quelques centaines de Ko.
+Chaque codec est traité dans son propre thread (zlib et lzma relâchent le
+GIL pendant la compression). Le cache de build mémorise pour chaque version
+compressée son propre hash et, à part, le hash du fichier source, le codec et
+le niveau utilisés : un bundle inchangé n'est pas recompressé tant que la
+version compressée présente sur le disque est bien celle qui a été écrite.
+
+Utilisable seul :  python3 -m buildtools.compress live/index.html
+"""
+
+import argparse
+import gzip
+import lzma
+import os
+import sys
+import time
+
+from buildtools.cache import BuildCache, hash_bytes
+from buildtools.parallel import ordered_map
+from buildtools.report import percent
+
+# Codec -> (extension, fonction de compression)
+CODECS = {
+    # mtime=0 : sortie reproductible, indépendante de l'heure du build
+    'gzip': ('.gz', lambda data, level: gzip.compress(data, compresslevel=level, mtime=0)),
+    'xz': ('.xz', lambda data, level: lzma.compress(data, preset=level)),
+}
+
+DEFAULT_LEVELS = {'gzip': 9, 'xz': 6}
+
+
+def write_bytes(path, data):
+    """Écrit `data` dans `path` via un fichier temporaire remplacé atomiquement"""
+    tmp_path = path + '.tmp'
+    try:
+        with open(tmp_path, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def precompress(path, levels=None, jobs=None, cache=None, digest=None):
+    """
+    Écrit les versions compressées de `path` à côté du fichier.
+    `levels` associe chaque codec à son niveau ; `digest` est le hash du
+    fichier s'il est déjà connu. Retourne la liste
+    [(codec, chemin, taille, secondes, ignoré)] dans l'ordre des codecs.
+    """
+    levels = levels or DEFAULT_LEVELS
+    with open(path, 'rb') as f:
+        data = f.read()
+    if cache and digest is None:
+        digest = hash_bytes(data)
+
+    def run(codec):
+        extension, compress = CODECS[codec]
+        level = levels[codec]
+        target = path + extension
+        source = {'sha256': digest, 'codec': codec, 'level': level}
+        if cache and cache.output_built_from(target, source):
+            return (codec, target, os.path.getsize(target), 0.0, True)
+        start = time.perf_counter()
+        compressed = compress(data, level)
+        elapsed = time.perf_counter() - start
+        write_bytes(target, compressed)
+        if cache:
+            cache.record_output(target, hash_bytes(compressed), source)
+        return (codec, target, len(compressed), elapsed, False)
+
+    return ordered_map(run, [codec for codec in CODECS if codec in levels], jobs)
+
+
+def log_compression_report(original_size, results, log):
+    """Affiche taille, gain et durée de chaque version compressée"""
+    log(f"   {'Codec':<6} {'Taille':>11} {'Gain':>7} {'Temps':>9}")
+    for codec, _, size, seconds, skipped in results:
+        timing = 'inchange' if skipped else f'{seconds * 1000:.0f} ms'
+        log(f"   {codec:<6} {size:>11,} {percent(original_size, size):>6.1f}% {timing:>9}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Genere les versions .gz/.xz de fichiers HTML")
+    parser.add_argument('files', nargs='+', help="fichiers a compresser (ex: live/index.html)")
+    parser.add_argument('--gzip-level', type=int, default=DEFAULT_LEVELS['gzip'],
+                        help="niveau gzip (1-9)")
+    parser.add_argument('--xz-level', type=int, default=DEFAULT_LEVELS['xz'],
+                        help="niveau xz (0-9)")
+    parser.add_argument('--no-cache', action='store_true',
+                        help="recompresse meme si le fichier n'a pas change")
+    args = parser.parse_args(argv)
+
+    build_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    cache = None if args.no_cache else BuildCache(build_dir).load()
+    levels = {'gzip': args.gzip_level, 'xz': args.xz_level}
+
+    for path in args.files:
+        if not os.path.exists(path):
+            print(f"[ERREUR] Fichier introuvable: {path}")
+            return 1
+        print(f"[OK] Compression de {path}")
+        results = precompress(os.path.abspath(path), levels, cache=cache)
+        log_compression_report(os.path.getsize(path), results, print)
+    if cache:
+        cache.save()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,274 @@
+"""
+Optimisation CSS sans dépendance (étape --optimize-css du build light).
+
+1. Analyse : la feuille est découpée en règles, blocs @media/@supports et
+   déclarations (les chaînes, commentaires et url(...) sont respectés).
+2. Purge : un sélecteur est retiré si l'une de ses classes ou l'un de ses ids
+   n'apparaît nulle part dans le HTML ni dans les chaînes du JavaScript
+   bundlé. Une règle dont tous les sélecteurs sont morts disparaît. Les mots
+   terminés par '-' ou '_' dans le JS ('status-' + x, `prio-${p}`) sont
+   traités comme des préfixes de classes dynamiques ; les autres cas se
+   déclarent dans une liste d'exceptions (expressions régulières).
+3. Minification : commentaires (sauf /*! */) et espaces superflus supprimés.
+
+Les @keyframes, @font-face et règles imbriquées ne sont jamais purgés.
+"""
+
+import re
+
+from buildtools.jstokens import tokenize, STRING, TEMPLATE
+
+# Incrémenté à chaque changement de sortie (invalide les caches dérivés)
+CSSMIN_VERSION = 1
+
+# Blocs dont le contenu est une liste de règles purgeables
+GROUPING_AT_RULES = ('@media', '@supports', '@layer', '@container', '@document')
+
+TOKEN_RE = re.compile(
+    r'/\*.*?(?:\*/|$)'
+    r'|"(?:[^"\\]|\\.)*"?'
+    r"|'(?:[^'\\]|\\.)*'?"
+    r'|url\(\s*[^)"\'\s]*\s*\)'
+    r'|[{};]'
+    r'|[^{};"\'/u]+'
+    r'|.',
+    re.S | re.I,
+)
+WORD_RE = re.compile(r'[A-Za-z_\u00a0-\uffff][\w\-\u00a0-\uffff]*')
+SELECTOR_NAME_RE = re.compile(r'([.#])(-?[A-Za-z_\u00a0-\uffff][\w\-\u00a0-\uffff]*)')
+SPACES_RE = re.compile(r'\s+')
+COMBINATOR_SPACES_RE = re.compile(r'\s*([,>+~])\s*')
+VALUE_SPACES_RE = re.compile(r'\s*([,])\s*|\(\s+|\s+\)|\s+(!important)')
+
+
+# ---------------------------------------------------------------------------
+# Analyse
+# ---------------------------------------------------------------------------
+
+def parse(css):
+    """
+    Retourne la liste des nœuds de la feuille :
+    ('comment', texte), ('decl', texte), ('rule', prélude, enfants),
+    ('at', prélude, enfants ou None).
+    """
+    tokens = [m.group(0) for m in TOKEN_RE.finditer(css)]
+    nodes, _ = _parse_items(tokens, 0)
+    return nodes
+
+
+def _parse_items(tokens, pos):
+    """Analyse jusqu'à l'accolade fermante (ou la fin), retourne (nœuds, position)"""
+    nodes = []
+    buffer = []
+    while pos < len(tokens):
+        token = tokens[pos]
+        pos += 1
+        if token.startswith('/*'):
+            if token.startswith('/*!'):
+                nodes.append(('comment', token))
+            continue
+        if token == '{':
+            prelude = ''.join(buffer).strip()
+            buffer = []
+            children, pos = _parse_items(tokens, pos)
+            if prelude.startswith('@'):
+                nodes.append(('at', prelude, children))
+            else:
+                nodes.append(('rule', prelude, children))
+        elif token == ';':
+            _flush(buffer, nodes)
+            buffer = []
+        elif token == '}':
+            _flush(buffer, nodes)
+            return nodes, pos
+        else:
+            buffer.append(token)
+    _flush(buffer, nodes)
+    return nodes, pos
+
+
+def _flush(buffer, nodes):
+    """Transforme le texte accumulé en déclaration (ou @règle sans bloc)"""
+    text = ''.join(buffer).strip()
+    if not text:
+        return
+    if text.startswith('@'):
+        nodes.append(('at', text, None))
+    else:
+        nodes.append(('decl', text))
+
+
+# ---------------------------------------------------------------------------
+# Purge des sélecteurs morts
+# ---------------------------------------------------------------------------
+
+def split_top_level(text, separator=','):
+    """Découpe `text` sur `separator` hors parenthèses, crochets et chaînes"""
+    parts = []
+    depth = 0
+    quote = None
+    start = 0
+    for i, char in enumerate(text):
+        if quote:
+            if char == quote and text[i - 1] != '\\':
+                quote = None
+        elif char in '"\'':
+            quote = char
+        elif char in '([':
+            depth += 1
+        elif char in ')]':
+            depth -= 1
+        elif char == separator and depth == 0:
+            parts.append(text[start:i])
+            start = i + 1
+    parts.append(text[start:])
+    return parts
+
+
+def strip_nested(selector):
+    """Retire le contenu des parenthèses et crochets (:not(.x), [href$=".a"]...)"""
+    out = []
+    depth = 0
+    for char in selector:
+        if char in '([':
+            depth += 1
+        elif char in ')]':
+            depth -= 1
+        elif depth == 0:
+            out.append(char)
+    return ''.join(out)
+
+
+class UsageIndex:
+    """Mots présents dans le HTML et dans les chaînes du JavaScript"""
+
+    def __init__(self, keep_patterns=()):
+        self.words = set()
+        self.prefixes = set()
+        self.keep = [re.compile(pattern) for pattern in keep_patterns]
+
+    def add_words(self, words):
+        for word in words:
+            self.words.add(word)
+            if word.endswith(('-', '_')):
+                self.prefixes.add(word)
+
+    def is_used(self, name):
+        if name in self.words:
+            return True
+        if any(name.startswith(prefix) for prefix in self.prefixes):
+            return True
+        return any(pattern.search(name) for pattern in self.keep)
+
+    def selector_alive(self, selector):
+        """Vrai si toutes les classes et ids du sélecteur existent quelque part"""
+        for _kind, name in SELECTOR_NAME_RE.findall(strip_nested(selector)):
+            if not self.is_used(name):
+                return False
+        return True
+
+
+def html_words(html):
+    """Mots d'un document HTML (classes, ids, attributs, texte)"""
+    return set(WORD_RE.findall(html))
+
+
+def js_words(src):
+    """Mots contenus dans les chaînes et templates d'un source JavaScript"""
+    words = set()
+    for kind, text, _pos in tokenize(src):
+        if kind == STRING or kind == TEMPLATE:
+            words.update(WORD_RE.findall(text))
+    return words
+
+
+def purge(nodes, usage, removed):
+    """Retire les sélecteurs morts de `nodes` ; ajoute les sélecteurs retirés à `removed`"""
+    result = []
+    for node in nodes:
+        if node[0] == 'rule':
+            selectors = split_top_level(node[1])
+            alive = [s for s in selectors if usage.selector_alive(s)]
+            removed.extend(s.strip() for s in selectors if s not in alive)
+            if alive:
+                result.append(('rule', ','.join(alive), node[2]))
+        elif node[0] == 'at' and node[2] is not None and node[1].lower().startswith(GROUPING_AT_RULES):
+            children = purge(node[2], usage, removed)
+            if children:
+                result.append(('at', node[1], children))
+        else:
+            result.append(node)
+    return result
+
+
+# ---------------------------------------------------------------------------
+# Minification
+# ---------------------------------------------------------------------------
+
+def _outside_strings(text, func):
+    """Applique `func` aux portions de `text` situées hors des chaînes"""
+    parts = re.split(r'("(?:[^"\\]|\\.)*"|\'(?:[^\'\\]|\\.)*\')', text)
+    return ''.join(part if i % 2 else func(part) for i, part in enumerate(parts))
+
+
+def minify_selector(selector):
+    def compact(part):
+        part = SPACES_RE.sub(' ', part)
+        return COMBINATOR_SPACES_RE.sub(r'\1', part)
+    return _outside_strings(selector.strip(), compact)
+
+
+def minify_value(value):
+    def compact(part):
+        part = SPACES_RE.sub(' ', part)
+        return VALUE_SPACES_RE.sub(lambda m: m.group(1) or m.group(2) or m.group(0).strip(), part)
+    return _outside_strings(value.strip(), compact)
+
+
+def minify_prelude(prelude):
+    return _outside_strings(prelude.strip(), lambda part: SPACES_RE.sub(' ', part))
+
+
+def serialize(nodes):
+    """Écrit les nœuds sous forme minifiée"""
+    out = []
+    declarations = []
+
+    def flush_declarations():
+        if declarations:
+            out.append(';'.join(declarations))
+            declarations.clear()
+
+    for node in nodes:
+        kind = node[0]
+        if kind == 'decl':
+            name, sep, value = node[1].partition(':')
+            declarations.append(name.strip() + sep + minify_value(value) if sep else minify_value(name))
+            continue
+        if declarations:
+            flush_declarations()
+            out.append(';')
+        if kind == 'comment':
+            out.append(node[1])
+        elif kind == 'rule':
+            body = serialize(node[2])
+            if body:
+                out.append(minify_selector(node[1]) + '{' + body + '}')
+        elif node[2] is None:
+            out.append(minify_prelude(node[1]) + ';')
+        else:
+            body = serialize(node[2])
+            if body or not node[1].lower().startswith(GROUPING_AT_RULES):
+                out.append(minify_prelude(node[1]) + '{' + body + '}')
+    flush_declarations()
+    return ''.join(out)
+
+
+def minify(css):
+    """Minifie une feuille de style sans purge"""
+    return serialize(parse(css))
+
+
+def optimize(css, usage, removed):
+    """Purge les sélecteurs morts puis minifie"""
+    return serialize(purge(parse(css), usage, removed))
@@ -0,0 +1,411 @@
+"""
+Graphe de dépendances entre modules JavaScript.
+
+Les modules ne sont pas des modules ES : ils partagent la portée globale du
+bundle. L'ordre de concaténation n'importe que pour le code exécuté au
+chargement (premier niveau, IIFE, `class A extends B`, `const X = new Y()`).
+Les références situées dans le corps d'une fonction ou d'une méthode ne
+sont résolues qu'à l'appel : elles ne contraignent pas l'ordre. Tout le
+bundle étant un seul <script>, les déclarations `function` sont hissées
+(hoisting) et utilisables depuis n'importe quel module : seules les
+déclarations const/let/class/var et `window.NOM = ...` imposent un ordre.
+
+Le scanner (sur les tokens de jstokens, sans arbre syntaxique) relève pour
+chaque module :
+- les déclarations de premier niveau : function, class, const/let/var et
+  les affectations `window.NOM = ...` ;
+- les références évaluées au chargement (« eager ») ;
+- les références différées (corps de fonctions), utiles pour savoir quels
+  symboles sont réellement utilisés.
+
+Le graphe en déduit un ordre topologique stable (l'ordre d'origine est
+conservé tant qu'aucune contrainte ne l'interdit) et signale les
+références non résolues, les déclarations en double et les cycles.
+
+Utilisable seul :  python3 -m buildtools.depgraph light
+"""
+
+import argparse
+import os
+import sys
+from collections import namedtuple
+
+from buildtools.jstokens import tokenize, significant, NAME, PUNCT
+
+# Incrémenté à chaque changement du résultat de scan (invalide le cache)
+DEPSCAN_VERSION = 2
+
+RESERVED = frozenset('''
+    break case catch class const continue debugger default delete do else export extends
+    finally for function if import in instanceof new return super switch this throw try
+    typeof var void while with yield let static async await of get set null true false
+    undefined NaN Infinity arguments
+'''.split())
+
+CONTROL_KEYWORDS = frozenset(['if', 'for', 'while', 'switch', 'catch', 'with'])
+
+# Globales du navigateur et du langage : jamais signalées comme non résolues
+KNOWN_GLOBALS = frozenset('''
+    window document console navigator location history localStorage sessionStorage
+    indexedDB IDBKeyRange fetch setTimeout clearTimeout setInterval clearInterval
+    requestAnimationFrame cancelAnimationFrame requestIdleCallback queueMicrotask
+    alert confirm prompt performance screen getComputedStyle matchMedia crypto
+    Object Array String Number Boolean Symbol Date Math JSON RegExp Error TypeError
+    RangeError SyntaxError Promise Map Set WeakMap WeakSet Proxy Reflect Intl BigInt
+    parseInt parseFloat isNaN isFinite encodeURIComponent decodeURIComponent
+    encodeURI decodeURI escape unescape btoa atob structuredClone globalThis self
+    Blob File FileReader FormData URL URLSearchParams TextEncoder TextDecoder
+    ArrayBuffer Uint8Array Uint16Array Uint32Array Int8Array Int16Array Int32Array
+    Float32Array Float64Array DataView Image Audio Event CustomEvent KeyboardEvent
+    MouseEvent DOMParser XMLSerializer MutationObserver ResizeObserver
+    IntersectionObserver Node NodeFilter Element HTMLElement Range Selection
+    AbortController Worker WebSocket XMLHttpRequest Notification caches
+    CSS getSelection print open close scrollTo scrollBy innerWidth innerHeight
+    devicePixelRatio gapi google module exports require
+'''.split())
+
+# Résultat du scan d'un module (`assigns` : globales réaffectées au chargement)
+ModuleScan = namedtuple('ModuleScan', ['declares', 'hoisted', 'eager', 'lazy', 'locals', 'assigns'])
+
+
+def _binding_positions(tokens):
+    """
+    Repère les noms qui déclarent au lieu de référencer : paramètres de
+    fonctions et de méthodes, noms de méthodes, motifs de déstructuration
+    (`const { a, b } = ...`). Retourne (positions des paramètres, positions
+    des noms de méthodes, positions des motifs de déclaration).
+    """
+    count = len(tokens)
+    match = {}
+    stack = []
+    for i, (kind, text, _pos) in enumerate(tokens):
+        if kind != PUNCT:
+            continue
+        if text in ('(', '[', '{'):
+            stack.append(i)
+        elif text in (')', ']', '}') and stack:
+            match[stack.pop()] = i
+
+    params = set()
+    methods = set()
+    patterns = set()
+    for start, end in match.items():
+        text = tokens[start][1]
+        after = tokens[end + 1][1] if end + 1 < count else None
+        before = tokens[start - 1] if start else None
+        if text == '(':
+            control = before is not None and before[1] in CONTROL_KEYWORDS and before[1] != 'catch'
+            if after in ('{', '=>') and not control or (before is not None and before[1] == 'catch'):
+                params.update(range(start + 1, end))
+                if after == '{' and before is not None and before[0] == NAME \
+                        and start >= 2 and tokens[start - 2][1] not in ('function', '.', '?.'):
+                    methods.add(start - 1)
+        elif before is not None and before[1] in ('const', 'let', 'var'):
+            patterns.update(range(start + 1, end))
+    for i in range(count - 1):
+        if tokens[i][0] == NAME and tokens[i + 1][1] == '=>':
+            params.add(i)
+    return params, methods, patterns
+
+
+def scan(src):
+    """Relève déclarations et références d'un source JavaScript (voir ModuleScan)"""
+    tokens = significant(tokenize(src))
+    params, methods, patterns = _binding_positions(tokens)
+    declares = []
+    hoisted = set()
+    eager = set()
+    lazy = set()
+    local_names = set()
+    assigns = set()
+
+    # Pile des ouvrants : (caractère, différé ?, type de parenthèse)
+    stack = []
+    lazy_depth = 0
+    last_paren_kind = None
+    class_pending = False
+    iife_pending = False
+    # Profondeurs de pile où une fonction fléchée sans accolades est ouverte
+    arrow_bodies = []
+
+    count = len(tokens)
+    for i, (kind, text, _pos) in enumerate(tokens):
+        prev = tokens[i - 1] if i else None
+        prev_text = prev[1] if prev else None
+        next_text = tokens[i + 1][1] if i + 1 < count else None
+        in_lazy = lazy_depth > 0 or bool(arrow_bodies)
+
+        if kind == PUNCT:
+            if text in ('(', '[', '{'):
+                deferred = False
+                paren_kind = None
+                if text == '(':
+                    if prev_text in CONTROL_KEYWORDS:
+                        paren_kind = 'control'
+                    elif not stack and prev_text in (None, ';', '}'):
+                        # Expression en début d'instruction : (function () {...})()
+                        iife_pending = True
+                elif text == '{':
+                    if class_pending:
+                        # Corps de classe : méthodes et champs évalués plus tard
+                        deferred = True
+                        class_pending = False
+                    elif prev_text == '=>' or (prev_text == ')' and last_paren_kind != 'control'):
+                        # Corps de fonction, sauf celui d'une IIFE de premier niveau
+                        deferred = not (iife_pending and len(stack) == 1)
+                stack.append((text, deferred, paren_kind))
+                if deferred:
+                    lazy_depth += 1
+                continue
+            if text in (')', ']', '}'):
+                while arrow_bodies and arrow_bodies[-1] >= len(stack):
+                    arrow_bodies.pop()
+                if stack:
+                    opener, deferred, paren_kind = stack.pop()
+                    if deferred:
+                        lazy_depth -= 1
+                    if opener == '(':
+                        last_paren_kind = paren_kind
+                if not stack:
+                    iife_pending = False
+                continue
+            if text in (';', ','):
+                while arrow_bodies and arrow_bodies[-1] >= len(stack):
+                    arrow_bodies.pop()
+                if text == ';' and not stack:
+                    iife_pending = False
+                continue
+            if text == '=>' and next_text != '{':
+                arrow_bodies.append(len(stack))
+            continue
+
+        if kind != NAME:
+            continue
+
+        if text in ('const', 'let', 'var', 'function', 'class'):
+            # Nouvelle instruction : fin d'une fonction fléchée sans accolades
+            while arrow_bodies and arrow_bodies[-1] >= len(stack):
+                arrow_bodies.pop()
+            class_pending = class_pending or text == 'class'
+            continue
+        if prev_text in ('.', '?.'):
+            # Propriété ; `window.X = ...` déclare une globale
+            if (tokens[i - 2][1] == 'window' if i >= 2 else False) and next_text == '=':
+                declares.append(text)
+            continue
+        if text in RESERVED or text.startswith('#'):
+            continue
+        if next_text == ':' and prev_text in ('{', ','):
+            continue  # clé d'objet littéral
+        if i in params or i in methods:
+            local_names.add(text)
+            continue
+        if i in patterns:
+            if not stack[1:] and not in_lazy:
+                declares.append(text)
+            else:
+                local_names.add(text)
+            continue
+
+        if prev_text in ('function', 'class', 'const', 'let', 'var'):
+            if not stack and not in_lazy:
+                before = tokens[i - 2][1] if i >= 2 else None
+                if prev_text in ('const', 'let', 'var') or before in (None, ';', '}', 'async', 'export'):
+                    declares.append(text)
+                    if prev_text == 'function':
+                        hoisted.add(text)
+                    continue
+            local_names.add(text)
+            continue
+
+        if in_lazy:
+            lazy.add(text)
+        else:
+            eager.add(text)
+            if next_text == '=':
+                assigns.add(text)
+
+    return ModuleScan(declares, hoisted, eager, lazy, local_names, assigns)
+
+
+class DependencyGraph:
+    """Graphe des modules : qui déclare quoi, qui dépend de qui au chargement"""
+
+    def __init__(self, scans):
+        # scans : [(chemin, ModuleScan)] dans l'ordre actuel du bundle
+        self.modules = [path for path, _ in scans]
+        self.scans = dict(scans)
+        self.defined_by = {}
+        self.duplicates = {}
+        for path, result in scans:
+            for name in dict.fromkeys(result.declares):
+                owner = self.defined_by.setdefault(name, path)
+                if owner != path:
+                    self.duplicates.setdefault(name, [owner]).append(path)
+
+        self.requires = {path: set() for path in self.modules}
+        self.unresolved = {}
+        for path, result in scans:
+            own = set(result.declares)
+            for name in result.eager:
+                owner = self.defined_by.get(name)
+                if owner and owner != path:
+                    if name not in self.scans[owner].hoisted:
+                        self.requires[path].add(owner)
+                elif not owner and name not in own and name not in KNOWN_GLOBALS \
+                        and name not in result.locals:
+                    self.unresolved.setdefault(path, set()).add(name)
+
+    def violations(self, order=None):
+        """Dépendances placées après le module qui en a besoin : [(module, dépendance)]"""
+        position = {path: i for i, path in enumerate(order or self.modules)}
+        return [(path, dep) for path in (order or self.modules)
+                for dep in sorted(self.requires[path]) if position[dep] > position[path]]
+
+    def cycles(self):
+        """Composantes fortement connexes de plus d'un module (algorithme de Tarjan)"""
+        index = {}
+        low = {}
+        stack = []
+        on_stack = set()
+        result = []
+        counter = [0]
+
+        def visit(node):
+            # Parcours itératif : pas de limite de récursion
+            work = [(node, iter(sorted(self.requires[node])))]
+            index[node] = low[node] = counter[0]
+            counter[0] += 1
+            stack.append(node)
+            on_stack.add(node)
+            while work:
+                current, children = work[-1]
+                child = next(children, None)
+                if child is not None:
+                    if child not in index:
+                        index[child] = low[child] = counter[0]
+                        counter[0] += 1
+                        stack.append(child)
+                        on_stack.add(child)
+                        work.append((child, iter(sorted(self.requires[child]))))
+                    elif child in on_stack:
+                        low[current] = min(low[current], index[child])
+                    continue
+                work.pop()
+                if work:
+                    low[work[-1][0]] = min(low[work[-1][0]], low[current])
+                if low[current] == index[current]:
+                    component = []
+                    while True:
+                        member = stack.pop()
+                        on_stack.discard(member)
+                        component.append(member)
+                        if member == current:
+                            break
+                    if len(component) > 1:
+                        result.append(sorted(component, key=self.modules.index))
+
+        for path in self.modules:
+            if path not in index:
+                visit(path)
+        return result
+
+    def topological_order(self):
+        """
+        Ordre compatible avec toutes les dépendances, le plus proche possible
+        de l'ordre actuel. Les modules d'un cycle gardent leur ordre relatif.
+        """
+        position = {path: i for i, path in enumerate(self.modules)}
+        # Un cycle est traité comme un seul nœud
+        group_of = {path: (path,) for path in self.modules}
+        for component in self.cycles():
+            members = tuple(component)
+            for path in members:
+                group_of[path] = members
+        groups = sorted(set(group_of.values()), key=lambda g: position[g[0]])
+        needs = {g: {group_of[dep] for path in g for dep in self.requires[path]} - {g} for g in groups}
+
+        order = []
+        placed = set()
+        remaining = list(groups)
+        while remaining:
+            for group in remaining:
+                if needs[group] <= placed:
+                    break
+            else:
+                group = remaining[0]  # Inatteignable sans cycle ; par sécurité
+            remaining.remove(group)
+            placed.add(group)
+            order.extend(group)
+        return order
+
+
+def build_graph(entries, read, scanner=scan):
+    """Construit le graphe de [(chemin, libellé)] ; `read(chemin)` retourne le source"""
+    return DependencyGraph([(path, scanner(read(path))) for path, _ in entries])
+
+
+def log_graph_report(graph, log, limit=20):
+    """Affiche violations d'ordre, cycles, doublons et références non résolues"""
+    violations = graph.violations()
+    if violations:
+        log(f"   [!] {len(violations)} dependances chargees trop tard:")
+        for path, dep in violations[:limit]:
+            log(f"      - {path} utilise {dep} (charge apres)")
+    else:
+        log(f"   [OK] Ordre actuel compatible avec les dependances")
+    for component in graph.cycles():
+        log(f"   [!] Cycle: {' -> '.join(component)}")
+    if graph.duplicates:
+        log(f"   [!] {len(graph.duplicates)} symboles declares plusieurs fois:")
+        for name, paths in sorted(graph.duplicates.items())[:limit]:
+            log(f"      - {name}: {', '.join(paths)}")
+    unresolved = sorted((path, sorted(names)) for path, names in graph.unresolved.items())
+    if unresolved:
+        log(f"   [i] References non resolues au chargement ({len(unresolved)} modules):")
+        for path, names in unresolved[:limit]:
+            log(f"      - {path}: {', '.join(names)}")
+
+
+def main(argv=None):
+    from buildtools.cache import BuildCache
+    from buildtools.encoding import EncodingCache
+    from buildtools.manifest import load as load_manifest
+
+    parser = argparse.ArgumentParser(description="Analyse les dependances entre modules JS d'une variante")
+    parser.add_argument('variant', nargs='?', default='light')
+    parser.add_argument('--order', action='store_true',
+                        help="affiche l'ordre topologique calcule")
+    args = parser.parse_args(argv)
+
+    build_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    cache = BuildCache(build_dir).load()
+    encodings = EncodingCache(build_dir).load()
+    entries = load_manifest(build_dir).resolve(args.variant, 'js').entries
+
+    def decode(data, path):
+        # Même décodage que les scripts de build : le contenu mis en cache
+        # est partagé avec eux
+        content, _encoding = encodings.decode(data, path)
+        return content.replace('\r\n', '\n').replace('\r', '\n')
+
+    def read(path):
+        cache.read(path, decode)
+        return cache.derive(path, f'depscan-{DEPSCAN_VERSION}', scan)
+
+    graph = build_graph(entries, lambda path: path, scanner=read)
+    cache.save()
+    encodings.save()
+    print(f"[OK] {len(graph.modules)} modules, {len(graph.defined_by)} symboles declares")
+    log_graph_report(graph, print)
+    if args.order:
+        for path in graph.topological_order():
+            print(path)
+    return 0
+
+
+if __name__ == '__main__':
+    # Import explicite : les résultats mis en cache doivent référencer
+    # buildtools.depgraph.ModuleScan et non __main__.ModuleScan
+    from buildtools.depgraph import main as package_main
+    sys.exit(package_main())
@@ -0,0 +1,124 @@
+"""
+Détection d'encodage des fichiers sources en une seule lecture.
+
+Le fichier est lu une fois en binaire puis décodé directement dans le bon
+encodage : BOM, puis UTF-8 (cas normal), puis cp1252 ou latin-1 selon les
+octets présents. Le résultat est identique à l'ancienne boucle
+utf-8 -> cp1252 -> latin-1 qui rouvrait le fichier à chaque échec.
+
+L'encodage détecté est mémorisé par chemin + date de modification dans
+build/.encodings.json : un fichier non UTF-8 est ensuite décodé du premier
+coup, sans tentative UTF-8 ratée.
+"""
+
+import codecs
+import json
+import os
+import threading
+
+ENCODINGS_FILENAME = '.encodings.json'
+
+# Les BOM UTF-32 doivent être testés avant UTF-16 (même préfixe en LE)
+BOMS = [
+    (codecs.BOM_UTF32_LE, 'utf-32'),
+    (codecs.BOM_UTF32_BE, 'utf-32'),
+    (codecs.BOM_UTF16_LE, 'utf-16'),
+    (codecs.BOM_UTF16_BE, 'utf-16'),
+    # UTF-8 avec BOM : le BOM est conservé comme avant (décodage 'utf-8')
+    (codecs.BOM_UTF8, 'utf-8'),
+]
+
+# Octets non définis en cp1252 : leur présence impose latin-1
+CP1252_UNDEFINED = (b'\x81', b'\x8d', b'\x8f', b'\x90', b'\x9d')
+
+
+def detect_encoding(data):
+    """Devine l'encodage d'un contenu qui n'a pas de BOM et n'est pas UTF-8"""
+    if any(byte in data for byte in CP1252_UNDEFINED):
+        return 'latin-1'
+    return 'cp1252'
+
+
+def decode_bytes(data, hint=None):
+    """
+    Décode un contenu brut, retourne (texte, encodage).
+    `hint` est l'encodage détecté lors d'un build précédent.
+    """
+    if hint:
+        try:
+            return data.decode(hint), hint
+        except (UnicodeDecodeError, LookupError):
+            pass
+
+    for bom, encoding in BOMS:
+        if data.startswith(bom):
+            return data.decode(encoding, errors='replace'), encoding
+
+    try:
+        return data.decode('utf-8'), 'utf-8'
+    except UnicodeDecodeError:
+        encoding = detect_encoding(data)
+        return data.decode(encoding), encoding
+
+
+class EncodingCache:
+    """Encodage détecté de chaque source, indexé par chemin et date de modification"""
+
+    def __init__(self, build_dir):
+        self.build_dir = build_dir
+        self.path = os.path.join(build_dir, 'build', ENCODINGS_FILENAME)
+        self.entries = {}
+        self.dirty = False
+        self._lock = threading.Lock()
+
+    def load(self):
+        """Charge le fichier d'encodages (ignoré s'il est absent ou invalide)"""
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                self.entries = json.load(f)
+        except (OSError, ValueError):
+            self.entries = {}
+        return self
+
+    def save(self):
+        """Écrit le fichier d'encodages s'il a changé"""
+        if not self.dirty:
+            return
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        tmp_path = self.path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.entries, f, indent=1, sort_keys=True)
+        os.replace(tmp_path, self.path)
+        self.dirty = False
+
+    def decode(self, data, path):
+        """Décode le contenu de `path` (relatif à build_dir) et mémorise l'encodage"""
+        mtime_ns = os.stat(os.path.join(self.build_dir, path)).st_mtime_ns
+        entry = self.entries.get(path)
+        hint = entry['encoding'] if entry and entry['mtime_ns'] == mtime_ns else None
+        text, encoding = decode_bytes(data, hint)
+        if encoding != hint:
+            with self._lock:
+                self.entries[path] = {'mtime_ns': mtime_ns, 'encoding': encoding}
+                self.dirty = True
+        return text, encoding
+
+    def encoding_of(self, path):
+        """Encodage de `path`, détecté à nouveau si l'entrée est absente ou périmée"""
+        full_path = os.path.join(self.build_dir, path)
+        entry = self.entries.get(path)
+        if entry and entry['mtime_ns'] == os.stat(full_path).st_mtime_ns:
+            return entry['encoding']
+        with open(full_path, 'rb') as f:
+            return self.decode(f.read(), path)[1]
+
+    def non_utf8(self, paths):
+        """Retourne [(chemin, encodage)] des fichiers de `paths` qui ne sont pas en UTF-8"""
+        result = []
+        for path in paths:
+            if not os.path.exists(os.path.join(self.build_dir, path)):
+                continue
+            encoding = self.encoding_of(path)
+            if encoding != 'utf-8':
+                result.append((path, encoding))
+        return result
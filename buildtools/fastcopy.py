@@ -0,0 +1,97 @@
+"""
+Copie de fichiers sans passer par l'espace utilisateur.
+
+Par ordre de préférence :
+- lien physique (mode --link) : aucune donnée copiée, la destination partage
+  le contenu du source (même système de fichiers uniquement) ;
+- os.copy_file_range : copie dans le noyau, voire clonage instantané sur
+  les systèmes de fichiers qui le permettent (btrfs, XFS...) ;
+- os.sendfile : copie dans le noyau ;
+- shutil.copyfile : copie classique.
+Chaque méthode non disponible (plateforme, système de fichiers, volumes
+différents) passe à la suivante. Les dates sont conservées comme copy2.
+"""
+
+import errno
+import os
+import shutil
+
+# Erreurs signifiant « méthode non supportée ici », pas un vrai échec
+# (ENOTSOCK : sendfile de macOS/BSD n'écrit que vers une socket)
+UNSUPPORTED_ERRORS = (errno.EXDEV, errno.ENOSYS, errno.EINVAL, errno.ENOTSUP,
+                      errno.EOPNOTSUPP, errno.EPERM, errno.EBADF, errno.ENOTSOCK)
+
+BLOCK_SIZE = 8 * 1024 * 1024
+
+
+def _kernel_copy(src_path, dest_path, syscall):
+    """Copie via copy_file_range ou sendfile, retourne False si non supporté"""
+    with open(src_path, 'rb') as src, open(dest_path, 'wb') as dest:
+        size = os.fstat(src.fileno()).st_size
+        offset = 0
+        try:
+            while offset < size:
+                if syscall == 'copy_file_range':
+                    sent = os.copy_file_range(src.fileno(), dest.fileno(), BLOCK_SIZE)
+                else:
+                    sent = os.sendfile(dest.fileno(), src.fileno(), offset, BLOCK_SIZE)
+                if sent == 0:
+                    break
+                offset += sent
+        except OSError as e:
+            if offset == 0 and e.errno in UNSUPPORTED_ERRORS:
+                return False
+            raise
+    return True
+
+
+def _link(src_path, dest_path):
+    """Remplace `dest_path` par un lien physique vers `src_path`"""
+    tmp_path = dest_path + '.link-tmp'
+    if os.path.lexists(tmp_path):
+        os.remove(tmp_path)
+    try:
+        os.link(src_path, tmp_path)
+    except OSError as e:
+        if e.errno in UNSUPPORTED_ERRORS or e.errno == errno.EMLINK:
+            return False
+        raise
+    os.replace(tmp_path, dest_path)
+    return True
+
+
+def same_file(src_path, dest_path):
+    """Vrai si `dest_path` est déjà un lien physique vers `src_path`"""
+    try:
+        return os.path.samefile(src_path, dest_path)
+    except OSError:
+        return False
+
+
+def copy_file(src_path, dest_path, link=False):
+    """
+    Copie `src_path` vers `dest_path` (répertoires créés au besoin) et
+    retourne la méthode utilisée : 'link', 'copy_file_range', 'sendfile'
+    ou 'copy'.
+    """
+    dest_dir = os.path.dirname(dest_path)
+    if dest_dir:
+        os.makedirs(dest_dir, exist_ok=True)
+
+    if link and _link(src_path, dest_path):
+        return 'link'
+
+    # Un lien physique existant ne doit pas être écrasé en place (le source
+    # serait modifié avec lui)
+    if os.path.lexists(dest_path) and (os.path.islink(dest_path) or os.stat(dest_path).st_nlink > 1):
+        os.remove(dest_path)
+
+    method = 'copy'
+    for syscall in ('copy_file_range', 'sendfile'):
+        if hasattr(os, syscall) and _kernel_copy(src_path, dest_path, syscall):
+            method = syscall
+            break
+    else:
+        shutil.copyfile(src_path, dest_path)
+    shutil.copystat(src_path, dest_path)
+    return method
@@ -0,0 +1,296 @@
+"""
+Élimination du code des fonctionnalités absentes d'une variante.
+
+Les fonctionnalités sont celles de build-manifest.json ("features") ; une
+variante qui en retire ("strip") les voit à false dans PLUME_FEATURES
+(js-refactor/00.features.js, tout à true dans les sources). Au build, le
+code qui en dépend est retiré du JavaScript :
+
+- régions délimitées par des pragmas, sur leurs propres lignes :
+      // #if thriller          (ou // #if !thriller)
+      ...
+      // #endif
+  les lignes des pragmas disparaissent, le contenu n'est gardé que si la
+  condition est vraie ;
+- `if (PLUME_FEATURES.nom) {...} else {...}` (aussi `!PLUME_FEATURES.nom`
+  et `PLUME_FEATURES.nom && autre condition`) : la condition est évaluée et
+  seule la branche atteignable est gardée. Les branches doivent être des
+  blocs { } ; sinon l'instruction est laissée telle quelle ;
+- toute autre lecture de PLUME_FEATURES.nom est remplacée par true/false.
+
+Sans build, les sources restent valides : PLUME_FEATURES est défini et les
+pragmas ne sont que des commentaires.
+
+Utilisable seul :  python3 -m buildtools.features light
+"""
+
+import argparse
+import json
+import os
+import re
+import sys
+from collections import namedtuple
+
+from buildtools.jstokens import tokenize, NAME, PUNCT, COMMENT, WS
+
+# Incrémenté à chaque changement du résultat produit (invalide le cache)
+FEATURES_VERSION = 1
+
+FLAGS_NAME = 'PLUME_FEATURES'
+FLAGS_PATH = 'js-refactor/00.features.js'
+
+PRAGMA_RE = re.compile(r'^[ \t]*//[ \t]*#(if|endif)\b(.*)$')
+FLAGS_LITERAL_RE = re.compile(r'(\b' + FLAGS_NAME + r'\s*=\s*Object\.freeze\()\{[^}]*\}')
+
+# Opérateurs qui rendent l'évaluation de `A && reste` dépendante d'autre chose que A
+LOOSE_OPERATORS = frozenset(['||', '??', '?', ','])
+
+COMPARISONS = frozenset(['==', '===', '!=', '!==', '<=', '>='])
+
+# Éléments retirés d'un module : régions de pragmas, if évalués, lectures remplacées
+Folded = namedtuple('Folded', ['regions', 'branches', 'constants'])
+
+
+def flags_source(src, flags):
+    """Réécrit l'objet de PLUME_FEATURES avec les valeurs de la variante, ValueError s'il est introuvable"""
+    literal = json.dumps(flags)
+    result, count = FLAGS_LITERAL_RE.subn(lambda m: m.group(1) + literal, src, count=1)
+    if not count:
+        raise ValueError(f"{FLAGS_NAME} = Object.freeze({{...}}) introuvable")
+    return result
+
+
+def strip_regions(src, flags):
+    """Applique les pragmas // #if ... // #endif, retourne (source, régions retirées)"""
+    if '#if' not in src:
+        return src, 0
+    lines = src.splitlines(keepends=True)
+    kept = []
+    stack = []      # (condition vraie, ligne) des #if ouverts
+    inactive = 0    # #if ouverts dont la condition est fausse
+    removed = 0
+    for number, line in enumerate(lines, 1):
+        match = PRAGMA_RE.match(line)
+        if not match:
+            if not inactive:
+                kept.append(line)
+            continue
+        if match.group(1) == 'if':
+            condition = match.group(2).strip()
+            name = condition.lstrip('!').strip()
+            if name not in flags:
+                raise ValueError(f"ligne {number}: fonctionnalite inconnue '{name}'")
+            keep = flags[name] != condition.startswith('!')
+            if not keep:
+                removed += not inactive
+                inactive += 1
+            stack.append((keep, number))
+        else:
+            if not stack:
+                raise ValueError(f"ligne {number}: #endif sans #if")
+            keep, _ = stack.pop()
+            inactive -= not keep
+    if stack:
+        raise ValueError(f"ligne {stack[-1][1]}: #if sans #endif")
+    return ''.join(kept), removed
+
+
+def _matching(tokens, index):
+    """Index du token fermant celui ouvert en `index`, ou None"""
+    depth = 0
+    for i in range(index, len(tokens)):
+        kind, text, _pos = tokens[i]
+        if kind != PUNCT:
+            continue
+        if text in ('(', '[', '{'):
+            depth += 1
+        elif text in (')', ']', '}'):
+            depth -= 1
+            if depth == 0:
+                return i
+    return None
+
+
+def _text(tokens, i):
+    return tokens[i][1] if 0 <= i < len(tokens) else None
+
+
+def _end(token):
+    return token[2] + len(token[1])
+
+
+def _flag_at(tokens, i, flags):
+    """(valeur, index suivant) si tokens[i:] commence par [!]PLUME_FEATURES.nom connu, sinon None"""
+    negate = _text(tokens, i) == '!'
+    j = i + negate
+    if (_text(tokens, j) != FLAGS_NAME or _text(tokens, j + 1) != '.'
+            or _text(tokens, j - 1) in ('.', '?.') or _text(tokens, j + 2) not in flags):
+        return None
+    return flags[tokens[j + 2][1]] != negate, j + 3
+
+
+def _condition(tokens, start, end, flags):
+    """
+    Évalue la condition tokens[start:end] : (True/False, None) si elle est
+    constante, (None, index du reste) pour `drapeau vrai && reste`, None sinon.
+    """
+    flag = _flag_at(tokens, start, flags)
+    if not flag:
+        return None
+    value, i = flag
+    if i == end:
+        return value, None
+    if _text(tokens, i) != '&&':
+        return None
+    depth = 0
+    for k in range(i + 1, end):
+        text = tokens[k][1]
+        if tokens[k][0] == PUNCT:
+            if text in ('(', '[', '{'):
+                depth += 1
+            elif text in (')', ']', '}'):
+                depth -= 1
+            elif depth == 0 and text in LOOSE_OPERATORS:
+                return None
+    return (False, None) if not value else (None, i + 1)
+
+
+def _chain_end(tokens, i):
+    """Fin (index exclu) des branches else qui commencent en `i`, None si une branche n'est pas un bloc"""
+    while _text(tokens, i) == 'else':
+        if _text(tokens, i + 1) == '{':
+            block_end = _matching(tokens, i + 1)
+            return None if block_end is None else block_end + 1
+        if _text(tokens, i + 1) != 'if' or _text(tokens, i + 2) != '(':
+            return None
+        close = _matching(tokens, i + 2)
+        if close is None or _text(tokens, close + 1) != '{':
+            return None
+        block_end = _matching(tokens, close + 1)
+        if block_end is None:
+            return None
+        i = block_end + 1
+    return i
+
+
+def _assigned(tokens, i):
+    """Vrai si tokens[i] modifie l'expression qui le précède (=, +=, ++...)"""
+    text = _text(tokens, i) or ''
+    return text in ('++', '--') or text.endswith('=') and text not in COMPARISONS
+
+
+def _whole_lines(src, start, end):
+    """Étend [start, end) aux lignes entières si rien d'autre ne les occupe"""
+    line_start = src.rfind('\n', 0, start) + 1
+    line_end = src.find('\n', end)
+    line_end = len(src) if line_end == -1 else line_end + 1
+    if src[line_start:start].strip() or src[end:line_end].strip():
+        return start, end
+    return line_start, line_end
+
+
+def fold_conditions(src, flags):
+    """Évalue les conditions sur PLUME_FEATURES, retourne (source, if évalués, lectures remplacées)"""
+    if FLAGS_NAME not in src:
+        return src, 0, 0
+    tokens = [token for token in tokenize(src) if token[0] not in (WS, COMMENT)]
+    edits = []      # (début, fin, remplacement) dans src
+    skips = {}      # fin d'un bloc gardé -> fin de ses branches else retirées
+    branches = constants = 0
+    i = 0
+    count = len(tokens)
+    while i < count:
+        if i in skips:
+            i = skips.pop(i)
+            continue
+        kind, text, pos = tokens[i]
+        if kind == NAME and text == 'if' and _text(tokens, i + 1) == '(' and _text(tokens, i - 1) not in ('.', '?.'):
+            close = _matching(tokens, i + 1)
+            folded = close is not None and _condition(tokens, i + 2, close, flags)
+            block_end = _matching(tokens, close + 1) if folded and _text(tokens, close + 1) == '{' else None
+            chain_end = _chain_end(tokens, block_end + 1) if block_end is not None else None
+            if chain_end is not None:
+                value, rest = folded
+                branches += 1
+                if rest is not None:
+                    # Drapeau vrai : seul le reste de la condition est évalué
+                    edits.append((tokens[i + 2][2], tokens[rest][2], ''))
+                    i = rest
+                elif value:
+                    # Bloc toujours exécuté, branches else retirées
+                    edits.append((pos, tokens[close + 1][2], ''))
+                    if chain_end > block_end + 1:
+                        edits.append((_end(tokens[block_end]), _end(tokens[chain_end - 1]), ''))
+                        skips[block_end] = chain_end
+                    i = close + 2
+                elif _text(tokens, block_end + 1) == 'else':
+                    # Bloc jamais exécuté : la branche else prend sa place
+                    edits.append((pos, tokens[block_end + 2][2], ''))
+                    i = block_end + 2
+                else:
+                    previous = _text(tokens, i - 1)
+                    replacement = '' if previous in (None, ';', '{', '}', 'else') else '{}'
+                    start, end = pos, _end(tokens[block_end])
+                    if previous == 'else':
+                        # Dernière branche d'une chaîne : le else disparaît avec elle
+                        start = _end(tokens[i - 2])
+                    elif not replacement:
+                        start, end = _whole_lines(src, start, end)
+                    edits.append((start, end, replacement))
+                    i = block_end + 1
+                continue
+        flag = _flag_at(tokens, i, flags) if text == FLAGS_NAME else None
+        if flag and not _assigned(tokens, flag[1]):
+            edits.append((pos, _end(tokens[flag[1] - 1]), 'true' if flag[0] else 'false'))
+            constants += 1
+            i = flag[1]
+            continue
+        i += 1
+
+    parts = []
+    copied = 0
+    for start, end, replacement in sorted(edits):
+        parts.append(src[copied:start])
+        parts.append(replacement)
+        copied = end
+    parts.append(src[copied:])
+    return ''.join(parts), branches, constants
+
+
+def fold(src, flags):
+    """Retire le code des fonctionnalités désactivées, retourne (source, Folded). ValueError si un pragma est invalide"""
+    src, regions = strip_regions(src, flags)
+    src, branches, constants = fold_conditions(src, flags)
+    return src, Folded(regions, branches, constants)
+
+
+def main(argv=None):
+    from buildtools.manifest import load as load_manifest
+
+    parser = argparse.ArgumentParser(description="Code JS retire pour les fonctionnalites absentes d'une variante")
+    parser.add_argument('variant', help="variante du manifeste (ex: light)")
+    args = parser.parse_args(argv)
+
+    build_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    manifest = load_manifest(build_dir)
+    flags = manifest.feature_flags(args.variant)
+    print(f"   {FLAGS_NAME} = {json.dumps(flags)}")
+    total = 0
+    for path, _ in manifest.resolve(args.variant, 'js').entries:
+        with open(os.path.join(build_dir, path), 'r', encoding='utf-8') as f:
+            src = f.read()
+        try:
+            folded, result = fold(src, flags)
+        except ValueError as e:
+            print(f"   [ERREUR] {path}: {e}")
+            return 1
+        if any(result):
+            total += len(src) - len(folded)
+            print(f"   {path}: {result.regions} regions, {result.branches} if, {result.constants} lectures "
+                  f"(-{len(src) - len(folded):,} caracteres)")
+    print(f"[OK] {total:,} caracteres retires")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,403 @@
+"""
+Compaction du template HTML du build light (--compact-html).
+
+Le HTML de toutes les vues (html/body.html) est analysé par le navigateur
+avant le premier script : il est réduit sans changer le rendu.
+
+- commentaires retirés (sauf commentaires conditionnels <!--[if ...]>) ;
+- espaces entre deux balises de bloc (div, section, li...) retirés, autres
+  suites d'espaces réduites à un seul caractère ; le contenu de <pre>,
+  <textarea>, <script>, <style> et des éléments dont une classe est en
+  white-space: pre* dans le CSS du bundle est recopié tel quel ;
+- guillemets retirés autour des valeurs d'attributs qui n'en ont pas
+  besoin (lettres, chiffres, - _ . :), espaces des balises normalisés.
+
+En option (hoist, --hoist-styles du build light, désactivé par défaut),
+les attributs style="..." répétés sont remplacés par une classe générée
+(.hs0, .hs1...) dont la règle est ajoutée au CSS du bundle. Cette étape
+n'est pas sûre par construction : la classe doit être !important pour
+primer sur le style inline, elle l'emporte donc aussi sur les écritures
+du JavaScript (el.style.display = ...), et les éléments que le JavaScript
+peut atteindre ne sont devinés que par des expressions régulières sur son
+source. Sur body.html le gain gzip est en outre négatif (classes et règles
+CSS comprises). Un style n'est remplacé que sur un élément sans id, si
+aucune règle !important du CSS ne peut viser cet élément pour une de ses
+propriétés, et si le JavaScript ne peut pas modifier ses propriétés sur
+cet élément : une propriété écrite en JavaScript n'empêche le remplacement
+que sur les éléments qu'une recherche par sélecteur peut renvoyer
+(querySelector, closest..., même test que templates.py), ceux qui portent
+un gestionnaire on*= (this) ; et si le JavaScript écrit un style à travers
+le DOM (el.parentElement.style..., variable obtenue par parentNode,
+children, nextElementSibling...), leur parent, leurs enfants et leurs frères.
+
+Utilisable seul :  python3 -m buildtools.htmlmin [html/body.html]
+"""
+
+import argparse
+import os
+import re
+import sys
+from collections import Counter, namedtuple
+
+from buildtools.htmlstrip import ATTR_RE, COMMENT, END, START, VOID_ELEMENTS, iter_tokens
+from buildtools.templates import element_tree, query_calls, reaches
+
+# Incrémenté à chaque changement du résultat produit (invalide le cache)
+HTMLMIN_VERSION = 3
+
+# Préfixe des classes générées pour les styles inline remplacés
+HOISTED_CLASS_PREFIX = 'hs'
+
+# Nombre minimal d'occurrences d'un style pour le remplacer par une classe
+MIN_REPEATS = 2
+
+# Éléments de bloc : les espaces entre leurs balises ne sont jamais rendus
+BLOCK_ELEMENTS = frozenset([
+    'address', 'article', 'aside', 'blockquote', 'body', 'dd', 'details', 'dialog', 'div', 'dl',
+    'dt', 'fieldset', 'figcaption', 'figure', 'footer', 'form', 'h1', 'h2', 'h3', 'h4', 'h5',
+    'h6', 'head', 'header', 'hr', 'html', 'legend', 'li', 'link', 'main', 'meta', 'nav', 'ol',
+    'optgroup', 'option', 'p', 'section', 'select', 'summary', 'table', 'tbody', 'td',
+    'template', 'tfoot', 'th', 'thead', 'title', 'tr', 'ul',
+])
+
+# Éléments dont le contenu est recopié à l'identique
+PRESERVE_ELEMENTS = frozenset(['pre', 'textarea', 'script', 'style'])
+
+UNQUOTED_VALUE_RE = re.compile(r'^[A-Za-z0-9_.:-]+$')
+WHITESPACE_RE = re.compile(r'\s+')
+CSS_RULE_RE = re.compile(r'([^{}]+)\{([^{}]*)\}')
+COMMENT_RE = re.compile(r'/\*.*?\*/', re.S)
+CSS_CLASS_RE = re.compile(r'\.(-?[_a-zA-Z][\w-]*)')
+JS_STYLE_PROPERTY_RE = re.compile(r'\.style\.([A-Za-z]+)\s*(?:=(?!=)|\+=)')
+TRAVERSAL = (r'\.(?:parentElement|parentNode|children|childNodes|firstElementChild|lastElementChild|'
+             r'firstChild|lastChild|nextElementSibling|previousElementSibling|nextSibling|previousSibling)\b')
+STYLE_WRITE = r'\.style\.(?:[A-Za-z]+\s*(?:=(?!=)|\+=)|setProperty\()'
+TRAVERSAL_STYLE_RE = re.compile(TRAVERSAL + r'[^;\n]*' + STYLE_WRITE)
+TRAVERSAL_DECLARATION_RE = re.compile(r'\b(?:const|let|var)\s+([\w$]+)\s*=\s*[^;\n=]*' + TRAVERSAL)
+JS_SET_PROPERTY_RE = re.compile(r'''\.style\.(?:setProperty|removeProperty)\(\s*['"]([\w-]+)''')
+
+# Résultat de la compaction : HTML, règles CSS générées, statistiques
+Compacted = namedtuple('Compacted', ['html', 'css', 'comments', 'quotes', 'hoisted', 'classes'])
+
+
+def camel_to_css(name):
+    """backgroundColor -> background-color"""
+    return re.sub(r'[A-Z]', lambda m: '-' + m.group(0).lower(), name)
+
+
+def js_style_properties(js):
+    """Propriétés CSS écrites par le JavaScript (el.style.x = ..., setProperty)"""
+    properties = {camel_to_css(name) for name in JS_STYLE_PROPERTY_RE.findall(js)}
+    properties.update(JS_SET_PROPERTY_RE.findall(js))
+    # el.style.cssText = ... ne vise que des éléments créés en JS ou désignés par leur id
+    properties.discard('css-text')
+    return properties
+
+
+def js_traverses_styles(js):
+    """Vrai si le JavaScript écrit un style sur un élément obtenu en parcourant le DOM"""
+    if TRAVERSAL_STYLE_RE.search(js):
+        return True
+    for match in TRAVERSAL_DECLARATION_RE.finditer(js):
+        write = re.compile(r'(?<![\w$.])' + re.escape(match.group(1)) + STYLE_WRITE)
+        if write.search(js, match.end(), _block_end(js, match.end())):
+            return True
+    return False
+
+
+def _block_end(js, start):
+    """Fin du bloc { } qui contient `start` (portée d'une déclaration const/let), accolades comptées sans analyse"""
+    depth = 0
+    for i in range(start, len(js)):
+        if js[i] == '{':
+            depth += 1
+        elif js[i] == '}':
+            depth -= 1
+            if depth < 0:
+                return i
+    return len(js)
+
+
+def css_facts(css):
+    """
+    ({propriété: [sélecteurs]} des déclarations !important, classes en
+    white-space: pre*) du CSS du bundle
+    """
+    important = {}
+    preserved = set()
+    for selectors, body in CSS_RULE_RE.findall(COMMENT_RE.sub('', css)):
+        for declaration in body.split(';'):
+            name, _, value = declaration.partition(':')
+            name = name.strip().lower()
+            if '!important' in value:
+                important.setdefault(name, []).append(selectors.strip())
+            if name == 'white-space' and value.strip().startswith('pre'):
+                for selector in selectors.split(','):
+                    preserved.update(CSS_CLASS_RE.findall(selector.split()[-1] if selector.split() else ''))
+    return important, preserved
+
+
+def normalize_style(style):
+    """Déclarations d'un attribut style : [(propriété, valeur)], None si illisible"""
+    declarations = []
+    for declaration in style.split(';'):
+        if not declaration.strip():
+            continue
+        name, colon, value = declaration.partition(':')
+        if not colon or not name.strip() or not value.strip() or '/*' in declaration:
+            return None
+        declarations.append((name.strip().lower(), WHITESPACE_RE.sub(' ', value.strip())))
+    return declarations or None
+
+
+def _attributes(attrs_text):
+    """[(nom tel qu'écrit, valeur ou None)] d'une balise ouvrante"""
+    result = []
+    for match in ATTR_RE.finditer(attrs_text):
+        value = next((group for group in match.groups()[1:] if group is not None), None)
+        result.append((match.group(1), value))
+    return result
+
+
+def _quoted_values(attrs_text):
+    """Nombre de valeurs écrites entre guillemets qui n'en ont pas besoin"""
+    return sum(1 for match in ATTR_RE.finditer(attrs_text)
+               if (match.group(2) or match.group(3) or '') and UNQUOTED_VALUE_RE.match(match.group(2) or match.group(3)))
+
+
+def _format_attribute(name, value):
+    if value is None:
+        return name
+    if UNQUOTED_VALUE_RE.match(value):
+        return f'{name}={value}'
+    quote = "'" if '"' in value and "'" not in value else '"'
+    return f'{name}={quote}{value}{quote}'
+
+
+class Compactor:
+    """
+    Compaction d'un template ; avec `hoist`, styles remplaçables calculés
+    d'après le CSS et le JS du bundle, donnés en morceaux (modules ou lignes
+    du bundle) et analysés un par un
+    """
+
+    def __init__(self, css=(), js=(), hoist=False):
+        self.important, self.preserved_classes = {}, set()
+        for segment in css:
+            important, preserved = css_facts(segment)
+            for name, selectors in important.items():
+                self.important.setdefault(name, []).extend(selectors)
+            self.preserved_classes |= preserved
+        self.hoist = hoist
+        self.js_properties = set().union(*map(js_style_properties, js)) if hoist else set()
+        self.queries = [call for segment in js for call in query_calls(segment, scoped=True)] if self.js_properties else []
+        self.traverses = bool(self.js_properties) and any(map(js_traverses_styles, js))
+        self.children = {}
+        self.targets = {}
+
+    def hoistable(self, attributes, element=None):
+        """
+        Clé du style d'un élément s'il peut devenir une classe, sinon None.
+        Sans `element` (position inconnue), il est supposé accessible au JavaScript.
+        """
+        names = {name.lower() for name, _ in attributes}
+        style = next((value for name, value in attributes if name.lower() == 'style'), None)
+        if style is None or 'id' in names:
+            return None
+        declarations = normalize_style(style)
+        if not declarations:
+            return None
+        if any(name.startswith('--') or self.overridden(name, element) for name, _ in declarations):
+            return None
+        if any(name in self.js_properties for name, _ in declarations) and self.scriptable(element):
+            return None
+        return ';'.join(f'{name}:{value}' for name, value in declarations)
+
+    def overridden(self, name, element):
+        """Vrai si une règle !important du CSS peut donner la propriété `name` à l'élément"""
+        selectors = self.important.get(name)
+        if not selectors:
+            return False
+        return element is None or any(reaches('querySelectorAll', selector, element) for selector in selectors)
+
+    def scriptable(self, element):
+        """
+        Vrai si le JavaScript peut obtenir l'élément : directement, ou par son
+        parent, un enfant ou un frère s'il parcourt le DOM pour écrire un style
+        """
+        if element is None:
+            return True
+        if not self.traverses:
+            return self._target(element)
+        parent = element.ancestors[-1] if element.ancestors else None
+        related = [element] + self.children.get(id(element), [])
+        if parent is not None:
+            related += [parent] + self.children.get(id(parent), [])
+        return any(self._target(other) for other in related)
+
+    def _target(self, element):
+        """Vrai si l'élément a un id, un gestionnaire on*= ou peut être renvoyé par une recherche du JavaScript"""
+        key = id(element)
+        if key not in self.targets:
+            attributes = element.attributes
+            self.targets[key] = ('id' in attributes
+                                 or any(name.startswith('on') for name in attributes)
+                                 or any(reaches(method, query, element) for method, query in self.queries))
+        return self.targets[key]
+
+    def compact(self, html):
+        """Retourne un Compacted (HTML compacté et règles CSS des styles remplacés)"""
+        tokens = list(iter_tokens(html))
+        self.children = {}
+        self.targets = {}
+
+        # Styles répétés : une classe par style, dans l'ordre de première apparition
+        keys = {}
+        if self.hoist:
+            elements = element_tree(tokens)
+            for element in elements.values():
+                if element.ancestors:
+                    self.children.setdefault(id(element.ancestors[-1]), []).append(element)
+            for index, token in enumerate(tokens):
+                if token.kind == START and 'style' in token.attrs:
+                    keys[index] = self.hoistable(_attributes(token.attrs), elements[index])
+        counts = Counter(key for key in keys.values() if key)
+        classes = {}
+        for key, count in counts.items():
+            if count >= MIN_REPEATS:
+                classes[key] = f'{HOISTED_CLASS_PREFIX}{len(classes)}'
+
+        parts = []
+        stack = []          # balises ouvertes
+        preserving = 0      # profondeur des éléments recopiés tels quels
+        comments = quotes = hoisted = 0
+        previous = None     # dernier token conservé
+        copied = 0
+        for index, token in enumerate(tokens):
+            text = html[copied:token.start]
+            if text:
+                parts.append(self._text(text, previous, token, preserving))
+            copied = token.end
+            if token.kind == COMMENT:
+                comment = html[token.start:token.end]
+                if comment.startswith('<!--[if') or preserving:
+                    parts.append(comment)
+                else:
+                    comments += 1
+                    # Deux textes autour du commentaire : un seul espace conservé
+                    continue
+            elif token.kind == START:
+                tag, quoted, replaced = self._start_tag(html, token, classes, preserving, keys.get(index))
+                parts.append(tag)
+                quotes += quoted
+                hoisted += replaced
+                if token.name not in VOID_ELEMENTS and not token.selfclose:
+                    preserve = token.name in PRESERVE_ELEMENTS or self._preserved(token)
+                    stack.append((token.name, preserve))
+                    preserving += preserve
+            elif token.kind == END:
+                if preserving:
+                    parts.append(html[token.start:token.end])
+                else:
+                    parts.append(f'</{html[token.start + 2:token.end - 1].strip()}>')
+                if any(name == token.name for name, _ in stack):
+                    while True:
+                        name, preserve = stack.pop()
+                        preserving -= preserve
+                        if name == token.name:
+                            break
+            else:
+                parts.append(html[token.start:token.end])
+            previous = token
+        if copied < len(html):
+            parts.append(self._text(html[copied:], previous, None, preserving))
+
+        css = ''.join(f'.{name}{{{self._important(key)}}}\n' for key, name in classes.items())
+        return Compacted(''.join(parts), css, comments, quotes, hoisted, len(classes))
+
+    def _preserved(self, token):
+        for name, value in _attributes(token.attrs):
+            lowered = name.lower()
+            if lowered == 'contenteditable':
+                return True
+            if lowered == 'class' and value and self.preserved_classes.intersection(value.split()):
+                return True
+        return False
+
+    def _important(self, key):
+        return ';'.join(f'{declaration} !important' for declaration in key.split(';'))
+
+    def _text(self, text, previous, following, preserving):
+        """Texte entre deux balises, réduit hors des éléments préservés"""
+        if preserving:
+            return text
+        if not text.strip():
+            if _is_block(previous) and _is_block(following):
+                return ''
+            return ' '
+        return WHITESPACE_RE.sub(' ', text)
+
+    def _start_tag(self, html, token, classes, preserving, key):
+        """(balise réécrite, guillemets retirés, style remplacé) ; `key` : style remplaçable de l'élément"""
+        if preserving:
+            return html[token.start:token.end], 0, 0
+        attributes = _attributes(token.attrs)
+        replaced = 0
+        if classes:
+            if key in classes:
+                replaced = 1
+                attributes = [(name, value) for name, value in attributes if name.lower() != 'style']
+                for i, (name, value) in enumerate(attributes):
+                    if name.lower() == 'class':
+                        attributes[i] = (name, f'{value} {classes[key]}' if value and value.strip() else classes[key])
+                        break
+                else:
+                    attributes.append(('class', classes[key]))
+        quoted = _quoted_values(token.attrs)
+        name = html[token.start + 1:token.start + 1 + len(token.name)]
+        parts = [name] + [_format_attribute(attr, value) for attr, value in attributes]
+        # Valeur sans guillemets suivie de '/' : l'espace évite de l'y rattacher
+        end = (' />' if attributes and attributes[-1][1] is not None else '/>') if token.selfclose else '>'
+        return '<' + ' '.join(parts) + end, quoted, replaced
+
+
+def _is_block(token):
+    """Vrai si le token est une balise d'élément de bloc (ou le début/la fin du template)"""
+    return token is None or token.kind == COMMENT or (token.kind in (START, END) and token.name in BLOCK_ELEMENTS)
+
+
+def compact(html, css=(), js=(), hoist=False):
+    """
+    Compacte `html` ; `css` (morceaux du bundle) donne les classes en white-space: pre*.
+    Avec `hoist`, les styles répétés deviennent des classes, limitées par `css` et `js`.
+    """
+    return Compactor(css, js, hoist).compact(html)
+
+
+def main(argv=None):
+    from buildtools.sizes import gzip_size
+
+    parser = argparse.ArgumentParser(description="Compaction d'un template HTML (gain mesure, sans CSS ni JS)")
+    parser.add_argument('path', nargs='?', default='html/body.html', help="fichier HTML (defaut: html/body.html)")
+    parser.add_argument('--output', help="ecrit le HTML compacte dans ce fichier")
+    parser.add_argument('--hoist-styles', action='store_true',
+                        help="remplace aussi les styles inline repetes par des classes")
+    args = parser.parse_args(argv)
+
+    build_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    with open(os.path.join(build_dir, args.path), 'r', encoding='utf-8') as f:
+        html = f.read()
+    result = compact(html, hoist=args.hoist_styles)
+    before, after = len(html.encode('utf-8')), len(result.html.encode('utf-8')) + len(result.css.encode('utf-8'))
+    print(f"   {result.comments} commentaires, {result.quotes} guillemets retires, "
+          f"{result.hoisted} styles inline -> {result.classes} classes")
+    print(f"[OK] {before:,} -> {after:,} octets "
+          f"(gzip {gzip_size(html.encode('utf-8')):,} -> {gzip_size((result.html + result.css).encode('utf-8')):,})")
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(result.html)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,228 @@
+"""
+Retrait des éléments HTML d'une fonctionnalité (build light).
+
+Les éléments à retirer sont décrits par des sélecteurs simples, déclarés par
+fonctionnalité dans build-manifest.json ("features") :
+    button#header-tab-thriller      balise + id
+    button[data-view=thriller]      balise + attribut = valeur
+    #thrillerList, [value=x]        sans balise : toute balise
+Un élément reconnu est retiré avec tout son contenu, quelle que soit la
+profondeur des éléments imbriqués.
+
+Le HTML est parcouru une seule fois par un tokenizer en flux (balises
+ouvrantes et fermantes, commentaires, contenu brut de <script>, <style>,
+<textarea> et <title>) : le temps est linéaire en la taille du fichier,
+quel que soit le nombre de sélecteurs. Les attributs ne sont analysés que
+pour les balises visées par un sélecteur. Tout ce qui n'est pas retiré est
+recopié à l'identique (espaces, commentaires, casse).
+
+Utilisable seul :  python3 -m buildtools.htmlstrip light [html/body.html]
+"""
+
+import argparse
+import os
+import re
+import sys
+from collections import namedtuple
+
+# Incrémenté à chaque changement du résultat produit (invalide le cache)
+HTMLSTRIP_VERSION = 1
+
+# Éléments sans balise fermante
+VOID_ELEMENTS = frozenset([
+    'area', 'base', 'br', 'col', 'embed', 'hr', 'img', 'input', 'link', 'meta',
+    'param', 'source', 'track', 'wbr',
+])
+
+# Éléments dont le contenu n'est pas du HTML (lu jusqu'à la balise fermante)
+RAW_TEXT_ELEMENTS = frozenset(['script', 'style', 'textarea', 'title'])
+RAW_TEXT_END_RE = {name: re.compile(r'</' + name + r'\s*>', re.IGNORECASE) for name in RAW_TEXT_ELEMENTS}
+
+# Élément de syntaxe : type (COMMENT, DECL, START, END), position, balise en
+# minuscules, texte des attributs, balise autofermante ; le texte entre deux
+# tokens (contenu brut de <script>... compris) est du texte
+Token = namedtuple('Token', ['kind', 'start', 'end', 'name', 'attrs', 'selfclose'])
+COMMENT = 'comment'
+DECL = 'decl'
+START = 'start'
+END = 'end'
+
+# Sélecteur : balise (None = toute balise), attribut et valeur attendue
+Selector = namedtuple('Selector', ['tag', 'attribute', 'value', 'text'])
+
+SELECTOR_RE = re.compile(
+    r'^(?P<tag>[a-zA-Z][\w-]*)?'
+    r'(?:#(?P<id>[\w-]+)|\[(?P<attr>[^\s=\]]+)=(?P<quote>["\']?)(?P<value>[^"\'\]]*)(?P=quote)\])$')
+
+# Prochain élément de syntaxe : commentaire, déclaration, balise fermante ou ouvrante
+TOKEN_RE = re.compile(
+    r'<!--.*?-->'
+    r'|<![^>]*>'
+    r'|</(?P<end>[a-zA-Z][\w:-]*)\s*>'
+    r'|<(?P<start>[a-zA-Z][\w:-]*)(?P<attrs>(?:\s+[^\s=/>]+(?:\s*=\s*(?:"[^"]*"|\'[^\']*\'|[^\s"\'>]+))?)*)'
+    r'\s*(?P<selfclose>/?)>',
+    re.DOTALL)
+
+ATTR_RE = re.compile(r'([^\s=/>]+)(?:\s*=\s*(?:"([^"]*)"|\'([^\']*)\'|([^\s"\'>]+)))?')
+
+
+def iter_tokens(html):
+    """Balises et commentaires de `html`, dans l'ordre (un seul parcours)"""
+    pos = 0
+    length = len(html)
+    while pos < length:
+        match = TOKEN_RE.search(html, pos)
+        if not match:
+            return
+        pos = match.end()
+        if match.group('end'):
+            yield Token(END, match.start(), pos, match.group('end').lower(), '', False)
+        elif match.group('start'):
+            name = match.group('start').lower()
+            selfclose = bool(match.group('selfclose'))
+            yield Token(START, match.start(), pos, name, match.group('attrs'), selfclose)
+            if name in RAW_TEXT_ELEMENTS and not selfclose:
+                close = RAW_TEXT_END_RE[name].search(html, pos)
+                pos = close.start() if close else length
+        else:
+            kind = COMMENT if match.group(0).startswith('<!--') else DECL
+            yield Token(kind, match.start(), pos, None, '', False)
+
+
+def parse_selector(text):
+    """Sélecteur depuis sa forme texte, ValueError si la syntaxe n'est pas reconnue"""
+    match = SELECTOR_RE.match(text.strip())
+    if not match:
+        raise ValueError(f"selecteur invalide '{text}' (attendu: balise#id ou balise[attribut=valeur])")
+    tag = match.group('tag').lower() if match.group('tag') else None
+    if match.group('id') is not None:
+        return Selector(tag, 'id', match.group('id'), text)
+    return Selector(tag, match.group('attr').lower(), match.group('value'), text)
+
+
+def parse_attributes(text):
+    """{nom: valeur} des attributs d'une balise ouvrante (noms en minuscules)"""
+    attributes = {}
+    for match in ATTR_RE.finditer(text):
+        name = match.group(1).lower()
+        value = next((group for group in match.groups()[1:] if group is not None), '')
+        attributes.setdefault(name, value)
+    return attributes
+
+
+class Stripper:
+    """Sélecteurs indexés par balise, appliqués en une passe"""
+
+    def __init__(self, selectors):
+        self.selectors = [parse_selector(s) if isinstance(s, str) else s for s in selectors]
+        self.by_tag = {}
+        for selector in self.selectors:
+            self.by_tag.setdefault(selector.tag, []).append(selector)
+        self.any_tag = self.by_tag.get(None, [])
+
+    def match(self, tag, attrs_text):
+        """Premier sélecteur correspondant à la balise ouvrante, ou None"""
+        candidates = self.by_tag.get(tag, [])
+        if not candidates and not self.any_tag:
+            return None
+        attributes = parse_attributes(attrs_text)
+        for selector in candidates + self.any_tag:
+            if attributes.get(selector.attribute) == selector.value:
+                return selector
+        return None
+
+    def strip(self, html):
+        """
+        Retourne (html sans les éléments reconnus, {sélecteur: nombre d'éléments retirés}).
+        Une balise fermante sans ouvrante correspondante est ignorée ; un
+        élément non fermé est retiré jusqu'à la fin de son parent.
+        """
+        counts = {selector.text: 0 for selector in self.selectors}
+        kept = []
+        copied = 0       # début du texte pas encore recopié
+        stack = []       # balises ouvertes (hors éléments vides)
+        removing = None  # (profondeur de la pile à l'ouverture, début) de l'élément retiré
+        for token in iter_tokens(html):
+            name = token.name
+            if token.kind == END:
+                if name not in stack:
+                    continue
+                # Ferme aussi les éléments imbriqués laissés ouverts (<li>, <p>...)
+                while stack.pop() != name:
+                    pass
+                if removing and len(stack) <= removing[0]:
+                    # Fermeture de l'élément retiré, ou de son parent s'il n'était pas fermé
+                    cut = token.end if len(stack) == removing[0] else token.start
+                    kept.append(html[copied:removing[1]])
+                    copied = cut
+                    removing = None
+                continue
+            if token.kind != START:
+                continue
+            if not removing:
+                selector = self.match(name, token.attrs)
+                if selector:
+                    counts[selector.text] += 1
+                    if name in VOID_ELEMENTS or token.selfclose:
+                        kept.append(html[copied:token.start])
+                        copied = token.end
+                        continue
+                    removing = (len(stack), token.start)
+            if name not in VOID_ELEMENTS and not token.selfclose:
+                stack.append(name)
+        if removing:
+            # Élément jamais fermé : retiré jusqu'à la fin du document
+            kept.append(html[copied:removing[1]])
+            copied = len(html)
+        kept.append(html[copied:])
+        return ''.join(kept), counts
+
+
+def strip_features(html, features):
+    """
+    Retire les éléments de chaque fonctionnalité : `features` est une liste
+    [(fonctionnalité, [sélecteurs])]. Retourne (html, [(fonctionnalité,
+    sélecteur, nombre d'éléments retirés)]).
+    """
+    selectors = [selector for _, feature_selectors in features for selector in feature_selectors]
+    html, counts = Stripper(selectors).strip(html)
+    report = [(feature, selector, counts[selector])
+              for feature, feature_selectors in features for selector in feature_selectors]
+    return html, report
+
+
+def log_strip_report(report, log):
+    """Affiche les éléments retirés par fonctionnalité, signale les sélecteurs sans effet"""
+    removed = {}
+    for feature, selector, count in report:
+        removed[feature] = removed.get(feature, 0) + count
+        if not count:
+            log(f"   [!] {feature}: aucun element pour '{selector}'")
+    summary = ', '.join(f"{feature} ({count})" for feature, count in removed.items())
+    log(f"   [OK] Elements retires: {summary}")
+
+
+def main(argv=None):
+    from buildtools.manifest import load as load_manifest
+
+    parser = argparse.ArgumentParser(description="Retire d'un HTML les fonctionnalites exclues d'une variante")
+    parser.add_argument('variant', help="variante du manifeste (ex: light)")
+    parser.add_argument('path', nargs='?', default='html/body.html', help="fichier HTML (defaut: html/body.html)")
+    parser.add_argument('--output', help="ecrit le HTML obtenu dans ce fichier")
+    args = parser.parse_args(argv)
+
+    build_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    features = load_manifest(build_dir).stripped_features(args.variant)
+    with open(os.path.join(build_dir, args.path), 'r', encoding='utf-8') as f:
+        html = f.read()
+    stripped, report = strip_features(html, features)
+    log_strip_report(report, print)
+    print(f"[OK] {len(html):,} -> {len(stripped):,} caracteres")
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(stripped)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
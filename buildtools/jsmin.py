@@ -0,0 +1,112 @@
+"""
+Minification JavaScript sans dépendance (étape --minify du build light).
+
+Travaille sur les tokens de jstokens : les chaînes, templates et regex sont
+recopiés tels quels, les commentaires sont supprimés (sauf les bannières de
+licence /*! ... */) et les espaces réduits au strict nécessaire.
+
+Les retours à la ligne ne sont supprimés que lorsque l'insertion automatique
+de point-virgule (ASI) ne peut pas dépendre d'eux : après un opérateur ou une
+ouverture, ou avant un token qui ne peut pas commencer une instruction. Dans
+le doute la ligne est conservée ; le résultat reste équivalent au source.
+"""
+
+from buildtools.jstokens import tokenize, WS, COMMENT, NAME, NUMBER, PUNCT
+
+# Incrémenté à chaque changement de sortie (invalide le cache des segments minifiés)
+JSMIN_VERSION = 1
+
+# Après ces tokens, l'instruction continue forcément : pas d'ASI possible
+CONTINUES_AFTER = frozenset([
+    '{', '(', '[', ',', ';', ':', '?', '.', '?.', '...', '=>',
+    '=', '+=', '-=', '*=', '/=', '%=', '**=', '<<=', '>>=', '>>>=', '&=', '|=', '^=',
+    '&&=', '||=', '??=', '==', '===', '!=', '!==', '<', '>', '<=', '>=',
+    '&&', '||', '??', '+', '-', '*', '/', '%', '**', '<<', '>>', '>>>',
+    '&', '|', '^', '!', '~',
+])
+
+# Ces tokens ne peuvent pas commencer une instruction : pas d'ASI avant eux
+CANNOT_START = frozenset([
+    '}', ')', ']', ',', ';', ':', '?', '.', '?.', '=>',
+    '=', '+=', '-=', '*=', '/=', '%=', '**=', '<<=', '>>=', '>>>=', '&=', '|=', '^=',
+    '&&=', '||=', '??=', '==', '===', '!=', '!==', '<', '>', '<=', '>=',
+    '&&', '||', '??', '*', '%', '**', '<<', '>>', '>>>', '&', '|', '^',
+])
+
+LINE_TERMINATORS = '\n\r\u2028\u2029'
+
+# Productions « restreintes » : un retour à la ligne après elles termine l'instruction
+RESTRICTED = frozenset(['return', 'throw', 'break', 'continue', 'yield', 'async', 'let'])
+
+
+def is_word_char(char):
+    """Caractère pouvant faire partie d'un identifiant ou d'un nombre"""
+    return char.isalnum() or char in '_$\\#' or ord(char) > 127
+
+
+def needs_newline(prev, token):
+    """Vrai si le retour à la ligne entre `prev` et `token` peut changer le sens du code"""
+    if prev[0] == NAME and prev[1] in RESTRICTED:
+        return True
+    if token[0] == PUNCT and token[1] in ('++', '--'):
+        return True
+    if prev[0] == PUNCT and prev[1] in CONTINUES_AFTER:
+        return False
+    if token[0] == PUNCT and token[1] in CANNOT_START:
+        return False
+    return True
+
+
+def needs_space(prev, token):
+    """Vrai si `prev` et `token` fusionneraient sans espace"""
+    last, first = prev[1][-1], token[1][0]
+    if is_word_char(last) and is_word_char(first):
+        return True
+    if last in '+-' and first == last:
+        return True
+    if last == '/' and first in '/*':
+        return True
+    if prev[0] == NUMBER and first == '.' and not any(c in prev[1] for c in '.eExX'):
+        return True
+    return False
+
+
+def minify(src):
+    """Retourne `src` minifié"""
+    out = []
+    prev = None
+    newline = False
+    space = False
+
+    for token in tokenize(src):
+        kind, text = token[0], token[1]
+        if kind == WS:
+            if any(c in text for c in LINE_TERMINATORS):
+                newline = True
+            else:
+                space = True
+            continue
+        if kind == COMMENT:
+            if text.startswith('/*!'):
+                # Bannière de licence : conservée, transparente pour l'ASI
+                if newline or space:
+                    out.append('\n' if newline else ' ')
+                out.append(text)
+                newline = space = False
+            elif any(c in text for c in LINE_TERMINATORS):
+                # Un commentaire multi-ligne vaut un retour à la ligne pour l'ASI
+                newline = True
+            else:
+                space = True
+            continue
+
+        if prev is not None:
+            if newline and needs_newline(prev, token):
+                out.append('\n')
+            elif (newline or space) and needs_space(prev, token):
+                out.append(' ')
+        out.append(text)
+        prev = token
+        newline = space = False
+
+    return ''.join(out)
@@ -0,0 +1,150 @@
+"""
+Découpage lexical (tokenizer) minimal du JavaScript des modules.
+
+Il ne construit pas d'arbre syntaxique : il sait seulement reconnaître les
+chaînes, les template literals (y compris les expressions ${...} imbriquées),
+les expressions régulières, les commentaires, les identifiants, les nombres
+et la ponctuation. C'est suffisant pour minifier sans casser le code et pour
+indexer les déclarations de premier niveau.
+
+Chaque token est un tuple (type, texte, position) ; la concaténation des
+textes redonne exactement la source.
+"""
+
+import re
+
+# Types de tokens
+WS = 'ws'
+COMMENT = 'comment'
+STRING = 'string'
+TEMPLATE = 'template'
+REGEX = 'regex'
+NAME = 'name'
+NUMBER = 'number'
+PUNCT = 'punct'
+
+# Tokens non significatifs (ignorés pour l'analyse)
+TRIVIA = (WS, COMMENT)
+
+# Mots-clés après lesquels un '/' ouvre une expression régulière
+KEYWORDS_BEFORE_EXPRESSION = frozenset([
+    'return', 'typeof', 'instanceof', 'in', 'of', 'new', 'delete', 'void',
+    'throw', 'case', 'do', 'else', 'yield', 'await',
+])
+
+WS_RE = re.compile(r'[\s\ufeff]+')
+NAME_RE = re.compile(r'#?[A-Za-z_$\u0080-\uffff][\w$\u0080-\uffff]*')
+NUMBER_RE = re.compile(
+    r'0[xXoObB][\da-fA-F_]+n?'
+    r'|(?:\d[\d_]*\.?[\d_]*|\.\d[\d_]*)(?:[eE][+-]?\d[\d_]*)?n?'
+)
+PUNCT_RE = re.compile(
+    r'>>>=|\.\.\.|===|!==|\*\*=|<<=|>>=|>>>|&&=|\|\|=|\?\?='
+    r'|=>|==|!=|<=|>=|&&|\|\||\?\?|\?\.(?!\d)|\+\+|--|\+=|-=|\*=|/=|%=|&=|\|=|\^=|\*\*|<<|>>'
+    r'|[{}()\[\];,<>+\-*/%&|^!~?:=.@]'
+)
+STRING_RE = {
+    '"': re.compile(r'"(?:[^"\\\n]|\\.|\\\n)*"?', re.S),
+    "'": re.compile(r"'(?:[^'\\\n]|\\.|\\\n)*'?", re.S),
+}
+# Morceau de template : jusqu'au backtick final ou jusqu'à '${'
+TEMPLATE_CHUNK_RE = re.compile(r'(?:[^`\\$]|\\.|\$(?!\{))*(?:`|\$\{)?', re.S)
+REGEX_RE = re.compile(r'/(?:[^/\\\[\n]|\\.|\[(?:[^\]\\\n]|\\.)*\])+/[A-Za-z]*')
+
+
+def regex_allowed(prev):
+    """Vrai si un '/' placé après le token significatif `prev` ouvre une regex"""
+    if prev is None:
+        return True
+    kind, text = prev[0], prev[1]
+    if kind == NAME:
+        return text in KEYWORDS_BEFORE_EXPRESSION
+    if kind == PUNCT:
+        return text not in (')', ']', '}', '++', '--')
+    if kind == TEMPLATE:
+        # Après '${' on commence une expression
+        return text.endswith('${')
+    return False
+
+
+def tokenize(src):
+    """Génère les tokens (type, texte, position) de `src`"""
+    pos = 0
+    length = len(src)
+    # Pile des accolades ouvertes : True pour un '${' de template
+    braces = []
+    prev = None
+
+    while pos < length:
+        char = src[pos]
+        start = pos
+
+        if char.isspace() or char == '\ufeff':
+            pos = WS_RE.match(src, pos).end()
+            yield (WS, src[start:pos], start)
+            continue
+
+        if char == '/':
+            following = src[pos + 1:pos + 2]
+            if following == '/':
+                end = src.find('\n', pos)
+                pos = length if end == -1 else end
+                yield (COMMENT, src[start:pos], start)
+                continue
+            if following == '*':
+                end = src.find('*/', pos + 2)
+                pos = length if end == -1 else end + 2
+                yield (COMMENT, src[start:pos], start)
+                continue
+            if regex_allowed(prev):
+                match = REGEX_RE.match(src, pos)
+                if match:
+                    pos = match.end()
+                    prev = (REGEX, src[start:pos], start)
+                    yield prev
+                    continue
+
+        if char == '"' or char == "'":
+            pos = STRING_RE[char].match(src, pos).end()
+            prev = (STRING, src[start:pos], start)
+            yield prev
+            continue
+
+        if char == '`' or (char == '}' and braces and braces[-1]):
+            if char == '}':
+                braces.pop()
+            pos = TEMPLATE_CHUNK_RE.match(src, pos + 1).end()
+            text = src[start:pos]
+            if text.endswith('${'):
+                braces.append(True)
+            prev = (TEMPLATE, text, start)
+            yield prev
+            continue
+
+        match = NAME_RE.match(src, pos)
+        if match:
+            pos = match.end()
+            prev = (NAME, src[start:pos], start)
+            yield prev
+            continue
+
+        if char.isdigit() or (char == '.' and src[pos + 1:pos + 2].isdigit()):
+            pos = NUMBER_RE.match(src, pos).end()
+            prev = (NUMBER, src[start:pos], start)
+            yield prev
+            continue
+
+        match = PUNCT_RE.match(src, pos)
+        pos = match.end() if match else pos + 1
+        text = src[start:pos]
+        if text == '{':
+            braces.append(False)
+        elif text == '}' and braces:
+            braces.pop()
+        prev = (PUNCT, text, start)
+        yield prev
+
+
+def significant(tokens):
+    """Filtre les espaces et commentaires"""
+    return [token for token in tokens if token[0] not in TRIVIA]
@@ -0,0 +1,310 @@
+"""
+Manifeste de build partagé (build-manifest.json).
+
+Un seul fichier décrit l'ordre des CSS et des JS de chaque variante (full,
+test, light) ainsi que la liste des fichiers déployés vers /live. Les
+scripts de build, deploy-to-live.py et build-index-live.sh le lisent tous
+au lieu de recopier leurs propres listes.
+
+Format :
+- "groups" : fichiers d'un module, dans l'ordre de chargement. Un groupe
+  peut mêler .js et .css : chaque liste ne garde que les fichiers de son type.
+- "variants" : pour chaque variante, les listes "css" et "js". Une règle est
+  soit un chemin relatif à la racine, soit {"group": nom}, soit
+  {"glob": motif, "exclude": [motifs], "sort": bool} qui ajoute les
+  fichiers correspondants pas encore inclus (exclusions testées sur le nom
+  du fichier, sans tenir compte de la casse).
+- "chunks" (facultatif, par variante) : code chargé à la demande, nom du
+  chunk -> règles ; seuls les JS déjà inclus dans la variante sont retenus.
+- "budget" (facultatif, par variante) : tailles gzip maximales en octets,
+  "total" pour le fichier généré ou un nom de groupe (--size-report).
+- "features" : éléments HTML propres à une fonctionnalité, nom ->
+  sélecteurs (balise#id, balise[attribut=valeur], voir htmlstrip.py).
+- "strip" (facultatif, par variante) : fonctionnalités dont les éléments
+  sont retirés du HTML de la variante, et le code JS de PLUME_FEATURES
+  (voir features.py).
+- "defer" (facultatif, par variante) : modales (mêmes sélecteurs)
+  placées dans des <template> et instanciées à la première ouverture
+  avec --defer-modals (voir templates.py).
+- "deploy" : variante déployée et fichiers supplémentaires (mêmes règles).
+
+Le manifeste validé, groupes développés, est mis en cache dans
+build/.manifest.pickle et n'est recompilé que si le JSON change. Les
+motifs glob sont évalués à chaque résolution (nouveaux fichiers en --watch).
+
+Utilisable seul :  python3 -m buildtools.manifest files light --kind js
+"""
+
+import argparse
+import fnmatch
+import glob
+import json
+import os
+import pickle
+import sys
+from collections import namedtuple
+
+from buildtools.htmlstrip import parse_selector
+
+MANIFEST_FILENAME = 'build-manifest.json'
+COMPILED_FILENAME = '.manifest.pickle'
+
+# Incrémenté à chaque changement du format compilé
+COMPILED_VERSION = 6
+
+KINDS = {'css': '.css', 'js': '.js'}
+
+# Fichiers résolus : (chemin, libellé) dans l'ordre, fichiers explicites
+# absents, fichiers ajoutés par un motif glob
+Resolved = namedtuple('Resolved', ['entries', 'missing', 'globbed'])
+
+
+def label_for(path):
+    """Libellé affiché dans le bundle : chemin sans le dossier css/ ou js/"""
+    for prefix in ('css/', 'js/'):
+        if path.startswith(prefix):
+            return path[len(prefix):]
+    return path
+
+
+def _compile_rules(rules, groups, where):
+    """Développe les groupes d'une liste de règles, retourne une liste de tuples"""
+    compiled = []
+    for rule in rules:
+        if isinstance(rule, str):
+            compiled.append(('file', rule))
+        elif 'group' in rule:
+            if rule['group'] not in groups:
+                raise ValueError(f"{where}: groupe inconnu '{rule['group']}'")
+            compiled.extend(('file', path) for path in groups[rule['group']])
+        elif 'glob' in rule:
+            excludes = tuple(pattern.lower() for pattern in rule.get('exclude', []))
+            compiled.append(('glob', rule['glob'], excludes, rule.get('sort', True)))
+        else:
+            raise ValueError(f"{where}: regle invalide {rule!r}")
+    return compiled
+
+
+def compile_manifest(data):
+    """Valide le manifeste JSON et retourne sa forme compilée"""
+    groups = data.get('groups', {})
+    variants = {}
+    for name, variant in data.get('variants', {}).items():
+        variants[name] = {
+            kind: _compile_rules(variant.get(kind, []), groups, f"{name}.{kind}")
+            for kind in KINDS
+        }
+    chunks = {
+        name: {chunk: _compile_rules(rules, groups, f"{name}.chunks.{chunk}")
+               for chunk, rules in variant.get('chunks', {}).items()}
+        for name, variant in data.get('variants', {}).items()
+    }
+    budgets = {}
+    for name, variant in data.get('variants', {}).items():
+        budget = variant.get('budget', {})
+        for key, limit in budget.items():
+            if key != 'total' and key not in groups:
+                raise ValueError(f"{name}.budget: groupe inconnu '{key}'")
+            if not isinstance(limit, int) or limit <= 0:
+                raise ValueError(f"{name}.budget.{key}: taille invalide {limit!r}")
+        budgets[name] = dict(budget)
+    features = {}
+    for name, selectors in data.get('features', {}).items():
+        for selector in selectors:
+            try:
+                parse_selector(selector)
+            except ValueError as e:
+                raise ValueError(f"features.{name}: {e}")
+        features[name] = list(selectors)
+    stripped = {}
+    for name, variant in data.get('variants', {}).items():
+        for feature in variant.get('strip', []):
+            if feature not in features:
+                raise ValueError(f"{name}.strip: fonctionnalite inconnue '{feature}'")
+        stripped[name] = [(feature, features[feature]) for feature in variant.get('strip', [])]
+    deferred = {}
+    for name, variant in data.get('variants', {}).items():
+        for selector in variant.get('defer', []):
+            try:
+                parse_selector(selector)
+            except ValueError as e:
+                raise ValueError(f"{name}.defer: {e}")
+        deferred[name] = list(variant.get('defer', []))
+    group_of = {}
+    for group, paths in groups.items():
+        for path in paths:
+            group_of.setdefault(path, group)
+    deploy = data.get('deploy', {})
+    if deploy.get('variant') and deploy['variant'] not in variants:
+        raise ValueError(f"deploy: variante inconnue '{deploy['variant']}'")
+    return {
+        'variants': variants,
+        'chunks': chunks,
+        'budgets': budgets,
+        'stripped': stripped,
+        'features': list(features),
+        'deferred': deferred,
+        'group_of': group_of,
+        'descriptions': {name: v.get('description', '') for name, v in data.get('variants', {}).items()},
+        'deploy_variant': deploy.get('variant'),
+        'deploy_files': _compile_rules(deploy.get('files', []), groups, 'deploy.files'),
+    }
+
+
+class Manifest:
+    """Manifeste compilé, résolu à la demande contre une arborescence"""
+
+    def __init__(self, build_dir, compiled):
+        self.build_dir = build_dir
+        self.compiled = compiled
+
+    @property
+    def variants(self):
+        return list(self.compiled['variants'])
+
+    def description(self, variant):
+        return self.compiled['descriptions'].get(variant, '')
+
+    def _resolve_rules(self, rules, extension, root):
+        entries = []
+        missing = []
+        globbed = []
+        seen = set()
+        for rule in rules:
+            if rule[0] == 'file':
+                path = rule[1]
+                if extension and not path.endswith(extension):
+                    continue
+                if os.path.exists(os.path.join(root, path)):
+                    entries.append(path)
+                    seen.add(path)
+                else:
+                    missing.append(path)
+                continue
+            _, pattern, excludes, sort = rule
+            matches = glob.glob(os.path.join(root, pattern))
+            if sort:
+                matches.sort()
+            for match in matches:
+                path = os.path.relpath(match, root).replace(os.sep, '/')
+                name = os.path.basename(path).lower()
+                if path in seen or any(fnmatch.fnmatchcase(name, ex) for ex in excludes):
+                    continue
+                entries.append(path)
+                globbed.append(path)
+                seen.add(path)
+        return entries, missing, globbed
+
+    def resolve(self, variant, kind, root=None):
+        """Fichiers `kind` ('css' ou 'js') de la variante, présents sous `root`"""
+        if variant not in self.compiled['variants']:
+            raise ValueError(f"Variante inconnue: {variant} (connues: {', '.join(self.variants)})")
+        entries, missing, globbed = self._resolve_rules(
+            self.compiled['variants'][variant][kind], KINDS[kind], root or self.build_dir)
+        return Resolved([(path, label_for(path)) for path in entries], missing, globbed)
+
+    def chunks(self, variant, root=None):
+        """Chunks JS de la variante : {nom: [chemins]}, limités aux JS de la variante"""
+        included = {path for path, _ in self.resolve(variant, 'js', root).entries}
+        result = {}
+        for name, rules in self.compiled['chunks'].get(variant, {}).items():
+            entries, _, _ = self._resolve_rules(rules, KINDS['js'], root or self.build_dir)
+            result[name] = [path for path in entries if path in included]
+        return result
+
+    def budget(self, variant):
+        """Budget de taille de la variante : {"total" ou groupe: octets gzip}"""
+        return self.compiled['budgets'].get(variant, {})
+
+    def stripped_features(self, variant):
+        """Fonctionnalités retirées du HTML de la variante : [(nom, [sélecteurs])]"""
+        if variant not in self.compiled['variants']:
+            raise ValueError(f"Variante inconnue: {variant} (connues: {', '.join(self.variants)})")
+        return self.compiled['stripped'].get(variant, [])
+
+    def feature_flags(self, variant):
+        """PLUME_FEATURES de la variante : {fonctionnalité: présente}"""
+        stripped = {name for name, _ in self.stripped_features(variant)}
+        return {name: name not in stripped for name in self.compiled['features']}
+
+    def deferred_views(self, variant):
+        """Sélecteurs des modales différées dans la variante"""
+        if variant not in self.compiled['variants']:
+            raise ValueError(f"Variante inconnue: {variant} (connues: {', '.join(self.variants)})")
+        return self.compiled['deferred'].get(variant, [])
+
+    def group_of(self, path):
+        """Groupe du manifeste contenant `path` (le premier déclaré), ou None"""
+        return self.compiled['group_of'].get(path)
+
+    def deploy_files(self, root=None):
+        """Liste complète des fichiers à déployer (variante déployée + fichiers annexes)"""
+        files = []
+        variant = self.compiled['deploy_variant']
+        if variant:
+            for kind in KINDS:
+                resolved = self.resolve(variant, kind, root)
+                files.extend(path for path, _ in resolved.entries)
+                files.extend(resolved.missing)
+        entries, missing, _ = self._resolve_rules(self.compiled['deploy_files'], None, root or self.build_dir)
+        files.extend(entries + missing)
+        return list(dict.fromkeys(files))
+
+
+def load(build_dir):
+    """Charge build-manifest.json, via sa forme compilée si elle est à jour"""
+    source = os.path.join(build_dir, MANIFEST_FILENAME)
+    compiled_path = os.path.join(build_dir, 'build', COMPILED_FILENAME)
+    stat = os.stat(source)
+    key = (COMPILED_VERSION, stat.st_size, stat.st_mtime_ns)
+
+    try:
+        with open(compiled_path, 'rb') as f:
+            cached = pickle.load(f)
+        if cached.get('key') == key:
+            return Manifest(build_dir, cached['manifest'])
+    except (OSError, pickle.UnpicklingError, EOFError, AttributeError, ValueError):
+        pass
+
+    with open(source, 'r', encoding='utf-8') as f:
+        compiled = compile_manifest(json.load(f))
+    try:
+        os.makedirs(os.path.dirname(compiled_path), exist_ok=True)
+        tmp_path = compiled_path + '.tmp'
+        with open(tmp_path, 'wb') as f:
+            pickle.dump({'key': key, 'manifest': compiled}, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, compiled_path)
+    except OSError:
+        # Cache facultatif (répertoire en lecture seule...)
+        pass
+    return Manifest(build_dir, compiled)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Liste les fichiers d'une variante du manifeste de build")
+    sub = parser.add_subparsers(dest='command', required=True)
+    files = sub.add_parser('files', help="fichiers d'une variante (chemin<TAB>libelle)")
+    files.add_argument('variant')
+    files.add_argument('--kind', choices=sorted(KINDS), required=True)
+    files.add_argument('--root', help="arborescence a resoudre (defaut: racine du depot)")
+    sub.add_parser('deploy', help="fichiers deployes vers /live")
+    sub.add_parser('variants', help="variantes disponibles")
+    args = parser.parse_args(argv)
+
+    build_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    manifest = load(build_dir)
+    if args.command == 'files':
+        root = os.path.abspath(args.root) if args.root else None
+        for path, label in manifest.resolve(args.variant, args.kind, root).entries:
+            print(f"{path}\t{label}")
+    elif args.command == 'deploy':
+        for path in manifest.deploy_files():
+            print(path)
+    else:
+        for name in manifest.variants:
+            print(f"{name}\t{manifest.description(name)}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,26 @@
+"""
+Exécution concurrente des lectures et copies de fichiers.
+
+Les tâches sont des entrées/sorties : un pool de threads suffit (le GIL est
+relâché pendant les appels système). Les résultats sont toujours rendus dans
+l'ordre des entrées, ce qui garantit un bundle identique au mode séquentiel.
+"""
+
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+
+def default_jobs():
+    """Nombre de threads par défaut (même règle que ThreadPoolExecutor)"""
+    return min(32, (os.cpu_count() or 1) + 4)
+
+
+def ordered_map(func, items, jobs=None):
+    """Applique `func` à chaque élément et retourne les résultats dans l'ordre"""
+    items = list(items)
+    if jobs is None:
+        jobs = default_jobs()
+    if jobs <= 1 or len(items) <= 1:
+        return [func(item) for item in items]
+    with ThreadPoolExecutor(max_workers=min(jobs, len(items))) as pool:
+        return list(pool.map(func, items))
@@ -0,0 +1,148 @@
+"""
+Profilage des phases du build (--profile).
+
+Chaque phase (vérification des dossiers, lecture des templates, lecture et
+décodage de chaque fichier, assemblage CSS/JS, nettoyage du menu,
+écriture...) est chronométrée avec ses compteurs (fichiers, octets). Le
+résultat est écrit au format Chrome trace, lisible dans chrome://tracing ou
+https://ui.perfetto.dev, et résumé dans un tableau par phase.
+
+Une phase peut être ouverte depuis plusieurs threads (lectures parallèles) :
+chaque thread a sa piste dans la trace. Sans --profile, le profileur est
+inactif et ses phases ne coûtent qu'un appel de fonction.
+"""
+
+import json
+import os
+import threading
+import time
+
+# Compteurs affichés dans le tableau récapitulatif
+COUNTERS = ('files', 'bytes')
+
+
+class Span:
+    """Phase en cours : durée et compteurs"""
+
+    def __init__(self, profiler, name, args):
+        self.profiler = profiler
+        self.name = name
+        self.args = args
+        self.start = self.end = 0
+        self.thread = None
+
+    def count(self, **values):
+        """Ajoute des valeurs aux compteurs de la phase (files=1, bytes=...)"""
+        for key, value in values.items():
+            self.args[key] = self.args.get(key, 0) + value
+
+    def __enter__(self):
+        self.thread = threading.get_ident()
+        self.start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, *exc):
+        self.end = time.perf_counter_ns()
+        self.profiler.record(self)
+        return False
+
+
+class NullSpan:
+    """Phase d'un profileur inactif : ne mesure rien (faux en contexte booléen)"""
+
+    def count(self, **values):
+        pass
+
+    def __bool__(self):
+        return False
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+NULL_SPAN = NullSpan()
+
+
+class Profiler:
+    """Phases chronométrées d'un build"""
+
+    def __init__(self, enabled=True):
+        self.enabled = enabled
+        self.spans = []
+        self.origin = time.perf_counter_ns()
+        self.main_thread = threading.get_ident()
+        self._lock = threading.Lock()
+
+    def phase(self, name, **args):
+        """Contexte chronométrant la phase `name` (args : détails affichés dans la trace)"""
+        if not self.enabled:
+            return NULL_SPAN
+        return Span(self, name, args)
+
+    def record(self, span):
+        with self._lock:
+            self.spans.append(span)
+
+    def elapsed_ns(self):
+        """Durée écoulée depuis la création du profileur"""
+        return time.perf_counter_ns() - self.origin
+
+    def trace_events(self):
+        """Événements Chrome trace (phases complètes "X" et noms des threads)"""
+        pid = os.getpid()
+        threads = {self.main_thread: 0}
+        for span in sorted(self.spans, key=lambda span: span.start):
+            threads.setdefault(span.thread, len(threads))
+        events = [{
+            'name': 'thread_name', 'ph': 'M', 'pid': pid, 'tid': tid,
+            'args': {'name': 'principal' if tid == 0 else f'lecture {tid}'},
+        } for tid in threads.values()]
+        for span in self.spans:
+            events.append({
+                'name': span.name,
+                'cat': 'build',
+                'ph': 'X',
+                'pid': pid,
+                'tid': threads[span.thread],
+                'ts': (span.start - self.origin) / 1000.0,
+                'dur': (span.end - span.start) / 1000.0,
+                'args': span.args,
+            })
+        return events
+
+    def write_trace(self, path):
+        """Écrit la trace JSON (format Chrome/Perfetto)"""
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'traceEvents': self.trace_events(), 'displayTimeUnit': 'ms'}, f)
+        os.replace(tmp_path, path)
+
+    def summary(self):
+        """[(phase, appels, durée ns, {compteur: total})] dans l'ordre de première ouverture"""
+        rows = {}
+        for span in sorted(self.spans, key=lambda span: span.start):
+            row = rows.setdefault(span.name, [0, 0, {}])
+            row[0] += 1
+            row[1] += span.end - span.start
+            for key in COUNTERS:
+                if key in span.args:
+                    row[2][key] = row[2].get(key, 0) + span.args[key]
+        return [(name, calls, duration, counters) for name, (calls, duration, counters) in rows.items()]
+
+
+def log_profile_summary(profiler, log):
+    """Affiche la durée, le nombre d'appels et les compteurs de chaque phase"""
+    rows = profiler.summary()
+    total = profiler.elapsed_ns()
+    width = max([len(name) for name, _, _, _ in rows] + [len('TOTAL')])
+    log(f"   {'Phase':<{width}} {'Appels':>7} {'ms':>10} {'%':>6} {'Fichiers':>9} {'Octets':>12}")
+    for name, calls, duration, counters in rows:
+        files = f"{counters['files']:,}" if 'files' in counters else ''
+        size = f"{counters['bytes']:,}" if 'bytes' in counters else ''
+        log(f"   {name:<{width}} {calls:>7} {duration / 1e6:>10.1f} {duration * 100.0 / total:>5.1f}% "
+            f"{files:>9} {size:>12}")
+    log(f"   {'TOTAL':<{width}} {'':>7} {total / 1e6:>10.1f}  (les lectures paralleles se chevauchent)")
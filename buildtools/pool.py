@@ -0,0 +1,69 @@
+"""
+Sources décodées partagées entre plusieurs builds d'un même processus.
+
+build-matrix.py construit plusieurs variantes à la suite : chaque fichier
+source (templates HTML, CSS, JS) n'est lu et décodé qu'une fois, puis
+servi depuis la mémoire aux scripts de build, dont le read_file() passe
+par le pool quand il est défini (global `source_pool`). Le décodage est
+celui de build.py : encodage détecté en une passe (build/.encodings.json),
+fins de ligne normalisées comme en lecture texte. Avec un cache de build,
+le pool s'appuie dessus : un fichier inchangé depuis le dernier build
+n'est même pas relu.
+"""
+
+import os
+import threading
+
+from buildtools.parallel import ordered_map
+
+
+class SourcePool:
+    """Contenu décodé de chaque source, lu au premier accès"""
+
+    def __init__(self, build_dir, encoding_cache, build_cache=None):
+        self.build_dir = build_dir
+        self.encoding_cache = encoding_cache
+        self.build_cache = build_cache
+        self.contents = {}
+        self.reads = 0
+        self.hits = 0
+        self._lock = threading.Lock()
+
+    def decode(self, data, path):
+        """Décode le contenu brut d'un fichier (même résultat que build.py)"""
+        content, _encoding = self.encoding_cache.decode(data, path)
+        # Mêmes fins de ligne qu'une lecture en mode texte
+        return content.replace('\r\n', '\n').replace('\r', '\n')
+
+    def read(self, path):
+        """Contenu décodé de `path` (relatif à build_dir), None si le fichier n'existe pas"""
+        content = self.contents.get(path)
+        if content is not None:
+            with self._lock:
+                self.hits += 1
+            return content
+        full_path = os.path.join(self.build_dir, path)
+        if not os.path.exists(full_path):
+            return None
+        if self.build_cache:
+            content = self.build_cache.read(path, self.decode)
+        else:
+            with open(full_path, 'rb') as f:
+                content = self.decode(f.read(), path)
+        with self._lock:
+            self.reads += 1
+            # Lecture concurrente du même fichier : le premier contenu est gardé
+            content = self.contents.setdefault(path, content)
+        return content
+
+    def preload(self, paths, jobs=None):
+        """Lit en parallèle les sources qui ne sont pas encore dans le pool"""
+        ordered_map(self.read, [path for path in dict.fromkeys(paths) if path not in self.contents], jobs)
+
+    def non_utf8(self):
+        """[(chemin, encodage)] des sources décodées ailleurs qu'en UTF-8"""
+        return self.encoding_cache.non_utf8(sorted(self.contents))
+
+    def size(self):
+        """Nombre de caractères en mémoire"""
+        return sum(len(content) for content in self.contents.values())
@@ -0,0 +1,25 @@
+"""
+Tableaux de tailles affichés dans les logs de build.
+"""
+
+
+def percent(before, after):
+    """Gain en pourcentage de `before` à `after`"""
+    if not before:
+        return 0.0
+    return (before - after) * 100.0 / before
+
+
+def log_size_table(rows, log, unit='caracteres'):
+    """
+    Affiche un tableau avant/après à partir de lignes (libellé, avant, après),
+    suivi du total.
+    """
+    width = max([len(label) for label, _, _ in rows] + [len('TOTAL')])
+    log(f"   {'Module':<{width}} {'Avant':>11} {'Apres':>11} {'Gain':>7}")
+    for label, before, after in rows:
+        log(f"   {label:<{width}} {before:>11,} {after:>11,} {percent(before, after):>6.1f}%")
+    total_before = sum(before for _, before, _ in rows)
+    total_after = sum(after for _, _, after in rows)
+    log(f"   {'TOTAL':<{width}} {total_before:>11,} {total_after:>11,} "
+        f"{percent(total_before, total_after):>6.1f}%  ({unit})")
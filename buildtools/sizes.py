@@ -0,0 +1,227 @@
+"""
+Comptabilité des tailles du bundle, par module et par groupe fonctionnel.
+
+Chaque segment du fichier généré (template HTML, feuille CSS, module JS, tel
+qu'il est écrit dans le bundle) est mesuré en octets UTF-8 : taille brute,
+estimation minifiée (jsmin / cssmin) et taille gzip du segment seul. Les
+segments sont regroupés selon les "groups" de build-manifest.json (arc-board,
+synonyms, plotgrid...). Le gzip d'un segment isolé surestime sa part du
+bundle compressé ; le total gzip est celui du fichier généré.
+
+Chaque build ajoute une entrée à build/size-history.json. Le rapport liste
+les modules qui ont le plus grossi depuis le build précédent de la même
+variante et compare les tailles gzip au budget de la variante ("budget"
+dans build-manifest.json) : un dépassement fait échouer le build.
+
+Utilisable seul :  python3 -m buildtools.sizes light
+"""
+
+import argparse
+import json
+import os
+import sys
+import zlib
+from collections import namedtuple
+from datetime import datetime
+
+from buildtools.cssmin import minify as minify_css
+from buildtools.jsmin import minify as minify_js
+
+# Incrémenté à chaque changement des mesures (invalide le cache)
+SIZES_VERSION = 1
+
+HISTORY_FILENAME = 'size-history.json'
+HISTORY_VERSION = 1
+# Builds conservés par variante
+HISTORY_LIMIT = 100
+
+# Nombre de modules affichés dans la liste des plus fortes hausses
+DEFAULT_TOP = 10
+
+MINIFIERS = {'css': minify_css, 'js': minify_js}
+
+# Tailles d'un segment du bundle : octets bruts, minifiés (estimation), gzip
+SegmentSize = namedtuple('SegmentSize', ['path', 'group', 'raw', 'minified', 'gzip'])
+
+
+def gzip_size(data):
+    """Taille gzip (niveau 9) d'un contenu binaire, en-tête compris"""
+    # En-tête et pied gzip : 18 octets autour du flux deflate
+    compressor = zlib.compressobj(9, zlib.DEFLATED, -zlib.MAX_WBITS)
+    return len(compressor.compress(data)) + len(compressor.flush()) + 18
+
+
+def measure(content, kind):
+    """(brut, minifié, gzip) d'un segment `kind` ('html', 'css' ou 'js')"""
+    data = content.encode('utf-8')
+    minifier = MINIFIERS.get(kind)
+    minified = len(minifier(content).encode('utf-8')) if minifier else len(data)
+    return len(data), minified, gzip_size(data)
+
+
+def group_for(path, group_of):
+    """Groupe d'un segment : celui du manifeste, sinon son dossier (js, css, vendor...)"""
+    return group_of(path) or os.path.dirname(path) or path
+
+
+def measure_segments(segments, group_of, derive=None):
+    """
+    SegmentSize de chaque segment (type, chemin, contenu). `group_of(chemin)`
+    donne le groupe du manifeste ; `derive(chemin, contenu, clé, func)`, s'il
+    est fourni, met les mesures en cache.
+    """
+    sizes = []
+    for kind, path, content in segments:
+        func = lambda text, kind=kind: measure(text, kind)
+        key = f'sizes-{SIZES_VERSION}-{kind}'
+        raw, minified, gzipped = derive(path, content, key, func) if derive else func(content)
+        sizes.append(SegmentSize(path, group_for(path, group_of), raw, minified, gzipped))
+    return sizes
+
+
+def group_totals(sizes):
+    """{groupe: [brut, minifié, gzip]} dans l'ordre d'apparition des groupes"""
+    totals = {}
+    for size in sizes:
+        total = totals.setdefault(size.group, [0, 0, 0])
+        total[0] += size.raw
+        total[1] += size.minified
+        total[2] += size.gzip
+    return totals
+
+
+def make_record(variant, output_path, sizes, output_gzip):
+    """Entrée d'historique d'un build"""
+    return {
+        'variant': variant,
+        'output': os.path.basename(output_path),
+        'date': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+        'total': {
+            'raw': sum(size.raw for size in sizes),
+            'minified': sum(size.minified for size in sizes),
+            'gzip': output_gzip,
+        },
+        'groups': group_totals(sizes),
+        'modules': {size.path: [size.raw, size.minified, size.gzip] for size in sizes},
+    }
+
+
+class SizeHistory:
+    """Historique des tailles (build/size-history.json)"""
+
+    def __init__(self, build_dir):
+        self.path = os.path.join(build_dir, 'build', HISTORY_FILENAME)
+        self.builds = []
+
+    def load(self):
+        """Charge l'historique existant (ignoré s'il est absent ou invalide)"""
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return self
+        if isinstance(data, dict) and data.get('version') == HISTORY_VERSION:
+            self.builds = data.get('builds', [])
+        return self
+
+    def last(self, variant):
+        """Dernière entrée de la variante, ou None"""
+        for record in reversed(self.builds):
+            if record.get('variant') == variant:
+                return record
+        return None
+
+    def append(self, record):
+        """Ajoute un build, en ne gardant que les HISTORY_LIMIT derniers de sa variante"""
+        self.builds.append(record)
+        same = [i for i, other in enumerate(self.builds) if other.get('variant') == record['variant']]
+        dropped = set(same[:-HISTORY_LIMIT])
+        if dropped:
+            self.builds = [other for i, other in enumerate(self.builds) if i not in dropped]
+
+    def save(self):
+        """Écrit l'historique (écriture atomique)"""
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        tmp_path = self.path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'version': HISTORY_VERSION, 'builds': self.builds}, f, ensure_ascii=False, indent=1)
+        os.replace(tmp_path, self.path)
+
+
+def growth(previous, current, top=DEFAULT_TOP):
+    """
+    Modules qui ont le plus grossi (gzip) de `previous` à `current` :
+    [(chemin, avant, après)], nouveaux modules compris (avant = 0).
+    """
+    before = previous['modules'] if previous else {}
+    grown = []
+    for path, sizes in current['modules'].items():
+        old = before.get(path, [0, 0, 0])[2]
+        if sizes[2] > old:
+            grown.append((path, old, sizes[2]))
+    grown.sort(key=lambda item: item[2] - item[1], reverse=True)
+    return grown[:top]
+
+
+def check_budget(budget, record):
+    """Dépassements du budget gzip : [(nom, taille, limite)] ("total" ou un groupe)"""
+    overruns = []
+    for name, limit in budget.items():
+        size = record['total']['gzip'] if name == 'total' else record['groups'].get(name, [0, 0, 0])[2]
+        if size > limit:
+            overruns.append((name, size, limit))
+    return overruns
+
+
+def log_size_report(record, previous, budget, log, top=DEFAULT_TOP):
+    """Affiche les tailles par groupe, les plus fortes hausses et l'état du budget"""
+    groups = sorted(record['groups'].items(), key=lambda item: item[1][2], reverse=True)
+    width = max([len(name) for name in record['groups']] + [len('TOTAL')])
+    log(f"   {'Groupe':<{width}} {'Brut':>11} {'Minifie':>11} {'Gzip':>11}")
+    for name, (raw, minified, gzipped) in groups:
+        log(f"   {name:<{width}} {raw:>11,} {minified:>11,} {gzipped:>11,}")
+    total = record['total']
+    log(f"   {'TOTAL':<{width}} {total['raw']:>11,} {total['minified']:>11,} {total['gzip']:>11,}  (octets)")
+
+    if previous:
+        delta = total['gzip'] - previous['total']['gzip']
+        log(f"   [i] Gzip: {delta:+,} octets depuis le build du {previous['date']}")
+        grown = growth(previous, record, top)
+        if grown:
+            log(f"   [i] Plus fortes hausses (gzip):")
+            for path, before, after in grown:
+                log(f"      + {path}: {before:,} -> {after:,} ({after - before:+,})")
+
+    overruns = check_budget(budget, record)
+    for name, size, limit in overruns:
+        log(f"   [ERREUR] Budget depasse: {name} {size:,} octets gzip (limite {limit:,})")
+    if budget and not overruns:
+        log(f"   [OK] Budget respecte ({len(budget)} limites)")
+    return overruns
+
+
+def main(argv=None):
+    from buildtools.manifest import load as load_manifest
+
+    parser = argparse.ArgumentParser(description="Historique des tailles d'une variante")
+    parser.add_argument('variant', nargs='?', default='light')
+    parser.add_argument('--top', type=int, default=DEFAULT_TOP,
+                        help="nombre de modules affiches dans les hausses")
+    args = parser.parse_args(argv)
+
+    build_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    records = [record for record in SizeHistory(build_dir).load().builds if record.get('variant') == args.variant]
+    if not records:
+        print(f"[!] Aucun build {args.variant} dans build/{HISTORY_FILENAME} (option --size-report)")
+        return 1
+    for record in records[-10:]:
+        total = record['total']
+        print(f"   {record['date']}  {record['output']:<40} {total['raw']:>11,} {total['gzip']:>11,}")
+    previous = records[-2] if len(records) > 1 else None
+    overruns = log_size_report(records[-1], previous, load_manifest(build_dir).budget(args.variant),
+                               print, args.top)
+    return 1 if overruns else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,114 @@
+"""
+Synchronisation incrémentale d'un arbre de fichiers (déploiement vers /live).
+
+Le manifeste build/.deploy-manifest.json mémorise, pour chaque fichier
+déployé, la taille et la date de modification du source et de la copie.
+Un fichier dont aucune des deux n'a bougé depuis le dernier déploiement
+n'est pas recopié. En mode --checksum, les contenus sont comparés par hash
+(utile après un checkout qui modifie les dates sans changer les fichiers).
+"""
+
+import hashlib
+import json
+import os
+import threading
+
+MANIFEST_FILENAME = '.deploy-manifest.json'
+
+
+def file_state(path):
+    """Retourne [taille, date de modification en ns] de `path`"""
+    stat = os.stat(path)
+    return [stat.st_size, stat.st_mtime_ns]
+
+
+def file_hash(path):
+    """Hash SHA-256 (hex) du contenu de `path`, lu par blocs"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class DeployManifest:
+    """État des fichiers copiés lors du dernier déploiement"""
+
+    def __init__(self, build_dir):
+        self.path = os.path.join(build_dir, 'build', MANIFEST_FILENAME)
+        self.entries = {}
+        self.dirty = False
+        self._lock = threading.Lock()
+
+    def load(self):
+        """Charge le manifeste (ignoré s'il est absent ou invalide)"""
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                self.entries = json.load(f)
+        except (OSError, ValueError):
+            self.entries = {}
+        return self
+
+    def save(self):
+        """Écrit le manifeste s'il a changé"""
+        if not self.dirty:
+            return
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        tmp_path = self.path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.entries, f, indent=1, sort_keys=True)
+        os.replace(tmp_path, self.path)
+        self.dirty = False
+
+    def is_current(self, path, src_path, dest_path, checksum=False):
+        """Vrai si `dest_path` est déjà une copie à jour de `src_path`"""
+        try:
+            dest = file_state(dest_path)
+        except OSError:
+            return False
+        src = file_state(src_path)
+        if src[0] != dest[0]:
+            return False
+        if checksum:
+            return file_hash(src_path) == file_hash(dest_path)
+        entry = self.entries.get(path)
+        if entry:
+            return entry['src'] == src and entry['dest'] == dest
+        # Pas d'entrée : copy2 conserve la date, une copie identique a la même
+        return src[1] == dest[1]
+
+    def record(self, path, src_path, dest_path):
+        """Mémorise l'état d'un fichier à jour"""
+        entry = {'src': file_state(src_path), 'dest': file_state(dest_path)}
+        with self._lock:
+            if self.entries.get(path) != entry:
+                self.entries[path] = entry
+                self.dirty = True
+
+    def forget(self, path):
+        """Oublie un fichier supprimé de la destination"""
+        with self._lock:
+            if self.entries.pop(path, None) is not None:
+                self.dirty = True
+
+
+def stale_files(root, keep):
+    """Fichiers de `root` (chemins relatifs, séparateur '/') absents de `keep`"""
+    stale = []
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames.sort()
+        for filename in sorted(filenames):
+            path = os.path.relpath(os.path.join(dirpath, filename), root).replace(os.sep, '/')
+            if path not in keep:
+                stale.append(path)
+    return stale
+
+
+def remove_empty_dirs(root):
+    """Supprime les sous-répertoires vides de `root`, retourne leur nombre"""
+    removed = 0
+    for dirpath, dirnames, filenames in os.walk(root, topdown=False):
+        if dirpath != root and not os.listdir(dirpath):
+            os.rmdir(dirpath)
+            removed += 1
+    return removed
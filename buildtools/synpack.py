@@ -0,0 +1,215 @@
+"""
+Compactage du dictionnaire de synonymes (synonyms.dictionary.js).
+
+Le littéral objet `const FrenchSynonymsDictionary = {...}` est relu au
+build et remplacé par :
+- une table de mots unique (chaque mot n'apparaît qu'une fois), triée et
+  codée par préfixe commun avec le mot précédent ;
+- les entrées sous forme d'indices dans cette table.
+Le tout tient dans une seule chaîne JSON, décodée au premier accès au
+dictionnaire : au démarrage le navigateur ne compile qu'un littéral chaîne.
+FrenchSynonymsDictionary devient un Proxy qui se comporte comme l'objet
+d'origine (lecture, `in`, Object.keys/entries/values). L'index inverse
+synonyme -> mots vedettes n'est pas embarqué (+50 % en gzip) : le JS le
+construit à la première recherche depuis la table décodée.
+
+Utilisable seul :  python3 -m buildtools.synpack js-refactor/synonyms/synonyms.dictionary.js
+"""
+
+import json
+import re
+import sys
+
+from buildtools.jstokens import tokenize, significant, NAME, PUNCT, STRING
+from buildtools.sizes import gzip_size
+
+# Incrémenté à chaque changement du format produit (invalide le cache)
+SYNPACK_VERSION = 2
+
+DICTIONARY_NAME = 'FrenchSynonymsDictionary'
+PACKED_NAME = 'FrenchSynonymsPacked'
+
+WORD_SEPARATOR = '|'
+# Longueur du préfixe commun codée sur un caractère (0-9, a-z)
+PREFIX_DIGITS = '0123456789abcdefghijklmnopqrstuvwxyz'
+
+ESCAPE_RE = re.compile(r'\\(u\{[0-9a-fA-F]+\}|u[0-9a-fA-F]{4}|x[0-9a-fA-F]{2}|\r\n|.)', re.S)
+SIMPLE_ESCAPES = {'n': '\n', 't': '\t', 'r': '\r', 'b': '\b', 'f': '\f', 'v': '\v', '0': '\0'}
+
+RUNTIME_SOURCE = '''const %(packed)s = (function (packed) {
+    let data = null;
+    function load() {
+        if (data) return data;
+        const raw = JSON.parse(packed);
+        const words = [];
+        let previous = '';
+        for (const item of raw.words.split('%(separator)s')) {
+            previous = previous.slice(0, parseInt(item[0], 36)) + item.slice(1);
+            words.push(previous);
+        }
+        const dictionary = {};
+        for (const entry of raw.entries) {
+            const value = {};
+            raw.fields.forEach((field, i) => {
+                if (entry[i + 1] !== 0) value[field] = entry[i + 1].map(index => words[index]);
+            });
+            dictionary[words[entry[0]]] = value;
+        }
+        data = { words, dictionary };
+        return data;
+    }
+    return {
+        dictionary: new Proxy({}, {
+            get: (_target, key) => load().dictionary[key],
+            has: (_target, key) => key in load().dictionary,
+            ownKeys: () => Reflect.ownKeys(load().dictionary),
+            getOwnPropertyDescriptor: (_target, key) => Object.getOwnPropertyDescriptor(load().dictionary, key)
+        })
+    };
+})(%(blob)s);
+const %(name)s = %(packed)s.dictionary;'''
+
+
+def js_string_value(literal):
+    """Valeur d'un littéral chaîne JavaScript ('...' ou "...")"""
+    def unescape(match):
+        escape = match.group(1)
+        if escape[0] == 'u':
+            return chr(int(escape.strip('u{}'), 16))
+        if escape[0] == 'x':
+            return chr(int(escape[1:], 16))
+        if escape in ('\n', '\r\n', '\r', '\u2028', '\u2029'):
+            return ''
+        return SIMPLE_ESCAPES.get(escape, escape)
+    return ESCAPE_RE.sub(unescape, literal[1:-1])
+
+
+def _expect(tokens, i, text):
+    if i >= len(tokens) or tokens[i][1] != text:
+        found = tokens[i][1] if i < len(tokens) else 'fin du fichier'
+        raise ValueError(f"'{text}' attendu, '{found}' trouve")
+    return i + 1
+
+
+def _parse_key(token):
+    kind, text, _pos = token
+    if kind == STRING:
+        return js_string_value(text)
+    if kind == NAME:
+        return text
+    raise ValueError(f"cle invalide: {text}")
+
+
+def parse_dictionary(src, name=DICTIONARY_NAME):
+    """
+    Relève le littéral `const name = {...};` de `src`.
+    Retourne (début, fin, entrées) avec entrées = {mot: {champ: [mots]}}.
+    """
+    tokens = significant(tokenize(src))
+    for i in range(len(tokens) - 3):
+        if tokens[i][1] == 'const' and tokens[i + 1][1] == name and tokens[i + 2][1] == '=':
+            break
+    else:
+        raise ValueError(f"const {name} introuvable")
+    start = tokens[i][2]
+    i = _expect(tokens, i + 3, '{')
+
+    entries = {}
+    while tokens[i][1] != '}':
+        key = _parse_key(tokens[i])
+        i = _expect(tokens, i + 1, ':')
+        i = _expect(tokens, i, '{')
+        value = {}
+        while tokens[i][1] != '}':
+            field = _parse_key(tokens[i])
+            i = _expect(tokens, i + 1, ':')
+            i = _expect(tokens, i, '[')
+            words = []
+            while tokens[i][1] != ']':
+                if tokens[i][0] != STRING:
+                    raise ValueError(f"{key}.{field}: chaine attendue, '{tokens[i][1]}' trouve")
+                words.append(js_string_value(tokens[i][1]))
+                i += 1
+                if tokens[i][1] == ',':
+                    i += 1
+            value[field] = words
+            i += 1
+            if tokens[i][1] == ',':
+                i += 1
+        # Clé en double : la dernière valeur l'emporte, à la place de la première
+        entries[key] = value
+        i += 1
+        if tokens[i][1] == ',':
+            i += 1
+    end = tokens[i][2] + 1
+    if i + 1 < len(tokens) and tokens[i + 1][0] == PUNCT and tokens[i + 1][1] == ';':
+        end = tokens[i + 1][2] + 1
+    return start, end, entries
+
+
+def front_code(words):
+    """Code une liste triée : chaque mot garde le préfixe commun avec le précédent"""
+    coded = []
+    previous = ''
+    limit = len(PREFIX_DIGITS) - 1
+    for word in words:
+        common = 0
+        while common < min(len(word), len(previous), limit) and word[common] == previous[common]:
+            common += 1
+        coded.append(PREFIX_DIGITS[common] + word[common:])
+        previous = word
+    return WORD_SEPARATOR.join(coded)
+
+
+def pack(entries):
+    """Forme compacte (dict sérialisable en JSON) des entrées du dictionnaire"""
+    fields = list(dict.fromkeys(field for value in entries.values() for field in value))
+    words = set(entries)
+    for value in entries.values():
+        for field_words in value.values():
+            words.update(field_words)
+    if any(WORD_SEPARATOR in word for word in words):
+        raise ValueError(f"un mot contient le separateur '{WORD_SEPARATOR}'")
+    table = sorted(words)
+    index = {word: i for i, word in enumerate(table)}
+
+    packed_entries = []
+    for key, value in entries.items():
+        packed_entries.append([index[key]] + [
+            [index[word] for word in value[field]] if field in value else 0 for field in fields
+        ])
+    return {'words': front_code(table), 'fields': fields, 'entries': packed_entries}
+
+
+def pack_source(src):
+    """Remplace le littéral du dictionnaire de `src` par sa forme compacte"""
+    start, end, entries = parse_dictionary(src)
+    blob = json.dumps(pack(entries), ensure_ascii=False, separators=(',', ':'))
+    runtime = RUNTIME_SOURCE % {
+        'packed': PACKED_NAME,
+        'name': DICTIONARY_NAME,
+        'separator': WORD_SEPARATOR,
+        # Chaîne JS : JSON.parse est plus rapide à compiler qu'un littéral objet
+        'blob': json.dumps(blob, ensure_ascii=False).replace('</', '<\\/'),
+    }
+    return src[:start] + runtime + src[end:]
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    if len(argv) != 1:
+        print("Usage: python3 -m buildtools.synpack chemin/synonyms.dictionary.js", file=sys.stderr)
+        return 2
+    with open(argv[0], 'r', encoding='utf-8') as f:
+        src = f.read()
+    _start, _end, entries = parse_dictionary(src)
+    packed = pack_source(src)
+    words = len(pack(entries)['words'].split(WORD_SEPARATOR))
+    print(f"[OK] {len(entries)} entrees, {words} mots distincts")
+    print(f"   Source: {len(src):,} caracteres -> {len(packed):,} caracteres")
+    print(f"   Gzip: {gzip_size(src.encode('utf-8')):,} -> {gzip_size(packed.encode('utf-8')):,} octets")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,344 @@
+"""
+Modales différées dans des éléments <template> (--defer-modals).
+
+Les conteneurs listés dans build-manifest.json ("defer", par variante, mêmes
+sélecteurs que "features") sont enveloppés au build dans un
+<template id="plume-view-ID"> : le navigateur en analyse le HTML mais ne
+crée ni nœuds, ni styles, ni écouteurs tant que la modale n'est pas ouverte.
+
+Le JavaScript instancie une modale avant d'y toucher en appelant
+plumeMountView('addCodexModal') (fonctions d'ouverture, openModal) : le
+template est remplacé par son contenu à sa place d'origine, puis les icônes
+Lucide de la modale sont créées. Hors --defer-modals la fonction n'existe pas,
+d'où l'appel gardé : if (typeof plumeMountView === 'function') ...
+
+Un conteneur n'est différé que si c'est sans risque :
+- il a un id et ne contient ni <script> ni autre conteneur différé ;
+- le JavaScript l'instancie : plumeMountView('ID') y est appelé en toutes
+  lettres (une modale lue au démarrage, sans appel, reste dans le DOM) ;
+- aucune recherche globale du JavaScript (document.querySelector[All],
+  getElementsByClassName...) ne peut atteindre un de ses éléments par id,
+  classe, attribut ou balise : elles ne trouveraient rien dans le template.
+Sinon il reste dans le DOM et le rapport en donne la raison.
+
+Utilisable seul :  python3 -m buildtools.templates light
+"""
+
+import argparse
+import bisect
+import functools
+import os
+import re
+import sys
+from collections import namedtuple
+
+from buildtools.htmlstrip import END, START, VOID_ELEMENTS, Stripper, iter_tokens, parse_attributes
+
+TEMPLATE_ID_PREFIX = 'plume-view-'
+
+# Vue différée : id du conteneur, sélecteur du manifeste, position dans le
+# HTML, ids contenus, nombre d'éléments, raisons de la garder dans le DOM
+View = namedtuple('View', ['id', 'selector', 'start', 'end', 'ids', 'elements', 'blockers'])
+
+# Recherches globales qui ne passent pas par getElementById
+QUERY_RE = re.compile(
+    r'document(?:\.body|\.documentElement)?\s*\.\s*'
+    r'(querySelectorAll|querySelector|getElementsByClassName|getElementsByTagName|getElementsByName)'
+    r'''\(\s*(['"`])((?:\\.|(?!\2).)*)\2''', re.S)
+# Recherches par sélecteur depuis n'importe quel élément (el.querySelector, el.closest...)
+SCOPED_QUERY_RE = re.compile(
+    r'([\w$]*)\s*\.\s*(querySelectorAll|querySelector|closest|matches|getElementsByClassName|getElementsByTagName|getElementsByName)'
+    r'''\(\s*(['"`])((?:\\.|(?!\3).)*)\3''', re.S)
+# Déclaration d'une variable, et valeurs qui sont des éléments hors du document
+DECLARATION_RE = re.compile(r'\b(?:const|let|var)\s+([\w$]+)\s*=\s*')
+DETACHED_RE = re.compile(r'document\.createElement\(|[\w$.]+\.cloneNode\(')
+# Dernier composé d'un sélecteur CSS : balise, puis #id, .classe, [attribut], :pseudo
+COMPOUND_PART_RE = re.compile(
+    r'#([\w-]+)|\.([\w-]+)|\[\s*([\w-]+)\s*(?:([~|^$*]?=)\s*(?:"([^"]*)"|\'([^\']*)\'|([^\]\s]*))\s*)?(?:[is]\s*)?\]'
+    r'|::?[\w-]+(?:\([^)]*\))?')
+COMPOUND_TAG_RE = re.compile(r'^([a-zA-Z][\w-]*|\*)')
+COMBINATOR_RE = re.compile(r'\s*[>+~]\s*|\s+(?![^\[]*\])')
+DYNAMIC_RE = re.compile(r'\$\{[^}]*\}')
+
+# Élément d'une vue : balise, attributs et ancêtres (jusqu'à la racine du
+# document), pour tester les recherches globales
+Element = namedtuple('Element', ['tag', 'attributes', 'ancestors'])
+
+# Instanciation d'une modale différée, appelée par le JavaScript avant d'y toucher
+RUNTIME_SOURCE = '''function plumeMountView(id) {
+    var template = document.getElementById('%(prefix)s' + id);
+    if (!template) return false;
+    template.parentNode.replaceChild(template.content, template);
+    if (typeof lucide !== 'undefined' && lucide.createIcons) lucide.createIcons();
+    return true;
+}'''
+# Appel explicite plumeMountView('id') dans le JavaScript
+MOUNT_RE = re.compile(r'''plumeMountView\(\s*(['"])([\w-]+)\1\s*\)''')
+
+
+def _element_end(tokens, index):
+    """Index du token fermant l'élément ouvert en tokens[index], None s'il n'est pas fermé"""
+    stack = []
+    for i in range(index, len(tokens)):
+        token = tokens[i]
+        if token.kind == START and token.name not in VOID_ELEMENTS and not token.selfclose:
+            stack.append(token.name)
+        elif token.kind == END and token.name in stack:
+            while stack.pop() != token.name:
+                pass
+            if not stack:
+                return i
+    return None
+
+
+def element_tree(tokens):
+    """{index du token ouvrant: Element} pour tout le document"""
+    elements = {}
+    stack = []
+    for index, token in enumerate(tokens):
+        if token.kind == START:
+            element = Element(token.name, parse_attributes(token.attrs), tuple(stack))
+            elements[index] = element
+            if token.name not in VOID_ELEMENTS and not token.selfclose:
+                stack.append(element)
+        elif token.kind == END and any(element.tag == token.name for element in stack):
+            while stack.pop().tag != token.name:
+                pass
+    return elements
+
+
+def query_calls(js, scoped=False):
+    """
+    [(méthode, texte)] des recherches du JavaScript : sur document seulement,
+    ou avec `scoped` depuis n'importe quel élément (querySelector, closest...).
+    Une recherche dans une variable déclarée (au plus près avant elle) comme
+    un élément créé en JavaScript (document.createElement, cloneNode) ne
+    peut rien renvoyer du document et n'est pas retenue.
+    """
+    if not scoped:
+        return [(match.group(1), match.group(3)) for match in QUERY_RE.finditer(js)]
+    declarations = {}
+    for match in DECLARATION_RE.finditer(js):
+        detached = bool(DETACHED_RE.match(js, match.end()))
+        declarations.setdefault(match.group(1), ([], []))
+        declarations[match.group(1)][0].append(match.start())
+        declarations[match.group(1)][1].append(detached)
+    calls = []
+    for match in SCOPED_QUERY_RE.finditer(js):
+        positions, detached = declarations.get(match.group(1), ((), ()))
+        index = bisect.bisect(positions, match.start()) - 1
+        if index >= 0 and detached[index]:
+            continue
+        calls.append((match.group(2), match.group(4)))
+    return calls
+
+
+def _attribute_matches(value, operator, expected):
+    """Vrai si la valeur d'attribut `value` peut satisfaire [nom operator expected]"""
+    if value is None:
+        return False
+    if operator is None or expected is None:
+        return True
+    if operator == '=':
+        return value == expected
+    if operator == '^=':
+        return value.startswith(expected)
+    if operator == '$=':
+        return value.endswith(expected)
+    if operator == '*=':
+        return expected in value
+    if operator == '~=':
+        return expected in value.split()
+    return value == expected or value.startswith(expected + '-')
+
+
+@functools.lru_cache(maxsize=None)
+def _compound(compound):
+    """Composé analysé : (balise ou None, [(id, classe, attribut, opérateur, valeur attendue)])"""
+    tag = COMPOUND_TAG_RE.match(compound)
+    tag = tag.group(1).lower() if tag and tag.group(1) != '*' else None
+    parts = []
+    for match in COMPOUND_PART_RE.finditer(compound):
+        element_id, class_name, name, operator = match.group(1, 2, 3, 4)
+        expected = next((v for v in match.group(5, 6, 7) if v is not None), None)
+        if name and expected is not None and DYNAMIC_RE.search(expected):
+            expected = DYNAMIC_RE.split(expected)[0]
+            operator = '^=' if operator == '=' else operator
+        if element_id or class_name or name:
+            parts.append((element_id, class_name, name and name.lower(), operator, expected))
+    return tag, parts
+
+
+def _compound_matches(compound, element):
+    """
+    Vrai si l'élément peut correspondre au composé : les parties dynamiques
+    (${...}) et les pseudo-classes sont supposées vraies.
+    """
+    tag, parts = _compound(compound)
+    if tag and tag != element.tag:
+        return False
+    attributes = element.attributes
+    for element_id, class_name, name, operator, expected in parts:
+        if element_id and attributes.get('id') != element_id:
+            return False
+        if class_name and class_name not in attributes.get('class', '').split():
+            return False
+        if name and not _attribute_matches(attributes.get(name), operator, expected):
+            return False
+    return True
+
+
+@functools.lru_cache(maxsize=None)
+def _selectors(method, query):
+    """Sélecteurs d'une recherche : [(dernier composé, composés des ancêtres)]"""
+    if DYNAMIC_RE.fullmatch(query.strip()):
+        return ()
+    if method == 'getElementsByClassName':
+        selectors = ['.' + '.'.join(query.split())]
+    elif method == 'getElementsByTagName':
+        selectors = [query]
+    elif method == 'getElementsByName':
+        selectors = [f'[name="{query}"]']
+    else:
+        selectors = query.split(',')
+    result = []
+    for selector in selectors:
+        selector = selector.strip()
+        compounds = [part for part in COMBINATOR_RE.split(selector) if part]
+        if not compounds:
+            continue
+        # Combinateurs descendants : chaque composé précédent doit pouvoir
+        # désigner un ancêtre ; avec + ou ~ seul le dernier est testé
+        ancestors = compounds[:-1] if not re.search(r'[+~](?![^\[]*\])', selector) else []
+        result.append((compounds[-1], tuple(ancestors)))
+    return tuple(result)
+
+
+def reaches(method, query, element):
+    """Vrai si la recherche `method(query)` peut renvoyer l'élément"""
+    return any(_compound_matches(last, element)
+               and all(any(_compound_matches(compound, ancestor) for ancestor in element.ancestors)
+                       for compound in ancestors)
+               for last, ancestors in _selectors(method, query))
+
+
+def _reached(method, query, elements):
+    """Premier élément de la vue qu'une recherche peut atteindre, décrit en texte, ou None"""
+    for element in elements:
+        if reaches(method, query, element):
+            element_id = element.attributes.get('id')
+            return f"<{element.tag}{' id=' + element_id if element_id else ''}>"
+    return None
+
+
+def plan_views(html, selectors, sources=()):
+    """
+    Repère les conteneurs désignés par `selectors` et les recherches du
+    JavaScript qui les atteindraient ; `sources` (modules ou lignes du
+    bundle) est analysé morceau par morceau. Retourne une liste de View.
+    """
+    tokens = list(iter_tokens(html))
+    document = element_tree(tokens)
+    stripper = Stripper(selectors)
+    queries = []
+    mounted = set()
+    for js in sources:
+        queries.extend(query_calls(js))
+        mounted.update(match.group(2) for match in MOUNT_RE.finditer(js))
+    views = []
+    for index, token in enumerate(tokens):
+        if token.kind != START:
+            continue
+        selector = stripper.match(token.name, token.attrs)
+        if not selector:
+            continue
+        attributes = parse_attributes(token.attrs)
+        end = _element_end(tokens, index)
+        if end is None or not attributes.get('id'):
+            views.append(View(attributes.get('id') or selector.text, selector.text, token.start, token.end,
+                              [], 0, ["conteneur sans id ou non ferme"]))
+            continue
+        elements = [document[i] for i in range(index, end + 1) if i in document]
+        ids = [element.attributes['id'] for element in elements if element.attributes.get('id')]
+        blockers = [f"contient un element <{element.tag}>" for element in elements
+                    if element.tag in ('script', 'template')]
+        if attributes['id'] not in mounted:
+            blockers.append(f"aucun appel plumeMountView('{attributes['id']}') dans le JS")
+        for method, query in queries:
+            reached = _reached(method, query, elements)
+            if reached:
+                blockers.append(f"{reached} atteint par document.{method}('{query}')")
+        views.append(View(attributes['id'], selector.text, token.start, tokens[end].end, ids,
+                          len(elements), blockers))
+    # Conteneurs imbriqués : seul le plus externe peut être différé
+    for i, view in enumerate(views):
+        outer = next((other for other in views if other is not view and other.start < view.start < other.end), None)
+        if outer:
+            views[i] = view._replace(blockers=view.blockers + [f"contenu dans #{outer.id}"])
+    return views
+
+
+def defer_views(html, views):
+    """Enveloppe chaque vue sans raison bloquante dans un <template>"""
+    parts = []
+    copied = 0
+    for view in sorted(views, key=lambda view: view.start):
+        if view.blockers:
+            continue
+        parts.append(html[copied:view.start])
+        parts.append(f'<template id="{TEMPLATE_ID_PREFIX}{view.id}">')
+        parts.append(html[view.start:view.end])
+        parts.append('</template>')
+        copied = view.end
+    parts.append(html[copied:])
+    return ''.join(parts)
+
+
+def runtime_source():
+    """Source du runtime : plumeMountView(id)"""
+    return RUNTIME_SOURCE % {'prefix': TEMPLATE_ID_PREFIX}
+
+
+def log_views_report(views, log):
+    """Affiche les vues différées et celles gardées dans le DOM, avec la raison"""
+    deferred = [view for view in views if not view.blockers]
+    for view in deferred:
+        log(f"   [OK] #{view.id}: {view.elements} elements differes, {len(view.ids)} ids")
+    for view in views:
+        if view.blockers:
+            log(f"   [!] {view.selector} garde dans le DOM: {view.blockers[0]}"
+                + (f" (+{len(view.blockers) - 1})" if len(view.blockers) > 1 else ''))
+    total = sum(view.elements for view in deferred)
+    log(f"   [OK] {len(deferred)}/{len(views)} modales differees, {total} elements en moins au demarrage")
+
+
+def main(argv=None):
+    from buildtools.manifest import load as load_manifest
+
+    parser = argparse.ArgumentParser(description="Modales differees dans des <template> pour une variante")
+    parser.add_argument('variant', help="variante du manifeste (ex: light)")
+    parser.add_argument('path', nargs='?', default='html/body.html', help="fichier HTML (defaut: html/body.html)")
+    parser.add_argument('--selector', action='append', default=[],
+                        help="conteneur a analyser en plus de ceux du manifeste (ex: div#backupModal)")
+    args = parser.parse_args(argv)
+
+    build_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    manifest = load_manifest(build_dir)
+    selectors = manifest.deferred_views(args.variant) + args.selector
+    if not selectors:
+        print(f"[i] Aucune modale differee pour '{args.variant}'")
+        return 0
+    sources = []
+    for path, _ in manifest.resolve(args.variant, 'js').entries:
+        with open(os.path.join(build_dir, path), 'r', encoding='utf-8') as f:
+            sources.append(f.read())
+    with open(os.path.join(build_dir, args.path), 'r', encoding='utf-8') as f:
+        html = f.read()
+    views = plan_views(html, selectors, sources)
+    log_views_report(views, print)
+    print(f"[OK] Runtime: {len(runtime_source()):,} caracteres")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,130 @@
+"""
+Précompilation des mots de tension (mots de tension/*.txt).
+
+Les listes sources (un fichier par niveau, mots séparés par des virgules)
+sont normalisées comme le fait TensionModel.tokenize au navigateur
+(minuscules, sans accents, découpage en mots) puis compilées en trie. Le
+trie est injecté dans le bundle sous forme de TensionModel.PRECOMPILED_MATCHER :
+le premier calcul de tension n'a plus à le construire.
+
+Les index du trie désignent les entrées de TensionModel.DEFAULT_TENSION_WORDS :
+le trie n'est produit que si les listes .txt sont identiques aux listes par
+défaut du modèle.
+
+Utilisable seul :  python3 -m buildtools.tension
+"""
+
+import json
+import os
+import re
+import sys
+import unicodedata
+
+from buildtools.jstokens import tokenize as tokenize_js, significant, STRING
+
+# Incrémenté à chaque changement du format produit (invalide le cache)
+TENSION_VERSION = 1
+
+WORDS_DIR = 'mots de tension'
+MODEL_PATH = 'js-refactor/tension/tension.model.js'
+
+# Niveau -> fichier source, dans l'ordre de TensionModel.TENSION_WEIGHTS
+LEVEL_FILES = {
+    'high': 'Haute_tension.txt',
+    'medium': 'Moyenne_tension.txt',
+    'low': 'Basse_tension.txt',
+}
+
+COMBINING_RE = re.compile('[\u0300-\u036f]')
+# Équivalent de /[\p{L}\p{N}]+/u
+TOKEN_RE = re.compile(r'[^\W_]+')
+
+
+def tokenize(text):
+    """Mots normalisés d'un texte, comme TensionModel.tokenize"""
+    text = unicodedata.normalize('NFD', text.lower())
+    return TOKEN_RE.findall(COMBINING_RE.sub('', text))
+
+
+def parse_list(text):
+    """Entrées d'un fichier de mots (séparées par des virgules)"""
+    return [word.strip() for word in text.split(',')]
+
+
+def list_paths():
+    """{niveau: chemin relatif du fichier source}"""
+    return {level: f'{WORDS_DIR}/{filename}' for level, filename in LEVEL_FILES.items()}
+
+
+def read_lists(build_dir):
+    """Listes de mots par niveau, lues dans mots de tension/*.txt"""
+    lists = {}
+    for level, path in list_paths().items():
+        with open(os.path.join(build_dir, path), 'r', encoding='utf-8') as f:
+            lists[level] = parse_list(f.read())
+    return lists
+
+
+def default_lists(model_src):
+    """Listes de DEFAULT_TENSION_WORDS relevées dans le source du modèle"""
+    from buildtools.synpack import js_string_value
+
+    tokens = significant(tokenize_js(model_src))
+    lists = {}
+    for i, (_kind, text, _pos) in enumerate(tokens):
+        if text in LEVEL_FILES and i + 2 < len(tokens) and tokens[i + 1][1] == ':' and tokens[i + 2][1] == '[':
+            words = []
+            j = i + 3
+            while tokens[j][1] != ']':
+                if tokens[j][0] == STRING:
+                    words.append(js_string_value(tokens[j][1]))
+                j += 1
+            lists.setdefault(text, words)
+    return lists
+
+
+def compile_matcher(lists):
+    """Trie des listes : {mot: nœud}, '$' = [[niveau, index]] des entrées terminées"""
+    root = {}
+    for level in LEVEL_FILES:
+        for index, word in enumerate(lists.get(level, [])):
+            tokens = tokenize(word) if word else []
+            if not tokens:
+                continue
+            node = root
+            for token in tokens:
+                node = node.setdefault(token, {})
+            node.setdefault('$', []).append([level, index])
+    return root
+
+
+def matcher_source(lists):
+    """Segment JS qui fournit le trie précompilé au modèle de tension"""
+    blob = json.dumps(compile_matcher(lists), ensure_ascii=False, separators=(',', ':'))
+    return ('// Trie des mots de tension par defaut, genere au build depuis mots de tension/*.txt\n'
+            f'TensionModel.PRECOMPILED_MATCHER = JSON.parse({json.dumps(blob, ensure_ascii=False)});')
+
+
+def check_lists(lists, model_src):
+    """Niveaux dont la liste .txt diffère des listes par défaut du modèle"""
+    defaults = default_lists(model_src)
+    return [level for level in LEVEL_FILES if lists.get(level) != defaults.get(level)]
+
+
+def main(argv=None):
+    build_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    lists = read_lists(build_dir)
+    with open(os.path.join(build_dir, MODEL_PATH), 'r', encoding='utf-8') as f:
+        mismatched = check_lists(lists, f.read())
+    for level in LEVEL_FILES:
+        phrases = sum(1 for word in lists[level] if len(tokenize(word)) > 1)
+        print(f"   {level}: {len(lists[level])} entrees dont {phrases} expressions")
+    if mismatched:
+        print(f"[!] Listes differentes de {MODEL_PATH}: {', '.join(mismatched)}")
+        return 1
+    print(f"[OK] Trie precompile: {len(matcher_source(lists)):,} caracteres")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,269 @@
+"""
+Élimination des fonctions JavaScript inatteignables (tree-shaking).
+
+Les modules partagent la portée globale du bundle : une déclaration
+`function nom() {...}` de premier niveau peut être appelée depuis n'importe
+quel module, depuis un attribut onclick="..." du HTML, ou depuis un
+gestionnaire écrit dans une chaîne (`onclick="${...}nom()"` dans un
+template). Une fonction n'est retirée que si son nom n'apparaît dans aucun
+de ces endroits atteignables.
+
+Racines du parcours :
+- tout le code hors déclarations de fonctions (premier niveau, IIFE,
+  classes, initialiseurs const/let/var...) : exécuté ou conservé tel quel ;
+- les fonctions des modules déclarés racines (initialiseurs *.main.js...) ;
+- les identifiants des attributs on*="..." du HTML.
+Les références comptées sont les identifiants, les propriétés de window /
+globalThis / self et les mots des chaînes et templates (appels construits
+dans du HTML généré). L'analyse est volontairement prudente : un nom
+homonyme suffit à garder une fonction.
+
+Utilisable seul :  python3 -m buildtools.treeshake light
+"""
+
+import argparse
+import os
+import re
+import sys
+from collections import namedtuple
+
+from buildtools.jstokens import tokenize, NAME, PUNCT, STRING, TEMPLATE, COMMENT, WS
+
+# Incrémenté à chaque changement du résultat de scan (invalide le cache)
+TREESHAKE_VERSION = 2
+
+IDENTIFIER_RE = re.compile(r'[A-Za-z_$][\w$]*')
+HANDLER_ATTR_RE = re.compile(r'''\son[a-z]+\s*=\s*("[^"]*"|'[^']*')''', re.I)
+
+# Modules dont toutes les fonctions sont des racines : initialiseurs appelés
+# depuis le HTML ou d'autres modules sous des noms construits, code vendor
+ROOT_MODULE_PATTERNS = [
+    r'(^|/)[^/]*\.main\.js$',
+    r'^js/04\.init\.js$',
+    r'^vendor/',
+]
+
+# Objets dont les propriétés sont des globales
+GLOBAL_OBJECTS = frozenset(['window', 'globalThis', 'self'])
+
+# Déclaration de fonction de premier niveau : nom, début et fin dans le
+# source (commentaire JSDoc et fin de ligne compris), noms référencés
+FunctionDecl = namedtuple('FunctionDecl', ['name', 'start', 'end', 'refs'])
+
+# Résultat du scan d'un module : fonctions retirables et références faites
+# par le reste du code
+ModuleShape = namedtuple('ModuleShape', ['functions', 'refs'])
+
+
+def _matching(tokens, index):
+    """Index du token fermant celui ouvert en `index`"""
+    depth = 0
+    for i in range(index, len(tokens)):
+        kind, text, _pos = tokens[i]
+        if kind != PUNCT:
+            continue
+        if text in ('(', '[', '{'):
+            depth += 1
+        elif text in (')', ']', '}'):
+            depth -= 1
+            if depth == 0:
+                return i
+    return None
+
+
+def _add_refs(refs, tokens, start, end):
+    """Ajoute les noms référencés par tokens[start:end] (tokens significatifs)"""
+    for i in range(start, end):
+        kind, text, _pos = tokens[i]
+        if kind == NAME:
+            prev_text = tokens[i - 1][1] if i else None
+            if prev_text in ('.', '?.') and (i < 2 or tokens[i - 2][1] not in GLOBAL_OBJECTS):
+                continue
+            refs.add(text)
+        elif kind == STRING or kind == TEMPLATE:
+            refs.update(IDENTIFIER_RE.findall(text))
+
+
+def _declaration_start(src, all_tokens, index):
+    """
+    Début d'une déclaration : les commentaires qui la précèdent directement
+    (JSDoc /** */ et lignes //, chacun sur sa ligne, sans ligne vide avant
+    la déclaration) sont retirés avec elle
+    """
+    start = all_tokens[index][2]
+    k = index - 1
+    while k >= 0:
+        if all_tokens[k][0] == WS:
+            if all_tokens[k][1].count('\n') > 1:
+                break
+            k -= 1
+            continue
+        kind, text, pos = all_tokens[k]
+        if kind != COMMENT or not text.startswith(('/**', '//')):
+            break
+        line_start = src.rfind('\n', 0, pos) + 1
+        if src[line_start:pos].strip():
+            break
+        start = pos
+        k -= 1
+    line_start = src.rfind('\n', 0, start) + 1
+    return line_start if not src[line_start:start].strip() else start
+
+
+def _declaration_end(src, end):
+    """Fin d'une déclaration : espaces et fin de ligne qui la suivent compris"""
+    line_end = src.find('\n', end)
+    if line_end != -1 and not src[end:line_end].strip():
+        return line_end + 1
+    return end
+
+
+def scan(src):
+    """Relève les fonctions de premier niveau et les références du reste du code"""
+    all_tokens = list(tokenize(src))
+    positions = [i for i, token in enumerate(all_tokens) if token[0] not in (WS, COMMENT)]
+    tokens = [all_tokens[i] for i in positions]
+
+    functions = []
+    refs = set()
+    depth = 0
+    outside_start = 0
+    i = 0
+    count = len(tokens)
+    while i < count:
+        kind, text, _pos = tokens[i]
+        if kind == PUNCT:
+            if text in ('(', '[', '{'):
+                depth += 1
+            elif text in (')', ']', '}'):
+                depth -= 1
+            i += 1
+            continue
+        if depth or kind != NAME or text not in ('function', 'async'):
+            i += 1
+            continue
+
+        first = i
+        if text == 'async':
+            if i + 1 >= count or tokens[i + 1][1] != 'function':
+                i += 1
+                continue
+            i += 1
+        prev_text = tokens[first - 1][1] if first else None
+        name_index = i + 1
+        if name_index < count and tokens[name_index][1] == '*':
+            name_index += 1
+        if prev_text not in (None, ';', '}') or name_index >= count or tokens[name_index][0] != NAME:
+            i += 1
+            continue
+        paren = name_index + 1
+        params_end = _matching(tokens, paren) if paren < count and tokens[paren][1] == '(' else None
+        body = params_end + 1 if params_end is not None and params_end + 1 < count else None
+        body_end = _matching(tokens, body) if body is not None and tokens[body][1] == '{' else None
+        if body_end is None:
+            i += 1
+            continue
+
+        _add_refs(refs, tokens, outside_start, first)
+        decl_refs = set()
+        _add_refs(decl_refs, tokens, paren, body_end + 1)
+        end_token = tokens[body_end]
+        functions.append(FunctionDecl(
+            tokens[name_index][1],
+            _declaration_start(src, all_tokens, positions[first]),
+            _declaration_end(src, end_token[2] + len(end_token[1])),
+            frozenset(decl_refs),
+        ))
+        outside_start = i = body_end + 1
+
+    _add_refs(refs, tokens, outside_start, count)
+    return ModuleShape(functions, frozenset(refs))
+
+
+def html_handlers(html):
+    """Identifiants utilisés par les attributs on*="..." d'un document HTML"""
+    names = set()
+    for value in HANDLER_ATTR_RE.findall(html):
+        names.update(IDENTIFIER_RE.findall(value[1:-1]))
+    return names
+
+
+def root_modules(paths, patterns=ROOT_MODULE_PATTERNS):
+    """Chemins de `paths` correspondant à l'un des motifs de modules racines"""
+    compiled = [re.compile(pattern) for pattern in patterns]
+    return {path for path in paths if any(regex.search(path) for regex in compiled)}
+
+
+def live_functions(shapes, roots=(), root_modules=()):
+    """
+    Noms des fonctions atteignables. `shapes` : {chemin: ModuleShape} ;
+    `roots` : noms supplémentaires ; `root_modules` : chemins dont toutes
+    les fonctions sont des racines.
+    """
+    declared = {}
+    pending = list(roots)
+    for path, shape in shapes.items():
+        pending.extend(shape.refs)
+        for decl in shape.functions:
+            declared.setdefault(decl.name, []).append(decl)
+            if path in root_modules:
+                pending.append(decl.name)
+
+    live = set()
+    while pending:
+        name = pending.pop()
+        if name in live or name not in declared:
+            continue
+        live.add(name)
+        for decl in declared[name]:
+            pending.extend(decl.refs)
+    return live
+
+
+def shake(src, shape, live):
+    """Retire de `src` les fonctions absentes de `live`, retourne (source, noms retirés)"""
+    dead = [decl for decl in shape.functions if decl.name not in live]
+    if not dead:
+        return src, []
+    parts = []
+    pos = 0
+    for decl in dead:
+        parts.append(src[pos:decl.start])
+        pos = decl.end
+    parts.append(src[pos:])
+    return ''.join(parts), [decl.name for decl in dead]
+
+
+def main(argv=None):
+    from buildtools.manifest import load as load_manifest
+
+    parser = argparse.ArgumentParser(description="Liste les fonctions JS inatteignables d'une variante")
+    parser.add_argument('variant', nargs='?', default='light')
+    parser.add_argument('--html', action='append', default=[],
+                        help="document HTML dont les attributs on*= sont des racines (defaut: html/*.html)")
+    args = parser.parse_args(argv)
+
+    build_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    entries = load_manifest(build_dir).resolve(args.variant, 'js').entries
+    roots = set()
+    for path in args.html or ['html/head.html', 'html/body.html', 'html/footer.html']:
+        with open(os.path.join(build_dir, path), 'r', encoding='utf-8', errors='replace') as f:
+            roots |= html_handlers(f.read())
+
+    shapes = {}
+    for path, _ in entries:
+        with open(os.path.join(build_dir, path), 'r', encoding='utf-8', errors='replace') as f:
+            shapes[path] = scan(f.read())
+    live = live_functions(shapes, roots, root_modules(shapes))
+    total = 0
+    for path, shape in shapes.items():
+        dead = [decl.name for decl in shape.functions if decl.name not in live]
+        if dead:
+            total += len(dead)
+            print(f"{path}: {', '.join(dead)}")
+    print(f"[OK] {total} fonctions inatteignables")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,87 @@
+"""
+Mode --watch des scripts de build.
+
+Surveillance par scrutation (polling) des dossiers sources : pas de
+dépendance externe, fonctionne sur tous les systèmes de fichiers. Le
+processus reste résident : les segments assemblés par le script de build
+restent en mémoire et `rebuild` reçoit la liste des fichiers modifiés, seuls
+ces modules sont relus et retraités. Un changement de manifeste, de template
+ou de la liste des fichiers (et, pour build.light.py, d'un module lu par une
+étape globale comme --tree-shake) relance un build complet, servi par le cache.
+"""
+
+import os
+import time
+
+# Dossiers surveillés (relatifs à BUILD_DIR)
+WATCH_DIRS = ['css', 'js', 'js-refactor', 'html', 'vendor']
+
+# Extensions qui déclenchent un rebuild
+WATCH_EXTENSIONS = ('.css', '.js', '.html')
+
+# Fichiers isolés surveillés (ordre des modules, listes compilées au build)
+WATCH_FILES = [
+    'build-manifest.json',
+    'mots de tension/Haute_tension.txt',
+    'mots de tension/Moyenne_tension.txt',
+    'mots de tension/Basse_tension.txt',
+]
+
+
+def snapshot(build_dir, dirs=WATCH_DIRS, extensions=WATCH_EXTENSIONS):
+    """Retourne {chemin relatif: (taille, mtime_ns)} des fichiers surveillés"""
+    state = {}
+    for name in dirs:
+        root_dir = os.path.join(build_dir, name)
+        for root, _dirs, files in os.walk(root_dir):
+            for filename in files:
+                if not filename.endswith(extensions):
+                    continue
+                full_path = os.path.join(root, filename)
+                try:
+                    st = os.stat(full_path)
+                except OSError:
+                    continue
+                rel_path = os.path.relpath(full_path, build_dir).replace(os.sep, '/')
+                state[rel_path] = (st.st_size, st.st_mtime_ns)
+    for name in WATCH_FILES:
+        try:
+            st = os.stat(os.path.join(build_dir, name))
+        except OSError:
+            continue
+        state[name] = (st.st_size, st.st_mtime_ns)
+    return state
+
+
+def diff_snapshots(previous, current):
+    """Retourne la liste triée des fichiers ajoutés, modifiés ou supprimés"""
+    paths = set(previous) | set(current)
+    return sorted(p for p in paths if previous.get(p) != current.get(p))
+
+
+def watch(build_dir, rebuild, log, interval=0.5):
+    """
+    Appelle `rebuild(changed)` à chaque modification détectée, jusqu'à Ctrl+C.
+    Une erreur de rebuild est affichée mais n'arrête pas la surveillance.
+    """
+    log(f"[watch] Surveillance de {', '.join(d + '/' for d in WATCH_DIRS)} (Ctrl+C pour arreter)")
+    previous = snapshot(build_dir)
+    try:
+        while True:
+            time.sleep(interval)
+            current = snapshot(build_dir)
+            changed = diff_snapshots(previous, current)
+            if not changed:
+                continue
+            previous = current
+            for path in changed:
+                log(f"[watch] Modifie: {path}")
+            start = time.perf_counter()
+            try:
+                rebuild(changed)
+            except Exception as e:
+                log(f"[watch] [ERREUR] Rebuild: {e}")
+                continue
+            log(f"[watch] Rebuild en {(time.perf_counter() - start) * 1000:.0f} ms")
+    except KeyboardInterrupt:
+        log("[watch] Arret")
@@ -1,16 +1,27 @@
 #!/usr/bin/env python3
 """
 Script de déploiement vers /live
-Copie tous les fichiers nécessaires listés dans build.light.py vers le répertoire /live
-Usage: python3 deploy-to-live.py
+Copie vers le répertoire /live les fichiers de la variante "light" et les
+fichiers annexes listés dans build-manifest.json (section "deploy").
+Seuls les fichiers nouveaux ou modifiés sont copiés, les fichiers qui ne sont
+plus déployés sont supprimés (index.html et ses versions compressées,
+générés par build-index-live.sh, sont conservés).
+Les copies passent par copy_file_range/sendfile quand c'est possible ; avec
+--link, chaque fichier nouveau, modifié ou identique à sa source devient dès
+ce déploiement un lien physique vers elle (copie si le lien est impossible).
+Usage: python3 deploy-to-live.py [--jobs N] [--checksum] [--full] [--link]
 """
 
 import os
 import sys
-import shutil
+import argparse
 from datetime import datetime
 
-# Importer les listes de fichiers depuis build.light.py
+from buildtools import fastcopy
+from buildtools.manifest import load as load_manifest
+from buildtools.parallel import default_jobs, ordered_map
+from buildtools.sync import DeployManifest, stale_files, remove_empty_dirs
+
 BUILD_DIR = os.path.dirname(os.path.abspath(__file__))
 LIVE_DIR = os.path.join(BUILD_DIR, 'live')
 LOG_FILE = os.path.join(BUILD_DIR, 'deploy.log')
@@ -18,6 +29,23 @@ LOG_FILE = os.path.join(BUILD_DIR, 'deploy.log')
 # Fichier log global
 log_handle = None
 
+# Manifeste du dernier déploiement (build/.deploy-manifest.json)
+deploy_manifest = None
+
+# Comparaison par hash du contenu (--checksum) / recopie complète (--full)
+checksum_enabled = False
+full_copy = False
+
+# Liens physiques vers les sources pour les contenus identiques (--link)
+link_enabled = False
+
+# Fichiers de /live générés par build-index-live.sh, jamais supprimés
+PRESERVED_FILES = [
+    'index.html',
+    'index.html.gz',
+    'index.html.xz',
+]
+
 def log(message):
     """Écrit un message dans la console ET dans le fichier log"""
     print(message)
@@ -25,224 +53,72 @@ def log(message):
         log_handle.write(message + '\n')
         log_handle.flush()
 
-# Ordre des fichiers CSS (copié depuis build.light.py)
-CSS_ORDER = [
-    '../vendor/driver.css',
-    '01.variables.css',
-    '02.base.css',
-    '03.header.css',
-    '04.sidebar.css',
-    '05.modals.css',
-    '06.editor.css',
-    '07.characters.css',
-    '08.visualizations.css',
-    '09.utilities.css',
-    '10.mobile.css',
-    '12.arc-board.css',
-    '14.word-repetition.css',
-    '14.product-tour.css',
-]
-
-# Ordre des fichiers JS (copié depuis build.light.py)
-JS_ORDER = [
-    'vendor/driver.js.iife.js',
-    'js-refactor/01.app.refactor.js',
-    '38.tension.js',
-    '02.storage.js',
-    'js-refactor/03.projects.refactor.js',
-    '04.init.js',
-    'js-refactor/05.undo-redo.refactor.js',
-    'js-refactor/structure/structure.model.js',
-    'js-refactor/structure/structure.repository.js',
-    'js-refactor/structure/structure.viewmodel.js',
-    'js-refactor/00.app.view.js',
-    'js-refactor/structure/structure.view.js',
-    'js-refactor/structure/structure-organizer.view.js',
-    'js-refactor/structure/structure.helpers.js',
-    'js-refactor/07.stats.refactor.js',
-    'js-refactor/08.auto-detect.refactor.js',
-    '09.floating-editor.js',
-    'js-refactor/10.colorpalette.refactor.js',
-    '11.updateStats.js',
-    '12.import-export.js',
-    '13.mobile-menu.js',
-    # Drag and Drop Acts Module
-    'js-refactor/dragndrop-acts/dragndrop-acts.model.js',
-    'js-refactor/dragndrop-acts/dragndrop-acts.repository.js',
-    'js-refactor/dragndrop-acts/dragndrop-acts.viewmodel.js',
-    'js-refactor/dragndrop-acts/dragndrop-acts.view.js',
-    'js-refactor/dragndrop-acts/dragndrop-acts.handlers.js',
-    'js-refactor/dragndrop-acts/dragndrop-acts.main.js',
-    'js-refactor/characters/characters.model.js',
-    'js-refactor/characters/characters.repository.js',
-    'js-refactor/characters/characters.viewmodel.js',
-    'js-refactor/characters/characters.view.js',
-    'js-refactor/16.split-view.js',
-    'js-refactor/world/world.model.js',
-    'js-refactor/world/world.repository.js',
-    'js-refactor/world/world.viewmodel.js',
-    'js-refactor/world/world.view.js',
-    '18.timeline.js',
-    '19.notes.js',
-    '20.snapshots.js',
-    'js-refactor/sceneVersion/sceneVersion.model.js',
-    'js-refactor/sceneVersion/sceneVersion.repository.js',
-    'js-refactor/sceneVersion/sceneVersion.viewmodel.js',
-    'js-refactor/sceneVersion/sceneVersion.view.js',
-    'js-refactor/sceneVersion/sceneVersion.main.js',
-    '22.diff.js',
-    '23.stats.js',
-    'js-refactor/codex/codex.model.js',
-    'js-refactor/codex/codex.repository.js',
-    'js-refactor/codex/codex.viewmodel.js',
-    'js-refactor/codex/codex.view.js',
-    '25.globalSearch.js',
-    'js-refactor/26.focusMode.refactor.js',
-    '27.keyboardShortcuts.js',
-    'js-refactor/revision/revision.model.js',
-    'js-refactor/revision/revision.repository.js',
-    'js-refactor/revision/revision.viewmodel.js',
-    'js-refactor/revision/revision.view.js',
-    'js-refactor/revision/revision.handlers.js',
-    'js-refactor/revision/revision.main.js',
-    'js-refactor/29.todos.refactor.js',
-    'js-refactor/corkboard/corkboard.model.js',
-    'js-refactor/corkboard/corkboard.repository.js',
-    'js-refactor/corkboard/corkboard.viewmodel.js',
-    'js-refactor/corkboard/corkboard.view.js',
-    'js-refactor/corkboard/corkboard.handlers.js',
-    'js-refactor/corkboard/corkboard.main.js',
-    '31.mindmap.js',
-    '32.touch-events.js',
-    'js-refactor/plot/plot.model.js',
-    'js-refactor/plot/plot.repository.js',
-    'js-refactor/plot/plot.viewmodel.js',
-    'js-refactor/plot/plot.view.js',
-    'js-refactor/plot/plot.init.js',
-    '34.relations-graph.js',
-    '35.renderMap.js',
-    '36.timeline-metro.js',
-    '37.theme-manager.js',
-    '39.export.js',
-    '40.sidebar-views.js',
-    '41.storageMonitoring.js',
-    '42.mobile-swipe.js',
-    'js-refactor/43.arcs.refactor.js',
-    'js-refactor/arc-board/arc-board.config.js',
-    'js-refactor/arc-board/arc-board.models.js',
-    'js-refactor/arc-board/arc-board.repository.js',
-    'js-refactor/arc-board/arc-board.viewmodel.js',
-    'js-refactor/arc-board/arc-board.services.js',
-    'js-refactor/arc-board/arc-board.views.js',
-    'js-refactor/arc-board/arc-board.handlers.js',
-    'js-refactor/arc-board/arc-board.main.js',
-    'js-refactor/plotgrid/plot-grid.model.js',
-    'js-refactor/plotgrid/plot-grid.repository.js',
-    'js-refactor/plotgrid/plot-grid.viewmodel.js',
-    'js-refactor/plotgrid/plot-grid.import-export.js',
-    'js-refactor/plotgrid/plot-grid.view.js',
-    'js-refactor/28.sceneNavigation.js',
-    'js-refactor/synonyms/synonyms.config.js',
-    'js-refactor/synonyms/synonyms.model.js',
-    'js-refactor/synonyms/synonyms.dictionary.js',
-    'js-refactor/synonyms/synonyms.service.js',
-    'js-refactor/synonyms/synonyms.repository.js',
-    'js-refactor/synonyms/synonyms.viewmodel.js',
-    'js-refactor/synonyms/synonyms.view.js',
-    'js-refactor/import-chapter/import-chapter.model.js',
-    'js-refactor/import-chapter/import-chapter.viewmodel.js',
-    'js-refactor/import-chapter/import-chapter.view.js',
-    'js-refactor/word-repetition/word-repetition.model.js',
-    'js-refactor/word-repetition/word-repetition.repository.js',
-    'js-refactor/word-repetition/word-repetition.viewmodel.js',
-    'js-refactor/word-repetition/word-repetition.view.js',
-    'js-refactor/word-repetition/word-repetition.handlers.js',
-    'js-refactor/word-repetition/word-repetition.main.js',
-    'js-refactor/product-tour/product-tour.model.js',
-    'js-refactor/product-tour/product-tour.repository.js',
-    'js-refactor/product-tour/product-tour.viewmodel.js',
-    'js-refactor/product-tour/product-tour.view.js',
-
-]
-
-# Fichiers HTML essentiels
-HTML_FILES = [
-    'html/head.html',
-    'html/body.html',
-    'html/footer.html'
-]
-
-# CSS des modules
-MODULE_CSS_FILES = [
-    'js-refactor/synonyms/synonyms.css'
-]
-
-# Fichiers de documentation
-DOC_FILES = [
-    'README.md',
-    'LICENSE',
-    '.gitignore'
-]
-
-# Scripts de build
-BUILD_SCRIPTS = [
-    'build.light.py',
-    'build.py',
-    'build.test.py',
-    'build-timestamp.py'
-]
-
 def get_all_files_to_deploy():
-    """Retourne la liste complète des fichiers à déployer"""
-    files = []
-    
-    # Ajouter les fichiers CSS
-    for css_file in CSS_ORDER:
-        if css_file.startswith('../vendor/'):
-            # Vendor CSS files
-            files.append(css_file.replace('../', ''))
-        else:
-            files.append(f'css/{css_file}')
-    
-    # Ajouter les CSS des modules
-    files.extend(MODULE_CSS_FILES)
-    
-    # Ajouter les fichiers JS
-    for js_file in JS_ORDER:
-        if js_file.startswith('vendor/') or js_file.startswith('js-refactor/'):
-            files.append(js_file)
-        else:
-            files.append(f'js/{js_file}')
-    
-    # Ajouter les fichiers HTML
-    files.extend(HTML_FILES)
-    
-    # Ajouter les fichiers de documentation
-    files.extend(DOC_FILES)
-    
-    # Ajouter les scripts de build
-    files.extend(BUILD_SCRIPTS)
-    
-    return files
+    """Retourne la liste complète des fichiers à déployer (section "deploy" du manifeste)"""
+    return load_manifest(BUILD_DIR).deploy_files()
 
 def copy_file(src_path, dest_path):
-    """Copie un fichier en créant les répertoires nécessaires"""
+    """
+    Copie un fichier, ou le lie à sa source avec --link.
+    Retourne la méthode utilisée ou None en cas d'erreur.
+    """
     try:
-        # Créer le répertoire de destination si nécessaire
-        dest_dir = os.path.dirname(dest_path)
-        if dest_dir:
-            os.makedirs(dest_dir, exist_ok=True)
-        
-        # Copier le fichier
-        shutil.copy2(src_path, dest_path)
-        return True
+        return fastcopy.copy_file(src_path, dest_path, link=link_enabled)
     except Exception as e:
         log(f"   [ERREUR] Impossible de copier {src_path}: {e}")
-        return False
+        return None
+
+def deploy_file(file_path):
+    """
+    Synchronise un fichier source vers /live.
+    Retourne (statut, taille, méthode de copie) avec statut 'copied',
+    'linked', 'unchanged', 'missing' ou 'error'.
+    """
+    src_path = os.path.join(BUILD_DIR, file_path)
+    dest_path = os.path.join(LIVE_DIR, file_path)
+    
+    if not os.path.exists(src_path):
+        return 'missing', 0, None
+    
+    size = os.path.getsize(src_path)
+    method = None
+    if (not full_copy
+            and deploy_manifest.is_current(file_path, src_path, dest_path, checksum_enabled)
+            and (not link_enabled or fastcopy.same_file(src_path, dest_path))):
+        status = 'unchanged'
+    else:
+        method = copy_file(src_path, dest_path)
+        if not method:
+            return 'error', 0, None
+        status = 'linked' if method == 'link' else 'copied'
+    
+    deploy_manifest.record(file_path, src_path, dest_path)
+    return status, size, method
+
+def remove_stale_files(files_to_deploy):
+    """Supprime de /live les fichiers qui ne font plus partie du déploiement"""
+    removed_count = 0
+    error_count = 0
+    for file_path in stale_files(LIVE_DIR, set(files_to_deploy) | set(PRESERVED_FILES)):
+        try:
+            os.remove(os.path.join(LIVE_DIR, file_path))
+            deploy_manifest.forget(file_path)
+            log(f"   [-] Supprime: {file_path}")
+            removed_count += 1
+        except OSError as e:
+            log(f"   [ERREUR] Impossible de supprimer {file_path}: {e}")
+            error_count += 1
+    remove_empty_dirs(LIVE_DIR)
+    return removed_count, error_count
 
-def deploy():
-    """Déploie tous les fichiers vers le répertoire /live"""
-    global log_handle
+def deploy(jobs=None, checksum=False, full=False, link=False):
+    """Synchronise tous les fichiers vers le répertoire /live"""
+    global log_handle, deploy_manifest, checksum_enabled, full_copy, link_enabled
+    
+    checksum_enabled = checksum
+    full_copy = full
+    link_enabled = link
+    deploy_manifest = DeployManifest(BUILD_DIR).load()
     
     # Ouvrir le fichier log
     log_handle = open(LOG_FILE, 'w', encoding='utf-8')
@@ -255,72 +131,88 @@ def deploy():
     log("")
     
     # Créer le répertoire /live s'il n'existe pas
-    if os.path.exists(LIVE_DIR):
-        log(f"--- Nettoyage du répertoire /live existant ---")
+    if not os.path.exists(LIVE_DIR):
+        log(f"--- Création du répertoire /live ---")
         try:
-            shutil.rmtree(LIVE_DIR)
-            log(f"   [OK] Répertoire /live supprimé")
+            os.makedirs(LIVE_DIR, exist_ok=True)
+            log(f"   [OK] Répertoire /live créé")
         except Exception as e:
-            log(f"   [ERREUR] Impossible de supprimer /live: {e}")
+            log(f"   [ERREUR] Impossible de créer /live: {e}")
             log_handle.close()
             return False
+        log("")
     
-    log(f"--- Création du répertoire /live ---")
-    try:
-        os.makedirs(LIVE_DIR, exist_ok=True)
-        log(f"   [OK] Répertoire /live créé")
-    except Exception as e:
-        log(f"   [ERREUR] Impossible de créer /live: {e}")
-        log_handle.close()
-        return False
-    
-    log("")
-    log(f"--- Copie des fichiers ---")
+    log(f"--- Synchronisation des fichiers ---")
     
     # Obtenir la liste des fichiers à déployer
     files_to_deploy = get_all_files_to_deploy()
     
     copied_count = 0
+    linked_count = 0
+    unchanged_count = 0
     missing_count = 0
     error_count = 0
+    total_size = 0
+    methods = {}
+    
+    # Copies en parallèle, bilan dans l'ordre de la liste
+    results = ordered_map(deploy_file, files_to_deploy, jobs)
     
-    for file_path in files_to_deploy:
-        src_path = os.path.join(BUILD_DIR, file_path)
-        dest_path = os.path.join(LIVE_DIR, file_path)
-        
-        if not os.path.exists(src_path):
+    for file_path, (status, size, method) in zip(files_to_deploy, results):
+        total_size += size
+        if method:
+            methods[method] = methods.get(method, 0) + 1
+        if status == 'missing':
             log(f"   [!] Fichier manquant: {file_path}")
             missing_count += 1
-            continue
-        
-        if copy_file(src_path, dest_path):
+        elif status == 'copied':
+            log(f"   [+] Copie: {file_path}")
             copied_count += 1
+        elif status == 'linked':
+            log(f"   [+] Lien: {file_path}")
+            linked_count += 1
+        elif status == 'unchanged':
+            unchanged_count += 1
         else:
             error_count += 1
     
+    removed_count, remove_errors = remove_stale_files(files_to_deploy)
+    error_count += remove_errors
+    deploy_manifest.save()
+    
     log("")
     log(f"========================================")
     log(f"DÉPLOIEMENT TERMINÉ")
     log(f"========================================")
     log(f"Fichiers copiés: {copied_count}")
+    if link_enabled:
+        log(f"Fichiers liés: {linked_count}")
+    if methods:
+        log(f"   Methodes: " + ', '.join(f"{name} {count}" for name, count in sorted(methods.items())))
+    log(f"Fichiers inchangés: {unchanged_count}")
+    log(f"Fichiers supprimés: {removed_count}")
     log(f"Fichiers manquants: {missing_count}")
     log(f"Erreurs: {error_count}")
     log(f"Total: {len(files_to_deploy)} fichiers")
     log("")
     log(f"Répertoire de déploiement: {LIVE_DIR}")
     
-    # Calculer la taille totale
-    total_size = 0
-    for root, dirs, files in os.walk(LIVE_DIR):
-        for file in files:
-            file_path = os.path.join(root, file)
-            total_size += os.path.getsize(file_path)
-    
     log(f"Taille totale: {total_size:,} octets ({total_size / 1024 / 1024:.2f} MB)")
     
     log_handle.close()
     return error_count == 0
 
 if __name__ == "__main__":
-    success = deploy()
+    parser = argparse.ArgumentParser(description="Deploiement de Plume vers /live")
+    parser.add_argument('--jobs', type=int, default=default_jobs(),
+                        help="nombre de fichiers copies en parallele (1 = sequentiel)")
+    parser.add_argument('--checksum', action='store_true',
+                        help="compare le contenu des fichiers (hash) plutot que taille et date")
+    parser.add_argument('--full', action='store_true',
+                        help="recopie tous les fichiers, meme inchanges")
+    parser.add_argument('--link', action='store_true',
+                        help="lie les fichiers de /live a leur source (liens physiques) au lieu de les copier")
+    args = parser.parse_args()
+    
+    success = deploy(jobs=args.jobs, checksum=args.checksum, full=args.full, link=args.link)
     sys.exit(0 if success else 1)
@@ -1,6 +1,6 @@
 #!/bin/bash
 # Script de déploiement vers /live
-# Copie tous les fichiers nécessaires listés dans build.light.py vers le répertoire /live
+# Copie tous les fichiers listés dans build-manifest.json (section "deploy") vers le répertoire /live
 
 # Ne pas arrêter sur erreur pour permettre de continuer même si des fichiers sont manquants
 # set -e
@@ -24,6 +24,17 @@ log "Répertoire source: $BUILD_DIR"
 log "Répertoire cible: $LIVE_DIR"
 log ""
 
+# La liste des fichiers vient de build-manifest.json (section "deploy"), comme
+# pour deploy-to-live.py ; elle est lue avant de toucher à /live
+if ! command -v python3 > /dev/null 2>&1; then
+    log "   [ERREUR] python3 est requis pour lire build-manifest.json"
+    exit 1
+fi
+if ! DEPLOY_FILES=$(cd "$BUILD_DIR" && python3 -m buildtools.manifest deploy); then
+    log "   [ERREUR] Lecture de build-manifest.json impossible, /live n'est pas modifié"
+    exit 1
+fi
+
 # Nettoyer et créer le répertoire /live
 if [ -d "$LIVE_DIR" ]; then
     log "--- Nettoyage du répertoire /live existant ---"
@@ -56,143 +67,11 @@ copy_file() {
     fi
 }
 
-# Fichiers CSS
-copy_file "vendor/driver.css"
-copy_file "css/01.variables.css"
-copy_file "css/02.base.css"
-copy_file "css/03.header.css"
-copy_file "css/04.sidebar.css"
-copy_file "css/05.modals.css"
-copy_file "css/06.editor.css"
-copy_file "css/07.characters.css"
-copy_file "css/08.visualizations.css"
-copy_file "css/09.utilities.css"
-copy_file "css/10.mobile.css"
-copy_file "css/12.arc-board.css"
-copy_file "css/14.word-repetition.css"
-copy_file "css/14.product-tour.css"
-
-# CSS des modules
-copy_file "js-refactor/synonyms/synonyms.css"
-
-# Fichiers JS vendor
-copy_file "vendor/driver.js.iife.js"
-
-# Fichiers JS refactored
-copy_file "js-refactor/01.app.refactor.js"
-copy_file "js-refactor/03.projects.refactor.js"
-copy_file "js-refactor/05.undo-redo.refactor.js"
-copy_file "js-refactor/structure/structure.model.js"
-copy_file "js-refactor/structure/structure.repository.js"
-copy_file "js-refactor/structure/structure.viewmodel.js"
-copy_file "js-refactor/00.app.view.js"
-copy_file "js-refactor/structure/structure.view.js"
-copy_file "js-refactor/structure/structure-organizer.view.js"
-copy_file "js-refactor/structure/structure.helpers.js"
-copy_file "js-refactor/07.stats.refactor.js"
-copy_file "js-refactor/08.auto-detect.refactor.js"
-copy_file "js-refactor/10.colorpalette.refactor.js"
-copy_file "js-refactor/characters/characters.model.js"
-copy_file "js-refactor/characters/characters.repository.js"
-copy_file "js-refactor/characters/characters.viewmodel.js"
-copy_file "js-refactor/characters/characters.view.js"
-copy_file "js-refactor/16.split-view.js"
-copy_file "js-refactor/world/world.model.js"
-copy_file "js-refactor/world/world.repository.js"
-copy_file "js-refactor/world/world.viewmodel.js"
-copy_file "js-refactor/world/world.view.js"
-copy_file "js-refactor/sceneVersion/sceneVersion.model.js"
-copy_file "js-refactor/sceneVersion/sceneVersion.repository.js"
-copy_file "js-refactor/sceneVersion/sceneVersion.viewmodel.js"
-copy_file "js-refactor/sceneVersion/sceneVersion.view.js"
-copy_file "js-refactor/sceneVersion/sceneVersion.main.js"
-copy_file "js-refactor/codex/codex.model.js"
-copy_file "js-refactor/codex/codex.repository.js"
-copy_file "js-refactor/codex/codex.viewmodel.js"
-copy_file "js-refactor/codex/codex.view.js"
-copy_file "js-refactor/26.focusMode.refactor.js"
-copy_file "js-refactor/28.revision.refactor.js"
-copy_file "js-refactor/29.todos.refactor.js"
-copy_file "js-refactor/corkboard/corkboard.model.js"
-copy_file "js-refactor/corkboard/corkboard.repository.js"
-copy_file "js-refactor/corkboard/corkboard.viewmodel.js"
-copy_file "js-refactor/corkboard/corkboard.view.js"
-copy_file "js-refactor/corkboard/corkboard.handlers.js"
-copy_file "js-refactor/corkboard/corkboard.main.js"
-copy_file "js-refactor/plot/plot.model.js"
-copy_file "js-refactor/plot/plot.repository.js"
-copy_file "js-refactor/plot/plot.viewmodel.js"
-copy_file "js-refactor/plot/plot.view.js"
-copy_file "js-refactor/plot/plot.init.js"
-copy_file "js-refactor/43.arcs.refactor.js"
-copy_file "js-refactor/arc-board/arc-board.config.js"
-copy_file "js-refactor/arc-board/arc-board.models.js"
-copy_file "js-refactor/arc-board/arc-board.repository.js"
-copy_file "js-refactor/arc-board/arc-board.viewmodel.js"
-copy_file "js-refactor/arc-board/arc-board.services.js"
-copy_file "js-refactor/arc-board/arc-board.views.js"
-copy_file "js-refactor/arc-board/arc-board.handlers.js"
-copy_file "js-refactor/arc-board/arc-board.main.js"
-copy_file "js-refactor/plotgrid/plot-grid.model.js"
-copy_file "js-refactor/plotgrid/plot-grid.repository.js"
-copy_file "js-refactor/plotgrid/plot-grid.viewmodel.js"
-copy_file "js-refactor/plotgrid/plot-grid.import-export.js"
-copy_file "js-refactor/plotgrid/plot-grid.view.js"
-copy_file "js-refactor/28.sceneNavigation.js"
-copy_file "js-refactor/synonyms/synonyms.config.js"
-copy_file "js-refactor/synonyms/synonyms.model.js"
-copy_file "js-refactor/synonyms/synonyms.dictionary.js"
-copy_file "js-refactor/synonyms/synonyms.service.js"
-copy_file "js-refactor/synonyms/synonyms.repository.js"
-copy_file "js-refactor/synonyms/synonyms.viewmodel.js"
-copy_file "js-refactor/synonyms/synonyms.view.js"
-copy_file "js-refactor/import-chapter/import-chapter.model.js"
-copy_file "js-refactor/import-chapter/import-chapter.viewmodel.js"
-copy_file "js-refactor/import-chapter/import-chapter.view.js"
-copy_file "js-refactor/word-repetition/word-repetition.model.js"
-copy_file "js-refactor/word-repetition/word-repetition.repository.js"
-copy_file "js-refactor/word-repetition/word-repetition.viewmodel.js"
-copy_file "js-refactor/word-repetition/word-repetition.view.js"
-copy_file "js-refactor/word-repetition/word-repetition.handlers.js"
-copy_file "js-refactor/word-repetition/word-repetition.main.js"
-copy_file "js-refactor/product-tour/product-tour.model.js"
-copy_file "js-refactor/product-tour/product-tour.repository.js"
-copy_file "js-refactor/product-tour/product-tour.viewmodel.js"
-copy_file "js-refactor/product-tour/product-tour.view.js"
-
-# Fichiers JS originaux (non refactorisés)
-copy_file "js/38.tension.js"
-copy_file "js/02.storage.js"
-copy_file "js/04.init.js"
-copy_file "js/09.floating-editor.js"
-copy_file "js/11.updateStats.js"
-copy_file "js/12.import-export.js"
-copy_file "js/13.mobile-menu.js"
-copy_file "js/14.dragndrop-acts.js"
-copy_file "js/18.timeline.js"
-copy_file "js/19.notes.js"
-copy_file "js/20.snapshots.js"
-copy_file "js/22.diff.js"
-copy_file "js/23.stats.js"
-copy_file "js/25.globalSearch.js"
-copy_file "js/27.keyboardShortcuts.js"
-copy_file "js/31.mindmap.js"
-copy_file "js/32.touch-events.js"
-copy_file "js/34.relations-graph.js"
-copy_file "js/35.renderMap.js"
-copy_file "js/36.timeline-metro.js"
-copy_file "js/37.theme-manager.js"
-copy_file "js/39.export.js"
-copy_file "js/40.sidebar-views.js"
-copy_file "js/41.storageMonitoring.js"
-copy_file "js/42.mobile-swipe.js"
-
-
-# Fichiers de documentation
-copy_file "README.md"
-copy_file "LICENSE"
-copy_file ".gitignore"
-
+# Fichiers de la variante déployée et fichiers annexes, dans l'ordre du manifeste
+while IFS= read -r file_path; do
+    [ -n "$file_path" ] || continue
+    copy_file "$file_path"
+done <<< "$DEPLOY_FILES"
 
 log ""
 log "========================================"
@@ -137,7 +137,10 @@ function switchView(view) {
 
     // Toolbar de l'arborescence
     const treeCollapseToolbar = document.getElementById('treeCollapseToolbar');
-    const viewsWithGroups = ['editor', 'world', 'notes', 'codex', 'thriller'];
+    const viewsWithGroups = ['editor', 'world', 'notes', 'codex'];
+    if (PLUME_FEATURES.thriller) {
+        viewsWithGroups.push('thriller');
+    }
     if (treeCollapseToolbar) {
         treeCollapseToolbar.style.display = viewsWithGroups.includes(view) ? '' : 'none';
     }
@@ -155,7 +158,14 @@ function switchView(view) {
         'chaptersList', 'charactersList', 'worldList', 'timelineList',
         'notesList', 'codexList', 'arcsList', 'statsList', 'versionsList', 'analysisList',
         'todosList', 'corkboardList', 'mindmapList', 'plotList',
-        'relationsList', 'mapList', 'timelineVizList', 'storyGridList', 'thrillerList', 'noSidebarMessage'
+        'relationsList', 'mapList', 'timelineVizList',
+        // #if storygrid
+        'storyGridList',
+        // #endif
+        // #if thriller
+        'thrillerList',
+        // #endif
+        'noSidebarMessage'
     ];
 
     sidebarLists.forEach(listId => {
@@ -173,7 +183,9 @@ function switchView(view) {
         'arcs': 'arcsList',
         'mindmap': 'mindmapList',
         'timelineviz': 'timelineVizList',
+        // #if thriller
         'thriller': 'thrillerList',
+        // #endif
         'map': 'mapList'
     };
 
@@ -182,7 +194,12 @@ function switchView(view) {
     const viewLabelsNoSidebar = {
         'stats': 'Statistiques', 'analysis': 'Analyse', 'versions': 'Versions',
         'todos': 'TODOs', 'timeline': 'Timeline', 'corkboard': 'Tableau',
-        'thriller': 'Thriller', 'storygrid': 'Story Grid'
+        // #if thriller
+        'thriller': 'Thriller',
+        // #endif
+        // #if storygrid
+        'storygrid': 'Story Grid',
+        // #endif
     };
 
     if (sidebarViews[view]) {
@@ -327,8 +344,12 @@ function renderViewContent(view, containerId) {
             if (typeof renderArcsWelcome === 'function') renderArcsWelcome();
             break;
         case 'timeline': if (typeof renderTimelineList === 'function') renderTimelineList(); break;
+        // #if storygrid
         case 'storygrid': if (typeof renderStoryGrid === 'function') renderStoryGrid(); break;
+        // #endif
+        // #if thriller
         case 'thriller': if (typeof renderThrillerBoard === 'function') renderThrillerBoard(); break;
+        // #endif
         default:
             container.innerHTML = `
                 <div class="empty-state">
@@ -707,11 +728,13 @@ function closeModal(modalId) {
 }
 
 function openModal(modalId) {
+    if (typeof plumeMountView === 'function') plumeMountView(modalId);
     document.getElementById(modalId)?.classList.add('active');
 }
 
 
 function openProjectsModal() {
+    if (typeof plumeMountView === 'function') plumeMountView('projectsModal');
     if (typeof renderProjectsList === 'function') renderProjectsList();
     document.getElementById('projectsModal')?.classList.add('active');
 }
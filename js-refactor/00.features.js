@@ -0,0 +1,9 @@
+/**
+ * [MVVM : Config]
+ * Fonctionnalités présentes dans le bundle.
+ * Tout est actif dans les sources ; le build d'une variante qui retire une
+ * fonctionnalité (build-manifest.json, "strip") réécrit cet objet et retire le
+ * code qui en dépend : `if (PLUME_FEATURES.thriller) { ... }` et les régions
+ * `// #if thriller` ... `// #endif` (voir buildtools/features.py).
+ */
+const PLUME_FEATURES = Object.freeze({ thriller: true, storygrid: true });
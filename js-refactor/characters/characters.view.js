@@ -8,6 +8,7 @@
  * Affiche la modale d'ajout de personnage.
  */
 function openAddCharacterModal() {
+    if (typeof plumeMountView === 'function') plumeMountView('addCharacterModal');
     const modal = document.getElementById('addCharacterModal');
     if (modal) {
         modal.classList.add('active');
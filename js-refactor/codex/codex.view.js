@@ -62,6 +62,7 @@ const CodexView = {
      * Ouvre la modale d'ajout d'entrée.
      */
     openAddModal() {
+        if (typeof plumeMountView === 'function') plumeMountView('addCodexModal');
         const modal = document.getElementById('addCodexModal');
         if (modal) {
             modal.classList.add('active');
@@ -144,6 +145,7 @@ const CodexView = {
 
         const scenes = CodexViewModel.findScenesWithCharacter(characterId);
 
+        if (typeof plumeMountView === 'function') plumeMountView('referencesModal');
         const modalTitle = document.getElementById('referencesModalTitle');
         const modalContent = document.getElementById('referencesModalContent');
         const modal = document.getElementById('referencesModal');
@@ -186,6 +188,7 @@ const CodexView = {
 
         const scenes = CodexViewModel.findScenesWithElement(elementId);
 
+        if (typeof plumeMountView === 'function') plumeMountView('referencesModal');
         const modalTitle = document.getElementById('referencesModalTitle');
         const modalContent = document.getElementById('referencesModalContent');
         const modal = document.getElementById('referencesModal');
@@ -20,6 +20,7 @@ const ImportChapterView = {
      */
     open() {
         try {
+            if (typeof plumeMountView === 'function') plumeMountView('importChapterModal');
             // Reset l'état si possible
             if (typeof ImportChapterViewModel !== 'undefined') {
                 ImportChapterViewModel.reset();
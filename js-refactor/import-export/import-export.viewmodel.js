@@ -192,6 +192,7 @@ const ImportExportViewModel = {
     },
 
     openExportNovelModal: function () {
+        if (typeof plumeMountView === 'function') plumeMountView('exportNovelModal');
         ImportExportModel.initSelectionState(true);
         ImportExportView.renderExportTree(window.project, ImportExportModel.selectionState);
         ImportExportView.updateExportFormatInfo();
@@ -51,6 +51,7 @@ const KeyboardShortcutsHandlers = {
     },
 
     openShortcutsModal: () => {
+        if (typeof plumeMountView === 'function') plumeMountView('shortcutsModal');
         const modal = document.getElementById('shortcutsModal');
         if (modal) {
             modal.classList.add('active');
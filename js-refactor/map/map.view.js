@@ -271,6 +271,7 @@ class MapView {
     }
 
     openConfigModal() {
+        if (typeof plumeMountView === 'function') plumeMountView('mapConfigModal');
         const config = this.viewModel.getConfig();
         const catSelect = document.getElementById('newMapTypeCategory');
         const iconGrid = document.getElementById('newMapTypeIconGrid');
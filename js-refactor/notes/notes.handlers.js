@@ -30,6 +30,7 @@ class NotesHandlers {
      * Prepares and opens the add note modal
      */
     static openAddNoteModal() {
+        if (typeof plumeMountView === 'function') plumeMountView('addNoteModal');
         const modal = document.getElementById('addNoteModal');
         if (modal) {
             modal.classList.add('active');
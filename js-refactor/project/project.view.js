@@ -116,6 +116,7 @@ const ProjectView = {
      * Ouvre la modale de création.
      */
     openNewModal() {
+        if (typeof plumeMountView === 'function') plumeMountView('newProjectModal');
         const modal = document.getElementById('newProjectModal');
         if (modal) {
             modal.classList.add('active');
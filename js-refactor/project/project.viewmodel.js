@@ -85,7 +85,7 @@ const ProjectViewModel = {
                 { id: Date.now() + 1, title: "Acte II - L'Aventure", chapters: [] },
                 { id: Date.now() + 2, title: "Acte III - Le Retour", chapters: [] }
             ];
-        } else if (data.template === 'thriller') {
+        } else if (PLUME_FEATURES.thriller && data.template === 'thriller') {
             newProject.acts = [
                 { id: Date.now(), title: "Acte I - L'Incident", chapters: [] },
                 { id: Date.now() + 1, title: "Acte II - La Tension", chapters: [] },
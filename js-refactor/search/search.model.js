@@ -128,6 +128,7 @@ const SearchResultModel = {
             action: () => {
                 if (typeof openMetroEventFullView === 'function') {
                     // Injecter l'ID dans le champ caché attendu par openMetroEventFullView
+                    if (typeof plumeMountView === 'function') plumeMountView('metroViewChoiceModal');
                     let hiddenInput = document.getElementById('metroViewChoiceEventId');
                     if (!hiddenInput) {
                         hiddenInput = document.createElement('input');
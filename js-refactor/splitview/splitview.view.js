@@ -377,6 +377,7 @@ function formatTextInPanel(panel, command, value = null) {
 /** [MVVM : View] - Ouvre la modal de sélection de vue pour un panneau */
 let currentSplitSelectorPanel = null;
 function openSplitViewSelector(panel) {
+    if (typeof plumeMountView === 'function') plumeMountView('splitSelectorModal');
     currentSplitSelectorPanel = panel;
 
     const content = document.getElementById('splitSelectorContent');
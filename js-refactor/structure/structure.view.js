@@ -408,6 +408,7 @@ function collapseAll() {
 }
 
 function openAddActModal() {
+    if (typeof plumeMountView === 'function') plumeMountView('addActModal');
     const modal = document.getElementById('addActModal');
     if (modal) {
         modal.classList.add('active');
@@ -426,6 +427,7 @@ function openAddChapterModal(actId) {
             activeActId = null; // Will be created in addChapter
         }
     }
+    if (typeof plumeMountView === 'function') plumeMountView('addChapterModal');
     const modal = document.getElementById('addChapterModal');
     if (modal) {
         modal.classList.add('active');
@@ -437,6 +439,7 @@ function openAddChapterModal(actId) {
 function openAddSceneModal(actId, chapterId) {
     if (actId) activeActId = actId;
     if (chapterId) activeChapterId = chapterId;
+    if (typeof plumeMountView === 'function') plumeMountView('addSceneModal');
     const modal = document.getElementById('addSceneModal');
     if (modal) {
         modal.classList.add('active');
@@ -722,6 +725,7 @@ function openCharacterLinker(actId, chapterId, sceneId) {
     const scene = chapter?.scenes.find(s => s.id === sceneId);
     if (!scene) return;
 
+    if (typeof plumeMountView === 'function') plumeMountView('referencesModal');
     const titleEl = document.getElementById('referencesModalTitle');
     const contentEl = document.getElementById('referencesModalContent');
     if (titleEl) titleEl.textContent = 'Lier des personnages à cette scène';
@@ -755,6 +759,7 @@ function openElementLinker(actId, chapterId, sceneId) {
     const scene = chapter?.scenes.find(s => s.id === sceneId);
     if (!scene) return;
 
+    if (typeof plumeMountView === 'function') plumeMountView('referencesModal');
     const titleEl = document.getElementById('referencesModalTitle');
     const contentEl = document.getElementById('referencesModalContent');
     if (titleEl) titleEl.textContent = 'Lier des lieux/éléments à cette scène';
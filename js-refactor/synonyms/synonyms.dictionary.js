@@ -1205,6 +1205,48 @@ function searchLocalSimilar(word) {
     return similar.slice(0, 10);
 }
 
+/**
+ * Index inverse : synonyme -> mots vedettes qui le citent, dans l'ordre du
+ * dictionnaire. Construit au premier appel (y compris depuis le dictionnaire
+ * compacté par le build light --pack-synonyms).
+ * [MVVM : Data]
+ */
+let synonymsReverseIndex = null;
+
+/**
+ * Construit l'index inverse d'un dictionnaire
+ * @param {Object} dictionary - Dictionnaire mot -> { synonymes, antonymes }
+ * @returns {Map} synonyme -> liste des mots vedettes
+ * [MVVM : Data]
+ */
+function buildSynonymsReverseIndex(dictionary) {
+    const index = new Map();
+    for (const [key, entry] of Object.entries(dictionary)) {
+        for (const syn of entry.synonymes || []) {
+            const headwords = index.get(syn);
+            if (!headwords) {
+                index.set(syn, [key]);
+            } else if (headwords[headwords.length - 1] !== key) {
+                headwords.push(key);
+            }
+        }
+    }
+    return index;
+}
+
+/**
+ * Mots vedettes dont le mot est un synonyme
+ * @param {string} word - Mot à rechercher
+ * @returns {Array} Mots vedettes, dans l'ordre du dictionnaire
+ * [MVVM : Data]
+ */
+function getSynonymHeadwords(word) {
+    if (!synonymsReverseIndex) {
+        synonymsReverseIndex = buildSynonymsReverseIndex(FrenchSynonymsDictionary);
+    }
+    return synonymsReverseIndex.get(word) || [];
+}
+
 // Export pour utilisation dans d'autres modules
 if (typeof module !== 'undefined' && module.exports) {
     module.exports = {
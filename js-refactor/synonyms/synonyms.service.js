@@ -123,17 +123,17 @@ const SynonymsService = {
     _searchInAllSynonyms(word) {
         const results = [];
 
-        for (const [key, entry] of Object.entries(FrenchSynonymsDictionary)) {
-            if (entry.synonymes && entry.synonymes.includes(word)) {
-                // Le mot recherché est un synonyme de 'key'
-                // Donc on retourne les autres synonymes de 'key'
-                results.push({ word: key, score: 100, tags: [], category: 'autre' });
-                entry.synonymes.forEach((syn, index) => {
-                    if (syn !== word && !results.find(r => r.word === syn)) {
-                        results.push({ word: syn, score: 90 - index, tags: [], category: 'autre' });
-                    }
-                });
-            }
+        // Index inverse : évite de parcourir tout le dictionnaire
+        for (const key of getSynonymHeadwords(word)) {
+            const entry = FrenchSynonymsDictionary[key];
+            // Le mot recherché est un synonyme de 'key'
+            // Donc on retourne les autres synonymes de 'key'
+            results.push({ word: key, score: 100, tags: [], category: 'autre' });
+            entry.synonymes.forEach((syn, index) => {
+                if (syn !== word && !results.find(r => r.word === syn)) {
+                    results.push({ word: syn, score: 90 - index, tags: [], category: 'autre' });
+                }
+            });
         }
 
         return results.slice(0, 15);
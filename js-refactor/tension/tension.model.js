@@ -18,6 +18,93 @@ const TensionModel = {
         ]
     },
 
+    // Poids d'une occurrence dans le score lexical, par niveau
+    TENSION_WEIGHTS: { high: 8, medium: 4, low: -5 },
+
+    // Trie des mots par défaut, précompilé par le build (mots de tension/*.txt)
+    PRECOMPILED_MATCHER: null,
+
+    // Dernier trie compilé pour des listes personnalisées
+    _matcherCache: null,
+
+    /**
+     * Découpe un texte en mots normalisés : minuscules, sans accents ;
+     * apostrophes, tirets et ponctuation séparent les mots.
+     * @param {string} text - Texte brut.
+     * @returns {Array} Mots normalisés.
+     */
+    tokenize: function (text) {
+        return text.toLowerCase().normalize('NFD').replace(/[\u0300-\u036f]/g, '').match(/[\p{L}\p{N}]+/gu) || [];
+    },
+
+    /**
+     * Compile les listes de mots en un trie sur les mots normalisés. Chaque
+     * nœud associe un mot au nœud suivant ; `$` liste les entrées
+     * [niveau, index dans la liste] qui se terminent sur ce nœud, ce qui
+     * couvre les expressions de plusieurs mots ("tremblement de terre").
+     * @param {Object} tensionWords - Dictionnaire des mots de tension.
+     * @returns {Object} Racine du trie.
+     */
+    compileTensionMatcher: function (tensionWords) {
+        const root = Object.create(null);
+        Object.keys(this.TENSION_WEIGHTS).forEach(level => {
+            (tensionWords[level] || []).forEach((word, index) => {
+                const tokens = word ? this.tokenize(word) : [];
+                if (tokens.length === 0) return;
+                let node = root;
+                tokens.forEach(token => {
+                    node = node[token] || (node[token] = Object.create(null));
+                });
+                (node.$ || (node.$ = [])).push([level, index]);
+            });
+        });
+        return root;
+    },
+
+    /**
+     * Retourne le trie des listes données (précompilé pour les listes par
+     * défaut, sinon compilé une fois puis réutilisé tant qu'elles ne changent pas).
+     * @param {Object} tensionWords - Dictionnaire des mots de tension.
+     * @returns {Object} Racine du trie.
+     */
+    getTensionMatcher: function (tensionWords) {
+        if (tensionWords === this.DEFAULT_TENSION_WORDS && this.PRECOMPILED_MATCHER) {
+            return this.PRECOMPILED_MATCHER;
+        }
+        const key = JSON.stringify(Object.keys(this.TENSION_WEIGHTS).map(level => tensionWords[level] || []));
+        if (!this._matcherCache || this._matcherCache.key !== key) {
+            this._matcherCache = { key: key, matcher: this.compileTensionMatcher(tensionWords) };
+        }
+        return this._matcherCache.matcher;
+    },
+
+    /**
+     * Compte les occurrences de chaque entrée des listes en un seul passage
+     * sur le texte (toutes les entrées qui commencent à chaque mot).
+     * @param {string} text - Texte brut.
+     * @param {Object} matcher - Trie (voir compileTensionMatcher).
+     * @returns {Object} Par niveau, Map index de l'entrée -> nombre d'occurrences.
+     */
+    countTensionWords: function (text, matcher) {
+        const tokens = this.tokenize(text);
+        const counts = {};
+        Object.keys(this.TENSION_WEIGHTS).forEach(level => { counts[level] = new Map(); });
+        for (let i = 0; i < tokens.length; i++) {
+            let node = matcher;
+            for (let j = i; j < tokens.length; j++) {
+                node = node[tokens[j]];
+                // Objet uniquement : ignore les propriétés héritées (constructor...)
+                if (typeof node !== 'object' || node === null) break;
+                if (node.$) {
+                    node.$.forEach(([level, index]) => {
+                        counts[level].set(index, (counts[level].get(index) || 0) + 1);
+                    });
+                }
+            }
+        }
+        return counts;
+    },
+
     /**
      * Calcule la tension en temps réel pour un bloc de texte donné.
      * @param {string} text - Le contenu HTML ou brut à analyser.
@@ -44,42 +131,15 @@ const TensionModel = {
         const foundWords = { high: [], medium: [], low: [] };
         let lexicalScore = 0;
 
-        // 1. ANALYSE LEXICALE
-        if (tensionWords.high) {
-            tensionWords.high.forEach(word => {
-                if (!word) return;
-                const regex = new RegExp(`\\b${word}\\b`, 'gi');
-                const matches = cleanText.match(regex);
-                if (matches) {
-                    lexicalScore += matches.length * 8;
-                    foundWords.high.push(word);
-                }
+        // 1. ANALYSE LEXICALE (un seul passage sur le texte, accents et casse ignorés)
+        const counts = this.countTensionWords(cleanText, this.getTensionMatcher(tensionWords));
+        Object.keys(this.TENSION_WEIGHTS).forEach(level => {
+            const indexes = [...counts[level].keys()].sort((a, b) => a - b);
+            indexes.forEach(index => {
+                lexicalScore += counts[level].get(index) * this.TENSION_WEIGHTS[level];
+                foundWords[level].push(tensionWords[level][index]);
             });
-        }
-
-        if (tensionWords.medium) {
-            tensionWords.medium.forEach(word => {
-                if (!word) return;
-                const regex = new RegExp(`\\b${word}\\b`, 'gi');
-                const matches = cleanText.match(regex);
-                if (matches) {
-                    lexicalScore += matches.length * 4;
-                    foundWords.medium.push(word);
-                }
-            });
-        }
-
-        if (tensionWords.low) {
-            tensionWords.low.forEach(word => {
-                if (!word) return;
-                const regex = new RegExp(`\\b${word}\\b`, 'gi');
-                const matches = cleanText.match(regex);
-                if (matches) {
-                    lexicalScore -= matches.length * 5;
-                    foundWords.low.push(word);
-                }
-            });
-        }
+        });
 
         // 2. ANALYSE PONCTUATION
         const exclamations = (cleanText.match(/!/g) || []).length;
@@ -8,6 +8,7 @@ const TensionView = {
      * Ouvre le modal de l'éditeur de mots de tension.
      */
     openEditor: function () {
+        if (typeof plumeMountView === 'function') plumeMountView('tensionWordsModal');
         const modal = document.getElementById('tensionWordsModal');
         if (modal) {
             modal.classList.add('active');
@@ -147,6 +147,7 @@ class MetroTimelineHandlers {
 
         // Navigation / Split view
         window.openMetroEventFromScene = (eventId) => {
+            if (typeof plumeMountView === 'function') plumeMountView('metroViewChoiceModal');
             document.getElementById('metroViewChoiceEventId').value = eventId;
             document.getElementById('metroViewChoiceModal').classList.add('active');
             if (typeof lucide !== 'undefined') lucide.createIcons();
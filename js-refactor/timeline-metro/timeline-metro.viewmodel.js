@@ -8,6 +8,7 @@ class MetroTimelineViewModel {
      * @param {number|null} eventId 
      */
     static openEventModal(eventId = null) {
+        if (typeof plumeMountView === 'function') plumeMountView('metroEventModal');
         const modal = document.getElementById('metroEventModal');
         const titleEl = document.getElementById('metroEventModalTitle');
         const deleteBtn = document.getElementById('metroDeleteBtn');
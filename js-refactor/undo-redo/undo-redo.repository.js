@@ -25,7 +25,7 @@ const UndoRedoRepository = {
         };
 
         let thrillerState = null;
-        if (typeof thrillerBoardState !== 'undefined') {
+        if (PLUME_FEATURES.thriller && typeof thrillerBoardState !== 'undefined') {
             thrillerState = UndoRedoModel.deepClone(thrillerBoardState);
         }
 
@@ -72,7 +72,7 @@ const UndoRedoRepository = {
             });
 
             // Restaurer l'etat du thriller board si present
-            if (snapshot.thrillerBoardState && typeof thrillerBoardState !== 'undefined') {
+            if (PLUME_FEATURES.thriller && snapshot.thrillerBoardState && typeof thrillerBoardState !== 'undefined') {
                 const restoredThrillerState = UndoRedoModel.deepClone(snapshot.thrillerBoardState);
                 Object.keys(restoredThrillerState).forEach(key => {
                     thrillerBoardState[key] = restoredThrillerState[key];
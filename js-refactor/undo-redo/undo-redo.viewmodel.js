@@ -197,7 +197,9 @@ const UndoRedoViewModel = {
         if (typeof renderTimeline === 'function') try { renderTimeline(); } catch (e) { }
         if (typeof updateStats === 'function') try { updateStats(); } catch (e) { }
         if (typeof renderArcs === 'function') try { renderArcs(); } catch (e) { }
+        // #if thriller
         if (typeof ThrillerBoardView !== 'undefined' && typeof ThrillerBoardView.render === 'function') try { ThrillerBoardView.render(); } catch (e) { }
+        // #endif
         if (typeof ArcBoardView !== 'undefined' && typeof ArcBoardView.render === 'function') try { ArcBoardView.render(); } catch (e) { }
         if (typeof ArcBoardViewModel !== 'undefined' && typeof ArcBoardViewModel.render === 'function') try { ArcBoardViewModel.render(); } catch (e) { }
         if (typeof renderMindmapView === 'function') try { renderMindmapView(); } catch (e) { }
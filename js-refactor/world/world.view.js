@@ -17,6 +17,7 @@ const WORLD_TYPE_ICONS = {
  * Opens the add world modal and sets focus.
  */
 function openAddWorldModal() {
+    if (typeof plumeMountView === 'function') plumeMountView('addWorldModal');
     const modal = document.getElementById('addWorldModal');
     if (modal) {
         modal.classList.add('active');
@@ -3,6 +3,7 @@
 // [MVVM : View]
 // Manipule directement le DOM pour afficher le modal d'ajout
 function openAddTimelineModal() {
+    if (typeof plumeMountView === 'function') plumeMountView('addTimelineModal');
     document.getElementById('addTimelineModal').classList.add('active');
     setTimeout(() => document.getElementById('timelineTitleInput').focus(), 100);
 }